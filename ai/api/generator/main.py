@@ -104,75 +104,76 @@ def is_holiday_spike(date):
             return True
     return False
 
-# ----------------------------
-# DATASET 1: SALES TRANSACTIONS
-# ----------------------------
-sales_data = []
-
-for _ in range(NUM_SALES):
-    item = random.choice(list(ITEM_CATALOG.keys()))
-    meta = ITEM_CATALOG[item]
-
-    sold_date = random_date(START_DATE, END_DATE)
-    holiday = is_holiday_spike(sold_date)
-
-    price_multiplier = random.uniform(1.15, 1.35) if holiday else random.uniform(0.95, 1.05)
-    base_price = random.uniform(*meta["price_range"])
-    sold_price = round(base_price * price_multiplier, 2)
-
-    quantity = random.randint(2, 15 if holiday else 8)
-
-    sales_data.append({
-        "transaction_id": str(uuid.uuid4()),
-        "item_name": item,
-        "category": meta["category"],
-        "quantity_sold": quantity,
-        "unit_cost": meta["cost"],
-        "unit_price": sold_price,
-        "profit": round((sold_price - meta["cost"]) * quantity, 2),
-        "sold_date": sold_date.strftime("%Y-%m-%d"),
-        "year": sold_date.year,
-        "month": sold_date.month,
-        "day_of_week": sold_date.weekday(),
-        "holiday_spike": holiday
-    })
-
-sales_df = pd.DataFrame(sales_data)
-sales_df.to_csv("sales_transactions.csv", index=False)
+if __name__ == "__main__":
+    # ----------------------------
+    # DATASET 1: SALES TRANSACTIONS
+    # ----------------------------
+    sales_data = []
 
-# ----------------------------
-# DATASET 2: INVENTORY & VELOCITY
-# ----------------------------
-inventory_data = []
+    for _ in range(NUM_SALES):
+        item = random.choice(list(ITEM_CATALOG.keys()))
+        meta = ITEM_CATALOG[item]
 
-for item, meta in ITEM_CATALOG.items():
-    stock = random.randint(300, 600)
+        sold_date = random_date(START_DATE, END_DATE)
+        holiday = is_holiday_spike(sold_date)
 
-    for day in pd.date_range(START_DATE, END_DATE):
-        holiday = is_holiday_spike(day)
-        base_demand = random.gauss(25, 6)
-        demand_multiplier = random.uniform(1.4, 1.8) if holiday else random.uniform(0.8, 1.1)
-        daily_demand = max(0, int(base_demand * demand_multiplier))
+        price_multiplier = random.uniform(1.15, 1.35) if holiday else random.uniform(0.95, 1.05)
+        base_price = random.uniform(*meta["price_range"])
+        sold_price = round(base_price * price_multiplier, 2)
 
-        stock -= daily_demand
-        stock = max(stock, 0)
+        quantity = random.randint(2, 15 if holiday else 8)
 
-        inventory_data.append({
+        sales_data.append({
+            "transaction_id": str(uuid.uuid4()),
             "item_name": item,
             "category": meta["category"],
-            "date": day.strftime("%Y-%m-%d"),
-            "daily_customer_demand": daily_demand,
-            "stock_remaining": stock,
-            "holiday_spike": holiday,
-            "restock_trigger": stock < 80
+            "quantity_sold": quantity,
+            "unit_cost": meta["cost"],
+            "unit_price": sold_price,
+            "profit": round((sold_price - meta["cost"]) * quantity, 2),
+            "sold_date": sold_date.strftime("%Y-%m-%d"),
+            "year": sold_date.year,
+            "month": sold_date.month,
+            "day_of_week": sold_date.weekday(),
+            "holiday_spike": holiday
         })
 
-        if stock < 80:
-            stock += random.randint(300, 600)
-
-inventory_df = pd.DataFrame(inventory_data)
-inventory_df.to_csv("inventory_velocity.csv", index=False)
-
-print("Generated datasets with 5-year seasonality & holiday spikes:")
-print("- sales_transactions.csv")
-print("- inventory_velocity.csv")
+    sales_df = pd.DataFrame(sales_data)
+    sales_df.to_csv("sales_transactions.csv", index=False)
+
+    # ----------------------------
+    # DATASET 2: INVENTORY & VELOCITY
+    # ----------------------------
+    inventory_data = []
+
+    for item, meta in ITEM_CATALOG.items():
+        stock = random.randint(300, 600)
+
+        for day in pd.date_range(START_DATE, END_DATE):
+            holiday = is_holiday_spike(day)
+            base_demand = random.gauss(25, 6)
+            demand_multiplier = random.uniform(1.4, 1.8) if holiday else random.uniform(0.8, 1.1)
+            daily_demand = max(0, int(base_demand * demand_multiplier))
+
+            stock -= daily_demand
+            stock = max(stock, 0)
+
+            inventory_data.append({
+                "item_name": item,
+                "category": meta["category"],
+                "date": day.strftime("%Y-%m-%d"),
+                "daily_customer_demand": daily_demand,
+                "stock_remaining": stock,
+                "holiday_spike": holiday,
+                "restock_trigger": stock < 80
+            })
+
+            if stock < 80:
+                stock += random.randint(300, 600)
+
+    inventory_df = pd.DataFrame(inventory_data)
+    inventory_df.to_csv("inventory_velocity.csv", index=False)
+
+    print("Generated datasets with 5-year seasonality & holiday spikes:")
+    print("- sales_transactions.csv")
+    print("- inventory_velocity.csv")
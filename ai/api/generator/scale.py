@@ -0,0 +1,342 @@
+"""
+Seeded, vectorized generator for large synthetic sales datasets (load and scale testing).
+
+Same catalog, holiday windows and value distributions as main.py, but every
+column is drawn with NumPy for a whole chunk at once:
+- holiday flags come from a mask precomputed once over the date range
+- transaction ids are version-4 UUIDs built from the seeded generator
+- chunks are generated in parallel worker processes, each with its own child
+  seed, so the output only depends on --seed and --chunk-rows (not --workers)
+
+Outputs (any combination):
+- CSV with the columns of sales_transactions.csv, written part by part and concatenated
+- columnar: one .npy file per column (compact dtypes, categorical codes) plus
+  manifest.json, filled in place by the workers through memory-mapped files
+- inventory_velocity.csv, with the restock simulation vectorized across items
+
+    python generator/scale.py --rows 20000000 --items 200 --clients 5000 \
+        --start 2020-01-01 --end 2024-12-31 --csv sales.csv --columnar sales_cols/
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from main import END_DATE, HOLIDAYS, ITEM_CATALOG, NUM_CUSTOMERS, START_DATE
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+UUID_DASHES = (8, 12, 16, 20)  # insertion points in the 32 hex digits
+
+SALES_COLUMNS = [
+    "transaction_id", "item_name", "category", "client_id", "quantity_sold", "unit_cost",
+    "unit_price", "profit", "sold_date", "year", "month", "day_of_week", "holiday_spike",
+]
+COLUMNAR_DTYPES = {
+    "item_name": np.int32,
+    "category": np.int8,
+    "client_id": np.int32,
+    "quantity_sold": np.int8,
+    "unit_cost": np.float32,
+    "unit_price": np.float32,
+    "profit": np.float32,
+    "sold_day": np.int32,
+    "holiday_spike": np.bool_,
+}
+
+
+def build_catalog(n_items: int, n_clients: int) -> dict:
+    """
+    Catalog arrays for n_items items: the base catalog, then numbered variants of it
+    ("Apple #2", ...) with the same category, cost and price range.
+    """
+    names, categories, cost, price_lo, price_hi = [], [], [], [], []
+    base = list(ITEM_CATALOG.items())
+    for i in range(n_items):
+        name, meta = base[i % len(base)]
+        copy = i // len(base)
+        names.append(name if copy == 0 else f"{name} #{copy + 1}")
+        categories.append(meta["category"])
+        cost.append(meta["cost"])
+        price_lo.append(meta["price_range"][0])
+        price_hi.append(meta["price_range"][1])
+
+    category_names = sorted(set(categories))
+    return {
+        "items": names,
+        "categories": category_names,
+        "clients": [f"C{i:06d}" for i in range(n_clients)],
+        "item_category": np.array([category_names.index(c) for c in categories], dtype=np.int8),
+        "cost": np.array(cost),
+        "price_lo": np.array(price_lo),
+        "price_hi": np.array(price_hi),
+    }
+
+
+def holiday_mask(start: date, end: date) -> np.ndarray:
+    """
+    is_holiday_spike for every day in [start, end], computed once per holiday window.
+    Like is_holiday_spike, a window only counts for the year it is defined for.
+    """
+    first = np.datetime64(start, "D")
+    mask = np.zeros((np.datetime64(end, "D") - first).astype(int) + 1, dtype=bool)
+    for year in range(start.year, end.year + 1):
+        year_start, year_end = np.datetime64(f"{year}-01-01"), np.datetime64(f"{year}-12-31")
+        for fn in HOLIDAYS.values():
+            lo, hi = (np.datetime64(d.date(), "D") for d in fn(year))
+            lo, hi = max(lo, year_start, first), min(hi, year_end)
+            if lo <= hi:
+                mask[(lo - first).astype(int):(hi - first).astype(int) + 1] = True
+    return mask
+
+
+def uuid4_strings(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    n random version-4 UUID strings, formatted without a per-row Python call.
+    """
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_chars = HEX_DIGITS[np.stack([raw >> 4, raw & 0x0F], axis=2).reshape(n, 32)]
+    chars = np.insert(hex_chars, UUID_DASHES, ord("-"), axis=1)
+    return np.ascontiguousarray(chars).view("S36").ravel().astype(str)
+
+
+def generate_chunk(seed, n_rows: int, catalog: dict, first_day: int, holidays: np.ndarray) -> dict:
+    """
+    One chunk of sales rows as column arrays (codes for categorical columns).
+    """
+    rng = np.random.default_rng(seed)
+    item = rng.integers(0, len(catalog["items"]), size=n_rows, dtype=np.int32)
+    offset = rng.integers(0, len(holidays), size=n_rows)
+    holiday = holidays[offset]
+
+    multiplier = np.where(holiday, rng.uniform(1.15, 1.35, n_rows), rng.uniform(0.95, 1.05, n_rows))
+    base_price = rng.uniform(catalog["price_lo"][item], catalog["price_hi"][item])
+    unit_price = np.round(base_price * multiplier, 2)
+    quantity = rng.integers(2, np.where(holiday, 16, 9)).astype(np.int8)
+    cost = catalog["cost"][item]
+
+    columns = {
+        "transaction_id": uuid4_strings(rng, n_rows),
+        "item_name": item,
+        "category": catalog["item_category"][item],
+        "quantity_sold": quantity,
+        "unit_cost": cost,
+        "unit_price": unit_price,
+        "profit": np.round((unit_price - cost) * quantity, 2),
+        "sold_day": (first_day + offset).astype(np.int32),
+        "holiday_spike": holiday,
+    }
+    if catalog["clients"]:
+        columns["client_id"] = rng.integers(0, len(catalog["clients"]), size=n_rows, dtype=np.int32)
+    return columns
+
+
+def chunk_frame(columns: dict, catalog: dict) -> pd.DataFrame:
+    """
+    A generated chunk in the sales_transactions.csv layout.
+    """
+    dates = columns["sold_day"].astype("datetime64[D]")
+    frame = {
+        "transaction_id": columns["transaction_id"],
+        "item_name": pd.Categorical.from_codes(columns["item_name"], catalog["items"]),
+        "category": pd.Categorical.from_codes(columns["category"], catalog["categories"]),
+        "quantity_sold": columns["quantity_sold"],
+        "unit_cost": columns["unit_cost"],
+        "unit_price": columns["unit_price"],
+        "profit": columns["profit"],
+        "sold_date": np.datetime_as_string(dates),
+        "year": dates.astype("datetime64[Y]").astype(int) + 1970,
+        "month": dates.astype("datetime64[M]").astype(int) % 12 + 1,
+        # 1970-01-01 was a Thursday (weekday 3)
+        "day_of_week": (columns["sold_day"] + 3) % 7,
+        "holiday_spike": columns["holiday_spike"],
+    }
+    if "client_id" in columns:
+        frame["client_id"] = pd.Categorical.from_codes(columns["client_id"], catalog["clients"])
+    return pd.DataFrame(frame)[[col for col in SALES_COLUMNS if col in frame]]
+
+
+def _write_chunk(task: dict) -> int:
+    columns = generate_chunk(task["seed"], task["rows"], task["catalog"], task["first_day"], task["holidays"])
+
+    if task["csv_part"]:
+        chunk_frame(columns, task["catalog"]).to_csv(task["csv_part"], index=False, header=task["header"])
+
+    if task["columnar_dir"]:
+        lo, hi = task["offset"], task["offset"] + task["rows"]
+        for name in task["columnar"]:
+            out = np.load(Path(task["columnar_dir"]) / f"sales.{name}.npy", mmap_mode="r+")
+            out[lo:hi] = columns[name]
+            out.flush()
+            del out
+    return task["rows"]
+
+
+def generate_sales(
+    rows: int,
+    n_items: int = len(ITEM_CATALOG),
+    n_clients: int = NUM_CUSTOMERS,
+    start: date = START_DATE.date(),
+    end: date = END_DATE.date(),
+    seed: int = 42,
+    csv_path: Path = None,
+    columnar_dir: Path = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    workers: int = None,
+) -> dict:
+    """
+    Generates rows sales transactions into csv_path and/or columnar_dir; returns a summary.
+    """
+    catalog = build_catalog(n_items, n_clients)
+    holidays = holiday_mask(start, end)
+    first_day = int(np.datetime64(start, "D").astype(np.int64))
+    n_chunks = max(1, -(-rows // chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    columnar = [name for name in COLUMNAR_DTYPES if name != "client_id" or n_clients]
+    if columnar_dir:
+        columnar_dir = Path(columnar_dir)
+        columnar_dir.mkdir(parents=True, exist_ok=True)
+        (columnar_dir / "manifest.json").unlink(missing_ok=True)
+        for name in columnar:
+            np.lib.format.open_memmap(columnar_dir / f"sales.{name}.npy", mode="w+", dtype=COLUMNAR_DTYPES[name], shape=(rows,))
+
+    part_dir = Path(tempfile.mkdtemp(prefix="sales-parts-", dir=Path(csv_path).parent)) if csv_path else None
+    tasks = []
+    for i, child in enumerate(seeds):
+        offset = i * chunk_rows
+        tasks.append({
+            "seed": child,
+            "rows": min(chunk_rows, rows - offset),
+            "offset": offset,
+            "catalog": catalog,
+            "first_day": first_day,
+            "holidays": holidays,
+            "csv_part": str(part_dir / f"part-{i:05d}.csv") if part_dir else None,
+            "header": i == 0,
+            "columnar_dir": str(columnar_dir) if columnar_dir else None,
+            "columnar": columnar,
+        })
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers == 1 or n_chunks == 1:
+            written = sum(map(_write_chunk, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, n_chunks)) as pool:
+                written = sum(pool.map(_write_chunk, tasks))
+
+        if csv_path:
+            with open(csv_path, "wb") as out:
+                for task in tasks:
+                    with open(task["csv_part"], "rb") as part:
+                        shutil.copyfileobj(part, out, 1 << 20)
+    finally:
+        if part_dir:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+    if columnar_dir:
+        manifest = {
+            "rows": rows,
+            "seed": seed,
+            "start": str(start),
+            "end": str(end),
+            "sales_columns": columnar,
+            "categories": {
+                "item_name": catalog["items"],
+                "category": catalog["categories"],
+                "client_id": catalog["clients"],
+            },
+        }
+        (columnar_dir / "manifest.json").write_text(json.dumps(manifest))
+
+    return {"rows": written, "chunks": n_chunks, "workers": workers, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def generate_inventory(
+    n_items: int = len(ITEM_CATALOG),
+    start: date = START_DATE.date(),
+    end: date = END_DATE.date(),
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    inventory_velocity.csv rows: daily demand and stock per item, stepping through the
+    days once with every item's stock updated together.
+    """
+    rng = np.random.default_rng(seed)
+    catalog = build_catalog(n_items, 0)
+    holidays = holiday_mask(start, end)
+    n_days = len(holidays)
+
+    base_demand = rng.normal(25, 6, size=(n_days, n_items))
+    multiplier = np.where(
+        holidays[:, None],
+        rng.uniform(1.4, 1.8, size=(n_days, n_items)),
+        rng.uniform(0.8, 1.1, size=(n_days, n_items)),
+    )
+    demand = np.maximum(0, (base_demand * multiplier).astype(np.int64))
+    restock_amount = rng.integers(300, 601, size=(n_days, n_items))
+
+    stock = rng.integers(300, 601, size=n_items)
+    remaining = np.empty((n_days, n_items), dtype=np.int64)
+    for day in range(n_days):
+        stock = np.maximum(stock - demand[day], 0)
+        remaining[day] = stock
+        stock = np.where(stock < 80, stock + restock_amount[day], stock)
+
+    days = np.datetime_as_string(np.datetime64(start, "D") + np.arange(n_days))
+    item_codes = np.repeat(np.arange(n_items), n_days)
+    return pd.DataFrame({
+        "item_name": pd.Categorical.from_codes(item_codes, catalog["items"]),
+        "category": pd.Categorical.from_codes(catalog["item_category"][item_codes], catalog["categories"]),
+        "date": np.tile(days, n_items),
+        "daily_customer_demand": demand.T.ravel(),
+        "stock_remaining": remaining.T.ravel(),
+        "holiday_spike": np.tile(holidays, n_items),
+        "restock_trigger": remaining.T.ravel() < 80,
+    })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000, help="sales rows to generate")
+    parser.add_argument("--items", type=int, default=len(ITEM_CATALOG), help="number of items (catalog variants beyond 40)")
+    parser.add_argument("--clients", type=int, default=NUM_CUSTOMERS, help="number of client ids (0: no client_id column)")
+    parser.add_argument("--start", type=date.fromisoformat, default=START_DATE.date())
+    parser.add_argument("--end", type=date.fromisoformat, default=END_DATE.date())
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--csv", type=Path, default=None, help="sales CSV output path")
+    parser.add_argument("--columnar", type=Path, default=None, help="directory for per-column .npy output")
+    parser.add_argument("--inventory", type=Path, default=None, help="inventory_velocity.csv output path")
+    args = parser.parse_args(argv)
+    if not (args.csv or args.columnar or args.inventory):
+        args.csv = Path("sales_transactions.csv")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.csv or args.columnar:
+        summary = generate_sales(
+            args.rows, args.items, args.clients, args.start, args.end, args.seed,
+            csv_path=args.csv, columnar_dir=args.columnar, chunk_rows=args.chunk_rows, workers=args.workers,
+        )
+        print(f"Generated {summary['rows']} sales rows in {summary['chunks']} chunks "
+              f"on {summary['workers']} workers in {summary['seconds']}s")
+    if args.inventory:
+        inventory = generate_inventory(args.items, args.start, args.end, args.seed)
+        inventory.to_csv(args.inventory, index=False)
+        print(f"Generated {len(inventory)} inventory rows")
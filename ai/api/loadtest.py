@@ -0,0 +1,259 @@
+"""
+Offline load generator for the strategy endpoints.
+
+    python loadtest.py --workers 1,2,4 --rate 50 --duration 20
+    python loadtest.py --inprocess --rate 20 --duration 10 --out load.json
+
+For each worker count, starts `uvicorn main:app` on localhost with
+STRATEGY_WORKERS set (or, with --inprocess, drives the app in this process
+through an ASGI transport), replays a request mix at a fixed open-loop arrival
+rate and reports throughput and p50/p95/p99 latency per endpoint.
+
+Arrivals are Poisson and latency is measured from each request's scheduled
+send time, so a server that falls behind shows up in the tail latencies
+instead of silently slowing the generator down.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent
+ITEM_PREFIX = "item_name_"
+
+ENDPOINTS = {
+    "best-buy-date": "/strategy/best-buy-date",
+    "optimized-decision": "/strategy/optimized-decision",
+}
+
+
+def parse_weights(text: str, cast=str) -> dict:
+    """
+    "a=3,b=1" -> {a: 0.75, b: 0.25}
+    """
+    pairs = [part.split("=") for part in text.split(",") if part]
+    weights = {cast(key): float(value) for key, value in pairs}
+    total = sum(weights.values())
+    return {key: value / total for key, value in weights.items()}
+
+
+class RequestMix:
+    """
+    Draws (endpoint, body) pairs: endpoint by weight, item from a Zipf-like
+    popularity ranking, months_ahead / horizon_days from their weight tables.
+    """
+    def __init__(self, items, endpoints: dict, months_ahead: dict, horizon_days: dict, zipf: float, seed: int = 0):
+        self.rng = np.random.default_rng(seed)
+        self.items = list(items)
+        popularity = 1.0 / np.arange(1, len(self.items) + 1) ** zipf
+        self.item_p = popularity / popularity.sum()
+        self.endpoints = endpoints
+        self.months_ahead = months_ahead
+        self.horizon_days = horizon_days
+        self.today = pd.Timestamp.today().date().isoformat()
+
+    def _pick(self, weights: dict):
+        keys = list(weights)
+        return keys[self.rng.choice(len(keys), p=list(weights.values()))]
+
+    def draw(self):
+        endpoint = self._pick(self.endpoints)
+        item = self.items[self.rng.choice(len(self.items), p=self.item_p)]
+        if endpoint == "best-buy-date":
+            return endpoint, {"item": item, "start_date": self.today, "months_ahead": int(self._pick(self.months_ahead))}
+
+        x = float(self.rng.choice([50, 100, 200]))
+        return endpoint, {
+            "item": item,
+            "stock": float(self.rng.integers(0, 300)),
+            "x": x,
+            "discount_x": 0.03,
+            "y": x / 2,
+            "discount_x_plus_y": 0.08,
+            "horizon_days": int(self._pick(self.horizon_days)),
+        }
+
+
+async def run_load(client: httpx.AsyncClient, mix: RequestMix, rate: float, duration: float, max_in_flight: int):
+    """
+    Sends Poisson arrivals at `rate` req/s for `duration` seconds.
+    Returns (records of (endpoint, status, latency_s), elapsed seconds).
+    """
+    records = []
+    in_flight = asyncio.Semaphore(max_in_flight)
+
+    async def one(endpoint, body, scheduled):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with in_flight:
+            try:
+                response = await client.post(ENDPOINTS[endpoint], json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+        records.append((endpoint, status, time.perf_counter() - scheduled))
+
+    started = time.perf_counter()
+    tasks, at = [], started
+    while True:
+        at += mix.rng.exponential(1.0 / rate)
+        if at - started > duration:
+            break
+        endpoint, body = mix.draw()
+        tasks.append(asyncio.create_task(one(endpoint, body, at)))
+    await asyncio.gather(*tasks)
+    return records, time.perf_counter() - started
+
+
+def summarize(records, elapsed: float) -> dict:
+    """
+    Per endpoint (and "all"): requests, errors, throughput and latency percentiles in ms.
+    """
+    by_endpoint = {}
+    for endpoint, status, latency in records:
+        by_endpoint.setdefault(endpoint, []).append((status, latency))
+        by_endpoint.setdefault("all", []).append((status, latency))
+
+    summary = {}
+    for endpoint in sorted(by_endpoint, key=lambda name: (name == "all", name)):
+        rows = by_endpoint[endpoint]
+        status = np.array([s for s, _ in rows])
+        ok = np.array([latency for s, latency in rows if 200 <= s < 300]) * 1e3
+        summary[endpoint] = {
+            "requests": len(rows),
+            "errors": int(((status < 200) | (status >= 300)).sum()),
+            "throughput_rps": round(len(ok) / elapsed, 2),
+            **{
+                name: round(float(np.percentile(ok, q)), 2) if len(ok) else None
+                for name, q in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99), ("max_ms", 100))
+            },
+        }
+    return summary
+
+
+def start_server(workers: int, port: int, timeout_s: float = 120.0) -> subprocess.Popen:
+    """
+    uvicorn main:app on 127.0.0.1:port with STRATEGY_WORKERS=workers; returns once it answers.
+    """
+    env = {**os.environ, "STRATEGY_WORKERS": str(workers)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BASE_DIR,
+        env=env,
+    )
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/strategy/stats", timeout=1.0).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    server.terminate()
+    raise RuntimeError(f"uvicorn did not start within {timeout_s:.0f}s")
+
+
+async def load_phase(client, mix, args):
+    if args.warmup > 0:
+        await run_load(client, mix, args.rate, args.warmup, args.max_in_flight)
+    records, elapsed = await run_load(client, mix, args.rate, args.duration, args.max_in_flight)
+    return summarize(records, elapsed)
+
+
+async def run_inprocess(mix, args):
+    import main
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            return main.executor.max_workers, await load_phase(client, mix, args)
+
+
+async def run_http(port, mix, args):
+    limits = httpx.Limits(max_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits) as client:
+        return await load_phase(client, mix, args)
+
+
+def default_items():
+    from strategy.feature_schema import load_feature_cols
+
+    return [col[len(ITEM_PREFIX):] for col in load_feature_cols() if col.startswith(ITEM_PREFIX)]
+
+
+def print_summary(workers, summary):
+    print(f"\nworkers={workers}")
+    print(f"{'endpoint':<20}{'requests':>9}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for endpoint, row in summary.items():
+        latencies = "".join(f"{row[k] if row[k] is not None else '-':>10}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms"))
+        print(f"{endpoint:<20}{row['requests']:>9}{row['errors']:>8}{row['throughput_rps']:>9}{latencies}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the strategy endpoints.")
+    parser.add_argument("--workers", default="1", help="comma-separated STRATEGY_WORKERS values to test")
+    parser.add_argument("--inprocess", action="store_true", help="drive the app in this process (uses the current STRATEGY_WORKERS)")
+    parser.add_argument("--rate", type=float, default=20.0, help="arrival rate, requests per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each run")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="cap on concurrently open requests")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--mix", default="best-buy-date=1,optimized-decision=3", help="endpoint weights")
+    parser.add_argument("--months-ahead", default="3=1,6=2,12=2", help="months_ahead weights")
+    parser.add_argument("--horizon-days", default="7=1,14=3,30=1", help="horizon_days weights")
+    parser.add_argument("--items", default=None, help="comma-separated items (default: every item the model knows)")
+    parser.add_argument("--zipf", type=float, default=1.1, help="item popularity skew, 0 = uniform")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, default=None, help="write the results as JSON")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv=None):
+    args = parse_args(argv)
+    items = args.items.split(",") if args.items else default_items()
+
+    def new_mix():
+        return RequestMix(
+            items,
+            endpoints=parse_weights(args.mix),
+            months_ahead=parse_weights(args.months_ahead, int),
+            horizon_days=parse_weights(args.horizon_days, int),
+            zipf=args.zipf,
+            seed=args.seed,
+        )
+
+    results = []
+    if args.inprocess:
+        workers, summary = asyncio.run(run_inprocess(new_mix(), args))
+        print_summary(workers, summary)
+        results.append({"workers": workers, "target": "inprocess", "endpoints": summary})
+    else:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            server = start_server(workers, args.port)
+            try:
+                summary = asyncio.run(run_http(args.port, new_mix(), args))
+            finally:
+                server.terminate()
+                server.wait()
+            print_summary(workers, summary)
+            results.append({"workers": workers, "target": "uvicorn", "endpoints": summary})
+
+    if args.out:
+        config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        args.out.write_text(json.dumps({"config": config, "runs": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
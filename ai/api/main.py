@@ -2,24 +2,57 @@
 ### WON'T WORK IF COMPILED ON THIS PROJECT STRUCTURE. ###
 from __future__ import annotations
 
-from typing import Optional
+import asyncio
+import hmac
+import io
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
+import numpy as np
 import pandas as pd
 
-from strategy.data import load_sales_data, build_monthly_frame, get_monthly_feature_columns
-from strategy.demand import DemandForecaster, observed_daily_velocity_from_sales
-from strategy.optimizer import optimized_buy_decision
-from strategy.strategy import yearly_buy_analysis, buy_decision
-from strategy.monthly_model import load_monthly_demand_model
-from strategy.feature_schema import load_feature_cols
+from strategy.snapshot import attach_sales_store
+from strategy.optimizer import optimized_buy_decision, optimized_buy_decisions
+from strategy.montecarlo import tree_demand_paths
+from strategy.replenishment import replenishment_plan
+from strategy.strategy import (
+    yearly_buy_analysis, yearly_buy_analysis_batch, portfolio_buy_analysis, buy_decision, horizon_months
+)
+from strategy.sales_store import SalesStore
+from strategy.execution import ExecutorBusy, executor_from_env
+from strategy.coalescing import MicroBatcher, SingleFlight, request_digest
+from strategy.metrics import REGISTRY, REQUEST_SECONDS, REQUESTS, run_collected, stage
+from strategy.profiling import ProfileStore, ProfilingConfig, StackSampler, run_profiled
+from strategy.result_cache import file_version, result_cache_from_env
+from strategy.pricing import PRICE_SEED
+from strategy.monthly_model import BASE_DIR as MODELS_BASE_DIR, MONTHLY_MODEL_PATH
+from strategy.serving import MODEL_RELOADS, model_summary, prepare_serving_model
+
+# Process pool for the CPU-bound handlers; forked at startup once everything below is loaded
+executor = executor_from_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    executor.start()
+    watcher = asyncio.create_task(watch_model(MODEL_WATCH_S)) if MODEL_WATCH_S > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    executor.shutdown()
 
-monthly_model = load_monthly_demand_model()
-FEATURE_COLS = load_feature_cols()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,22 +60,94 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Cache", "X-Profile-Id"],
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (bounded cardinality); unmatched paths share one label
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint)
+    REQUESTS.inc(1, endpoint, str(response.status_code))
+    return response
+
+
+# ---- Opt-in profiling: X-Profile header or ?profile= flag, only when STRATEGY_PROFILING=1 ----
+
+profiling = ProfilingConfig()
+profiles = ProfileStore(profiling.keep)
+# Set for a profiled request: {"mode": ..., "worker_profiles": [...]}, filled in by run_strategy
+profile_request: ContextVar[Optional[dict]] = ContextVar("profile_request", default=None)
+
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    mode = profiling.requested_mode(request.headers.get("x-profile"), request.query_params.get("profile"))
+    if mode is None:
+        return await call_next(request)
+
+    holder = {"mode": mode, "worker_profiles": []}
+    token = profile_request.set(holder)
+    started = time.perf_counter()
+    try:
+        # The event loop thread is sampled too (in either mode) for the API-side stages
+        with StackSampler(interval_s=profiling.interval_s) as sampler:
+            response = await call_next(request)
+    finally:
+        profile_request.reset(token)
+
+    workers = holder["worker_profiles"]
+    profile_id = profiles.add({
+        "endpoint": request.url.path,
+        "mode": mode,
+        "task": ",".join(p["task"] for p in workers),
+        "duration_s": time.perf_counter() - started,
+        "collapsed": sampler.collapsed("api") + "".join(p["collapsed"] for p in workers),
+        "pstats": "\n".join(p["pstats"] for p in workers if "pstats" in p),
+        "workers": [{k: v for k, v in p.items() if k not in ("collapsed", "pstats")} for p in workers],
+    })
+    response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
 class BuyTimingRequest(BaseModel):
     item: str
     start_date: str
-    months_ahead: int
+    months_ahead: int = Field(ge=1, le=36)
 
-sales_df = load_sales_data("app/sales_transactions.csv")
-monthly_df = build_monthly_frame(sales_df)
-monthly_feature_cols = get_monthly_feature_columns(monthly_df)
+# Memory-mapped snapshot of the parsed CSV, rebuilt only when the CSV content changes;
+# every worker attaches to the same read-only arrays instead of holding its own copy
+SALES_CSV = "app/sales_transactions.csv"
+sales_history, monthly_df, monthly_feature_cols = attach_sales_store(SALES_CSV)
+SALES_CSV_VERSION = file_version(Path(__file__).resolve().parent / SALES_CSV)
+FEATURE_COLS = monthly_feature_cols
+# Live store: snapshot history plus rows ingested through /sales/ingest
+sales_store = SalesStore(sales_history, monthly_df)
+
+
+
+def warm_years():
+    # The item x month forecast table is built up front instead of on the first request
+    return pd.Timestamp.today().year, pd.Timestamp.today().year + 1
+
+
+# One memory-mapped model shared by the forecaster and the strategy code; replaced as a
+# whole by reload_model()
+serving, _report = prepare_serving_model(MONTHLY_MODEL_PATH, FEATURE_COLS, warm_years())
+if serving is None:
+    raise RuntimeError(f"Monthly demand model failed validation: {_report['errors']}")
+
+MAX_MONTE_CARLO_PATHS = 20000
+
+
+class OfferTier(BaseModel):
+    min_quantity: float
+    discount: float
 
-forecaster = DemandForecaster(
-    monthly_model_path="models/monthly_demand_model.pkl",
-    monthly_feature_cols=monthly_feature_cols
-)
 
 class OptimizedDecisionRequest(BaseModel):
     item: str
@@ -56,21 +161,227 @@ class OptimizedDecisionRequest(BaseModel):
 
     client_id: Optional[str] = None
     lookback_days: int = 7
-    horizon_days: int = 14
+    horizon_days: int = Field(14, ge=1)
+    alpha_observed: float = 0.6
+    emergency_days_cover: float = 2.0
+
+    # Plan search; defaults derive the grid and the offer tiers from x / y
+    max_delay_days: Optional[int] = Field(None, ge=0)
+    quantities: Optional[List[float]] = None
+    offer_tiers: Optional[List[OfferTier]] = None
+    top_k: int = 5
+
+    # Monte Carlo mode: rank plans over this many demand paths (0 = point forecast only)
+    monte_carlo_paths: int = 0
+    seed: int = 0
+
+
+class ReplenishmentPlanRequest(BaseModel):
+    item: str
+    stock: float
+
+    client_id: Optional[str] = None
+    lookback_days: int = 7
+    horizon_days: int = 90
+    alpha_observed: float = 0.6
+
+    offer_tiers: List[OfferTier] = []
+    order_cost: float = 0.0
+    stock_levels: int = 120
+    max_stock: Optional[float] = None
+
+
+class SaleRow(BaseModel):
+    item_name: str
+    sold_date: str
+    quantity_sold: int
+    client_id: Optional[str] = None
+
+
+class SalesIngestRequest(BaseModel):
+    rows: List[SaleRow]
+
+
+class BuyTimingBatchRequest(BaseModel):
+    items: List[str]
+    start_date: str
+    months_ahead: int = Field(ge=1, le=36)
+
+
+class PortfolioBuyRequest(BaseModel):
+    start_date: str
+    months_ahead: int = Field(ge=1, le=36)
+    # Default: every item the demand model knows
+    items: Optional[List[str]] = None
+    include_matrix: bool = False
+    # "json" (columnar) or "npz" (numpy archive: item, buy_date, best_index, best_profit[, expected_profit])
+    format: str = "json"
+
+
+PORTFOLIO_FORMATS = {"json": "application/json", "npz": "application/x-npz"}
+
+
+class DecisionBatchItem(BaseModel):
+    item: str
+    stock: float
+
+    x: float
+    discount_x: float
+
+    y: float
+    discount_x_plus_y: float
+
+    client_id: Optional[str] = None
+
+
+class OptimizedDecisionBatchRequest(BaseModel):
+    items: List[DecisionBatchItem]
+
+    lookback_days: int = 7
+    horizon_days: int = Field(14, ge=1)
     alpha_observed: float = 0.6
     emergency_days_cover: float = 2.0
 
 
 from fastapi import Body
 
-@app.post("/strategy/best-buy-date")
-def best_buy_date(req: BuyTimingRequest):
+
+async def run_strategy(fn, *args):
+    """
+    Awaits fn(*args) on the strategy executor, mapping backpressure to 429 and timeouts to 504.
+    Metrics recorded inside the worker come back with the result and are merged here.
+    """
+    holder = profile_request.get()
+    try:
+        with stage("executor"):
+            if holder is None:
+                result, records = await executor.run(run_collected, fn, *args)
+            else:
+                result, records, profile = await executor.run(
+                    run_profiled, holder["mode"], profiling.interval_s, fn, *args
+                )
+                holder["worker_profiles"].append(profile)
+        REGISTRY.merge(records)
+        return result
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Strategy computation timed out")
+
+
+def respond(result, media_type: str = "application/json") -> Response:
+    # Serialize here rather than in FastAPI so the cost shows up as its own stage
+    if isinstance(result, bytes):
+        return Response(result, media_type=media_type)
+    with stage("serialize"):
+        return JSONResponse(jsonable_encoder(result))
+
+
+# ---- Request coalescing: identical in-flight requests and forecaster queries share work ----
+
+single_flight = SingleFlight()
+
+
+def request_key(*parts) -> str:
+    # Profiled requests never share a computation with unprofiled ones
+    holder = profile_request.get()
+    mode = holder["mode"] if holder is not None else None
+    return request_digest(*parts, mode)
+
+
+# ---- Result cache: finished responses by request, model version and data version ----
+
+result_cache = result_cache_from_env()
+# Rows ingested here exist only in this process, so its keys stop matching other processes' ones
+INSTANCE_ID = uuid.uuid4().hex
+
+
+def data_version() -> str:
+    if sales_store.version == 0:
+        return SALES_CSV_VERSION
+    return f"{SALES_CSV_VERSION}:{INSTANCE_ID}:{sales_store.version}"
+
+
+def cache_key(*parts, uses_sales: bool = False) -> str:
+    versions = (serving.version, PRICE_SEED, data_version() if uses_sales else None)
+    return request_key(*parts, versions)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+
+async def serve_cached(request: Request, key: str, compute, media_type: str = "application/json") -> Response:
+    """
+    Cached response body for key, or compute() through single_flight and store it.
+    compute returns a JSON-able result, or an already serialized body of media_type.
+    Sets ETag and X-Cache (HIT, DISK, MISS or BYPASS); If-None-Match gets a 304.
+    Profiled requests bypass the cache so the computation is actually profiled.
+    """
+    if profile_request.get() is not None or not result_cache.enabled:
+        response = respond(await single_flight.do(key, compute), media_type)
+        response.headers["X-Cache"] = "BYPASS"
+        return response
+
+    entry, tier = result_cache.get(key)
+    status = {"memory": "HIT", "disk": "DISK"}.get(tier, "MISS")
+    if entry is None:
+        response = respond(await single_flight.do(key, compute), media_type)
+        entry = result_cache.put(key, response.body)
+
+    headers = {"ETag": entry.etag, "X-Cache": status}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
+def _forecast_batch(keys):
+    # keys are (item, year, month); one table lookup (and at most one predict) for all of them
+    items = np.asarray([key[0] for key in keys], dtype=object)
+    months = np.asarray([f"{year:04d}-{month:02d}" for _, year, month in keys], dtype="datetime64[M]")
+    with stage("forecaster.batch"):
+        return serving.forecaster.predict_many(items, months).tolist()
+
+
+forecast_batcher = MicroBatcher(
+    _forecast_batch,
+    window_s=float(os.getenv("STRATEGY_BATCH_WINDOW_S", "0.002")),
+    name="forecast_batcher",
+)
+
+
+async def monthly_forecasts(items, months) -> np.ndarray:
+    """
+    (items, months) monthly demand, resolved through the forecaster micro-batcher.
+    """
+    keys = [(item, month.year, month.month) for item in items for month in months]
+    with stage("forecast"):
+        values = await forecast_batcher.submit_many(keys)
+    return np.asarray(values, dtype=float).reshape(len(items), len(months))
+
+
+async def daily_forecasts(items, today: pd.Timestamp, horizon_days: int) -> np.ndarray:
+    """
+    (items, horizon_days) predicted daily velocity from today, as predict_daily_velocity.
+    """
+    periods = pd.date_range(today, periods=horizon_days).to_period("M")
+    months = periods.unique()
+    monthly = await monthly_forecasts(items, months)
+    return (monthly / 30.0)[:, months.get_indexer(periods)]
+
+
+# ---- Work functions: run inside executor workers, must stay module-level (picklable) ----
+
+def _best_buy_date(req: BuyTimingRequest, monthly_forecast: np.ndarray):
     df, best = yearly_buy_analysis(
         item=req.item,
         start_date=req.start_date,
         months_ahead=req.months_ahead,
-        model=monthly_model,
-        feature_cols=FEATURE_COLS
+        model=serving.model,
+        feature_cols=FEATURE_COLS,
+        monthly_forecast=monthly_forecast
     )
     return {
         "best_buy_date": str(best["buy_date"]),
@@ -78,26 +389,21 @@ def best_buy_date(req: BuyTimingRequest):
     }
 
 
-@app.post("/strategy/optimized-decision")
-def optimized_decision(
-    req: OptimizedDecisionRequest = Body(...)
-):
-    today = pd.Timestamp.today().normalize()
+def _optimized_decision(req: OptimizedDecisionRequest, today: pd.Timestamp, observed_vel: float, predicted: np.ndarray):
+    def predicted_daily_velocity(item: str, date: pd.Timestamp) -> float:
+        return predicted[(date - today).days]
 
-    observed_vel = observed_daily_velocity_from_sales(
-        sales_df=sales_df,
-        item=req.item,
-        as_of=today,
-        lookback_days=req.lookback_days,
-        client_id=req.client_id
-    )
+    demand_paths = None
+    if req.monte_carlo_paths > 0:
+        trees = serving.forecaster.predict_tree_daily_velocities(req.item, pd.date_range(today, periods=req.horizon_days))
+        demand_paths = tree_demand_paths(trees, observed_vel, req.alpha_observed, req.monte_carlo_paths, req.seed)
 
     result = optimized_buy_decision(
         item=req.item,
         today=today,
         current_stock=req.stock,
         observed_weekly_daily_velocity=observed_vel,
-        predicted_daily_velocity_fn=forecaster.predict_daily_velocity,
+        predicted_daily_velocity_fn=predicted_daily_velocity,
 
         x=req.x,
         discount_x=req.discount_x,
@@ -107,12 +413,429 @@ def optimized_decision(
 
         horizon_days=req.horizon_days,
         alpha_observed=req.alpha_observed,
-        emergency_days_cover=req.emergency_days_cover
+        emergency_days_cover=req.emergency_days_cover,
+
+        max_delay_days=req.max_delay_days,
+        quantities=req.quantities,
+        offer_tiers=[(tier.min_quantity, tier.discount) for tier in req.offer_tiers] if req.offer_tiers else None,
+        top_k=req.top_k,
+        demand_paths=demand_paths,
+    )
+
+    return {
+        "item": req.item,
+        "as_of": str(today.date()),
+        "observed_daily_velocity": round(observed_vel, 4),
+        **result
+    }
+
+
+def _replenishment_plan(req: ReplenishmentPlanRequest, today: pd.Timestamp, observed_vel: float, predicted: np.ndarray):
+    def predicted_daily_velocity(item: str, date: pd.Timestamp) -> float:
+        return predicted[(date - today).days]
+
+    plan = replenishment_plan(
+        item=req.item,
+        today=today,
+        current_stock=req.stock,
+        observed_daily_velocity=observed_vel,
+        predicted_daily_velocity_fn=predicted_daily_velocity,
+        horizon_days=req.horizon_days,
+        alpha_observed=req.alpha_observed,
+        offer_tiers=[(tier.min_quantity, tier.discount) for tier in req.offer_tiers],
+        order_cost=req.order_cost,
+        n_levels=req.stock_levels,
+        max_stock=req.max_stock,
     )
 
     return {
         "item": req.item,
         "as_of": str(today.date()),
         "observed_daily_velocity": round(observed_vel, 4),
+        **plan
+    }
+
+
+def _best_buy_date_batch(req: BuyTimingBatchRequest, monthly_forecast: np.ndarray):
+    dates, profits = yearly_buy_analysis_batch(
+        items=req.items,
+        start_date=req.start_date,
+        months_ahead=req.months_ahead,
+        model=serving.model,
+        feature_cols=FEATURE_COLS,
+        monthly_forecast=monthly_forecast
+    )
+    best = profits.argmax(axis=1)
+    return {
+        "item": req.items,
+        "best_buy_date": [str(d) for d in dates.date[best]],
+        "expected_profit": profits[np.arange(len(best)), best].tolist()
+    }
+
+
+def _portfolio_best_buy_dates(req: PortfolioBuyRequest, items: List[str], monthly_forecast: np.ndarray):
+    dates, profits, best = portfolio_buy_analysis(
+        items=items,
+        start_date=req.start_date,
+        months_ahead=req.months_ahead,
+        model=serving.model,
+        feature_cols=FEATURE_COLS,
+        monthly_forecast=monthly_forecast
+    )
+    best_profit = profits[np.arange(len(items)), best]
+
+    with stage("serialize"):
+        if req.format == "npz":
+            arrays = {
+                "item": np.asarray(items, dtype=str),
+                "buy_date": np.asarray(dates, dtype="datetime64[D]"),
+                "best_index": best.astype(np.int32),
+                "best_profit": best_profit,
+            }
+            if req.include_matrix:
+                arrays["expected_profit"] = profits.astype(np.float32)
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            return buffer.getvalue()
+
+        result = {
+            "start_date": str(dates[0].date()),
+            "item": items,
+            "best_buy_date": [str(d) for d in dates.date[best]],
+            "expected_profit": best_profit.tolist(),
+        }
+        if req.include_matrix:
+            # Columnar: row i of expected_profit is items[i], one value per buy_date
+            result["buy_date"] = [str(d) for d in dates.date]
+            result["matrix"] = profits.tolist()
+        return result
+
+
+def _optimized_decision_batch(
+    req: OptimizedDecisionBatchRequest, today: pd.Timestamp, observed_vel: np.ndarray, predicted: np.ndarray
+):
+    rows = req.items
+    items = [row.item for row in rows]
+
+    result = optimized_buy_decisions(
+        items=items,
+        today=today,
+        current_stock=[row.stock for row in rows],
+        observed_daily_velocity=observed_vel,
+        predicted_daily_velocity=predicted,
+
+        x=[row.x for row in rows],
+        discount_x=[row.discount_x for row in rows],
+
+        y=[row.y for row in rows],
+        discount_x_plus_y=[row.discount_x_plus_y for row in rows],
+
+        horizon_days=req.horizon_days,
+        alpha_observed=req.alpha_observed,
+        emergency_days_cover=req.emergency_days_cover
+    )
+
+    return {
+        "as_of": str(today.date()),
+        "observed_daily_velocity": np.round(observed_vel, 4).tolist(),
         **result
-    }
\ No newline at end of file
+    }
+
+
+# ---- Handlers: cheap lookups on the event loop, heavy work awaited on the executor ----
+
+@app.post("/strategy/best-buy-date")
+async def best_buy_date(req: BuyTimingRequest, request: Request):
+    async def compute():
+        monthly = await monthly_forecasts([req.item], horizon_months(req.start_date, req.months_ahead))
+        return await run_strategy(_best_buy_date, req, monthly[0])
+
+    return await serve_cached(request, cache_key("best-buy-date", req), compute)
+
+
+@app.post("/strategy/optimized-decision")
+async def optimized_decision(
+    request: Request,
+    req: OptimizedDecisionRequest = Body(...)
+):
+    if not 0 <= req.monte_carlo_paths <= MAX_MONTE_CARLO_PATHS:
+        raise HTTPException(status_code=422, detail=f"monte_carlo_paths must be between 0 and {MAX_MONTE_CARLO_PATHS}")
+    today = pd.Timestamp.today().normalize()
+
+    async def compute():
+        with stage("velocity_lookup"):
+            observed_vel = sales_store.observed_daily_velocity(
+                item=req.item,
+                as_of=today,
+                lookback_days=req.lookback_days,
+                client_id=req.client_id
+            )
+        predicted = await daily_forecasts([req.item], today, req.horizon_days)
+        return await run_strategy(_optimized_decision, req, today, observed_vel, predicted[0])
+
+    return await serve_cached(request, cache_key("optimized-decision", req, today, uses_sales=True), compute)
+
+
+@app.post("/strategy/replenishment-plan")
+async def replenishment_plan_endpoint(req: ReplenishmentPlanRequest, request: Request):
+    if not 1 <= req.horizon_days <= 366:
+        raise HTTPException(status_code=422, detail="horizon_days must be between 1 and 366")
+    if not 1 <= req.stock_levels <= 1000:
+        raise HTTPException(status_code=422, detail="stock_levels must be between 1 and 1000")
+    today = pd.Timestamp.today().normalize()
+
+    async def compute():
+        with stage("velocity_lookup"):
+            observed_vel = sales_store.observed_daily_velocity(
+                item=req.item,
+                as_of=today,
+                lookback_days=req.lookback_days,
+                client_id=req.client_id
+            )
+        predicted = await daily_forecasts([req.item], today, req.horizon_days)
+        return await run_strategy(_replenishment_plan, req, today, observed_vel, predicted[0])
+
+    return await serve_cached(request, cache_key("replenishment-plan", req, today, uses_sales=True), compute)
+
+
+@app.post("/strategy/best-buy-date/batch")
+async def best_buy_date_batch(req: BuyTimingBatchRequest, request: Request):
+    if not req.items:
+        return {"item": [], "best_buy_date": [], "expected_profit": []}
+
+    async def compute():
+        monthly = await monthly_forecasts(req.items, horizon_months(req.start_date, req.months_ahead))
+        return await run_strategy(_best_buy_date_batch, req, monthly)
+
+    return await serve_cached(request, cache_key("best-buy-date/batch", req), compute)
+
+
+@app.post("/strategy/best-buy-date/portfolio")
+async def best_buy_date_portfolio(req: PortfolioBuyRequest, request: Request):
+    """
+    Best buy date of every catalog item (or req.items) from one items x dates matrix.
+    """
+    if req.format not in PORTFOLIO_FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(PORTFOLIO_FORMATS)}")
+    items = list(req.items) if req.items is not None else list(serving.forecaster.items)
+    if not items:
+        return {"item": [], "best_buy_date": [], "expected_profit": []}
+    media_type = PORTFOLIO_FORMATS[req.format]
+
+    async def compute():
+        monthly = await monthly_forecasts(items, horizon_months(req.start_date, req.months_ahead))
+        return await run_strategy(_portfolio_best_buy_dates, req, items, monthly)
+
+    return await serve_cached(request, cache_key("best-buy-date/portfolio", req, items), compute, media_type=media_type)
+
+
+@app.post("/strategy/optimized-decision/batch")
+async def optimized_decision_batch(
+    request: Request,
+    req: OptimizedDecisionBatchRequest = Body(...)
+):
+    # Shared inputs: one "today", one horizon, one forecast lookup for every row
+    today = pd.Timestamp.today().normalize()
+    if not req.items:
+        return {"as_of": str(today.date()), "item": [], "decision": [], "observed_daily_velocity": []}
+
+    async def compute():
+        with stage("velocity_lookup"):
+            observed_vel = np.array([
+                sales_store.observed_daily_velocity(
+                    item=row.item,
+                    as_of=today,
+                    lookback_days=req.lookback_days,
+                    client_id=row.client_id
+                )
+                for row in req.items
+            ])
+        predicted = await daily_forecasts([row.item for row in req.items], today, req.horizon_days)
+        return await run_strategy(_optimized_decision_batch, req, today, observed_vel, predicted)
+
+    return await serve_cached(request, cache_key("optimized-decision/batch", req, today, uses_sales=True), compute)
+
+
+@app.post("/sales/ingest")
+def ingest_sales(req: SalesIngestRequest, request: Request):
+    # Changes the sales every forecast and cached result reads: admin token only
+    require_admin(request)
+    # Velocities are read from the store on the event loop, so pool workers never see stale sales
+    if not req.rows:
+        return {"ingested": 0, "rows": sales_store.rows, "version": sales_store.version}
+
+    # client_id stays even when every row lacks one (NA): the index skips those for per-client totals
+    rows = pd.DataFrame([dict(row) for row in req.rows])
+    try:
+        version = sales_store.append(rows)
+    except (ValueError, TypeError, KeyError) as e:
+        raise HTTPException(status_code=422, detail=f"Malformed sales rows: {e}")
+    return {"ingested": len(rows), "rows": sales_store.rows, "version": version}
+
+
+@app.get("/strategy/stats")
+def strategy_stats():
+    return {
+        "single_flight": single_flight.stats(),
+        "forecast_batcher": forecast_batcher.stats(),
+        "executor": {
+            "workers": executor.max_workers,
+            "max_pending": executor.max_pending,
+            "outstanding": executor.outstanding,
+        },
+        "sales_memory": sales_store.memory_report(),
+        "result_cache": {**result_cache.stats(), "model_version": serving.version, "data_version": data_version()},
+    }
+
+
+REGISTRY.gauge("strategy_executor_outstanding", "Strategy tasks running or queued.", lambda: executor.outstanding)
+REGISTRY.gauge("strategy_executor_workers", "Strategy worker processes.", lambda: executor.max_workers)
+REGISTRY.gauge("strategy_sales_rows", "Sales rows held in memory.", lambda: sales_store.rows)
+REGISTRY.gauge("strategy_sales_version", "Sales data version (increments per ingest).", lambda: sales_store.version)
+
+
+@app.get("/profiles")
+def list_profiles():
+    if not profiling.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return profiles.summaries()
+
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, format: str = "collapsed"):
+    """
+    format=collapsed: flamegraph.pl / speedscope input; pstats: cProfile report; json: everything.
+    """
+    profile = profiles.get(profile_id) if profiling.enabled else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile["collapsed"])
+    if format == "pstats":
+        return PlainTextResponse(profile["pstats"] or "No cProfile data (sampled profile)\n")
+    if format == "json":
+        return profile
+    raise HTTPException(status_code=422, detail="format must be collapsed, pstats or json")
+
+
+# ---- Model hot reload: admin endpoints (STRATEGY_ADMIN_TOKEN) and an optional file watcher ----
+
+ADMIN_TOKEN = os.getenv("STRATEGY_ADMIN_TOKEN")
+MODEL_WATCH_S = float(os.getenv("STRATEGY_MODEL_WATCH_S", "0"))
+model_reload_lock = asyncio.Lock()
+model_state = {"last_reload": None, "last_rejected": None}
+
+
+def init_strategy_worker(model_path: str):
+    """
+    Initializer of a restarted worker pool. Importing this module in the worker already
+    attached the sales snapshot and the default model (both memory-mapped); a worker
+    only loads the served model when a reload switched to another file.
+    """
+    global serving
+    if Path(model_path) != serving.path:
+        bundle, report = prepare_serving_model(model_path, FEATURE_COLS, warm_years(), export=False)
+        if bundle is None:
+            raise RuntimeError(f"Served model failed to load in worker: {report['errors']}")
+        serving = bundle
+
+
+async def reload_model(model_path: Path) -> dict:
+    """
+    Validates model_path and, if it passes, swaps it in: the prepared bundle (model,
+    warmed forecaster, version) replaces the served one in one assignment, then the
+    worker pool is replaced by one whose workers load it too. Requests in flight
+    finish on the model they started with.
+    """
+    global serving
+    async with model_reload_lock:
+        candidate, report = await asyncio.to_thread(prepare_serving_model, model_path, FEATURE_COLS, warm_years())
+        if candidate is None:
+            MODEL_RELOADS.inc(1, "rejected")
+            model_state["last_rejected"] = {**report, "at": time.time()}
+            return {"reloaded": False, **report}
+
+        try:
+            await asyncio.to_thread(executor.restart, init_strategy_worker, (str(candidate.path),))
+        except Exception as e:
+            MODEL_RELOADS.inc(1, "rejected")
+            report = {**report, "ok": False, "errors": [f"worker pool failed to start: {type(e).__name__}: {e}"]}
+            model_state["last_rejected"] = {**report, "at": time.time()}
+            return {"reloaded": False, **report}
+
+        previous = serving.version
+        serving = candidate
+        # Keys carry the model version, so old results no longer match; free them now
+        result_cache.clear()
+        MODEL_RELOADS.inc(1, "swapped")
+        model_state["last_reload"] = {"version": candidate.version, "previous_version": previous, "at": time.time()}
+        return {"reloaded": True, "previous_version": previous, **report}
+
+
+async def watch_model(interval_s: float):
+    """
+    Reloads the served model file once a new version has stayed unchanged for one
+    interval (so a file still being written is not picked up); a version that
+    failed validation is not retried.
+    """
+    seen = serving.version
+    while True:
+        await asyncio.sleep(interval_s)
+        current = file_version(serving.path)
+        rejected = (model_state["last_rejected"] or {}).get("version")
+        if current == seen and current not in (serving.version, rejected):
+            await reload_model(serving.path)
+        seen = current
+
+
+class ModelFileRequest(BaseModel):
+    # File name under models/; defaults to the served model's file
+    model_file: Optional[str] = None
+
+
+def require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def requested_model_path(req: ModelFileRequest) -> Path:
+    if not req.model_file:
+        return serving.path
+    models_dir = (MODELS_BASE_DIR / "models").resolve()
+    path = (models_dir / req.model_file).resolve()
+    if path.parent != models_dir or path.suffix != ".pkl":
+        raise HTTPException(status_code=422, detail="model_file must be a .pkl file in the models directory")
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Model file not found")
+    return path
+
+
+@app.get("/admin/model")
+def model_info(request: Request):
+    require_admin(request)
+    return {"version": serving.version, "path": str(serving.path), **model_summary(serving.model), **model_state}
+
+
+@app.post("/admin/model/validate")
+async def validate_model(req: ModelFileRequest, request: Request):
+    require_admin(request)
+    _, report = await asyncio.to_thread(
+        prepare_serving_model, requested_model_path(req), FEATURE_COLS, warm_years(), export=False
+    )
+    return report
+
+
+@app.post("/admin/model/reload")
+async def reload_model_endpoint(req: ModelFileRequest, request: Request):
+    require_admin(request)
+    result = await reload_model(requested_model_path(req))
+    if not result["reloaded"]:
+        return JSONResponse(jsonable_encoder(result), status_code=422)
+    return result
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
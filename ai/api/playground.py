@@ -1,7 +1,8 @@
 import pandas as pd
-import numpy as np
 import joblib
 
+from strategy.pricing import supplier_price, retail_price, HOLDING_COST_PER_DAY
+
 sales_df = pd.read_csv("sales_transactions.csv")
 sales_df["sold_date"] = pd.to_datetime(sales_df["sold_date"])
 
@@ -22,37 +23,6 @@ monthly_encoded = pd.get_dummies(monthly, columns=["item_name"])
 X_monthly_cols = monthly_encoded.drop(columns=["total_quantity", "sold_date"]).columns
 
 
-def supplier_price(item, date):
-    base = 0.30
-
-    if date.day >= 25:
-        return round(base * 0.80, 2)  # 20% discount
-
-    if date.month == 11:
-        return round(base * 0.75, 2)
-
-    if np.random.rand() < 0.03:
-        return round(base * 0.70, 2)
-
-    return base
-
-def retail_price(item, date):
-    base = 0.50
-
-    if date.month == 12:
-        return round(base * 1.40, 2)
-
-    if date.month == 4:
-        return round(base * 1.25, 2)
-
-    if date.month in [6, 7, 8]:
-        return round(base * 1.10, 2)
-
-    return base
-
-HOLDING_COST_PER_DAY = 0.005  # 0.5% per day
-
-
 def predict_monthly_demand(item, year, month):
     row = {"month": month, "year": year}
     for col in X_monthly_cols:
@@ -1,2 +1,3 @@
 from .demand import DemandForecaster, observed_daily_velocity_from_sales
 from .optimizer import optimized_buy_decision
+from .sales_index import SalesIndex
@@ -0,0 +1,291 @@
+"""
+Microbenchmarks for the strategy hot paths on generated data.
+
+    python -m strategy.bench run [--scale quick|full] [--out results.json]
+    python -m strategy.bench compare baseline.json results.json [--threshold 0.25]
+
+run generates sales for each (items, years of history) scale, trains a small
+monthly demand forest on it (exported flat, as the API loads it) and times:
+build_monthly_frame, observed velocity (observed_daily_velocity_from_sales scan,
+SalesIndex and the ColumnarSales snapshot the API serves from),
+DemandForecaster.predict_daily_velocity, yearly_buy_analysis and
+portfolio_buy_analysis (whole catalog, per months_ahead), simulate_plan,
+optimized_buy_decision and replenishment_plan (per horizon_days).
+
+compare exits with status 1 when any benchmark's median time grew by more than
+the threshold (0.25 = 25% slower) relative to the baseline file, or when a baseline
+benchmark is missing from the results (unless excluded by the run's --only).
+Benchmarks new since the baseline are listed but do not fail.
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .columnar_sales import ColumnarSales
+from .data import build_monthly_frame
+from .demand import DemandForecaster, observed_daily_velocity_from_sales
+from .forest import export_forest, flat_path, load_model
+from .optimizer import optimized_buy_decision
+from .replenishment import replenishment_plan
+from .sales_index import SalesIndex
+from .simulator import simulate_plan
+from .snapshot import build_snapshot
+from .strategy import portfolio_buy_analysis, yearly_buy_analysis
+
+SCALES = {
+    "quick": {"items": [10, 40], "years": [1, 3], "months_ahead": [3, 12], "horizon_days": [14, 90]},
+    "full": {"items": [10, 40, 200], "years": [1, 3, 5], "months_ahead": [3, 12], "horizon_days": [14, 90, 365]},
+}
+SALES_PER_ITEM_DAY = 2.0
+TODAY = pd.Timestamp("2025-01-15")
+MIN_SAMPLE_S = 0.05
+
+
+def make_sales(n_items: int, years: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic transactions (item_name, sold_date, quantity_sold) for the years before TODAY,
+    with a yearly season per item.
+    """
+    rng = np.random.default_rng(seed)
+    first = np.datetime64((TODAY - pd.DateOffset(years=years)).date(), "D")
+    n_days = int((np.datetime64(TODAY.date(), "D") - first).astype(int))
+    n_rows = int(n_items * n_days * SALES_PER_ITEM_DAY)
+
+    item = rng.integers(0, n_items, size=n_rows)
+    day = rng.integers(0, n_days, size=n_rows)
+    season = 1.0 + 0.5 * np.sin(2 * np.pi * (day / 365.25 + item / n_items))
+    return pd.DataFrame({
+        "item_name": pd.Categorical.from_codes(item, [f"Item {i:04d}" for i in range(n_items)]),
+        "sold_date": (first + day).astype("datetime64[ns]"),
+        "quantity_sold": rng.poisson(4 * season) + 1,
+    })
+
+
+def train_small_model(monthly_df: pd.DataFrame, out_dir: Path):
+    """
+    A 30-tree monthly demand forest saved as .pkl + flat export; returns (model path, feature cols).
+    """
+    import joblib
+    from sklearn.ensemble import RandomForestRegressor
+
+    encoded = pd.get_dummies(monthly_df, columns=["item_name"])
+    X = encoded.drop(columns=["total_quantity", "sold_date"])
+    model = RandomForestRegressor(n_estimators=30, max_depth=10, random_state=42, n_jobs=1)
+    model.fit(X, encoded["total_quantity"])
+
+    path = Path(out_dir) / "monthly_demand_model.pkl"
+    joblib.dump(model, path)
+    export_forest(model, flat_path(path), path)
+    return path, X.columns
+
+
+def measure(fn, repeat: int = 5) -> dict:
+    """
+    Per-call seconds over `repeat` samples; each sample loops fn until it takes MIN_SAMPLE_S.
+    """
+    fn()
+    number, elapsed = 1, 0.0
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_SAMPLE_S:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(MIN_SAMPLE_S / elapsed) + 1)
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        "median_s": float(np.median(samples)),
+        "min_s": float(np.min(samples)),
+        "calls_per_sample": number,
+    }
+
+
+def benchmarks(scale: dict, workdir: Path):
+    """
+    Yields (name, params, fn) for every benchmark at every point of the scale grid.
+    """
+    for n_items in scale["items"]:
+        for years in scale["years"]:
+            sales_df = make_sales(n_items, years)
+            params = {"items": n_items, "years": years, "rows": len(sales_df)}
+            items = list(sales_df["item_name"].cat.categories)
+            rng = np.random.default_rng(1)
+
+            yield "build_monthly_frame", params, lambda df=sales_df: build_monthly_frame(df)
+
+            def observed(df=sales_df, items=items, rng=rng):
+                return observed_daily_velocity_from_sales(df, items[rng.integers(len(items))], TODAY, lookback_days=7)
+            yield "observed_daily_velocity_from_sales", params, observed
+
+            index = SalesIndex(sales_df)
+
+            def indexed(index=index, items=items, rng=rng):
+                return index.observed_daily_velocity(items[rng.integers(len(items))], TODAY, lookback_days=7)
+            yield "SalesIndex.observed_daily_velocity", params, indexed
+
+            snapshot_dir = Path(workdir) / f"snapshot-{n_items}-{years}"
+            csv_path = snapshot_dir.with_suffix(".csv")
+            sales_df.to_csv(csv_path, index=False)
+            build_snapshot(csv_path, snapshot_dir, sales_df=sales_df)
+            columnar = ColumnarSales(snapshot_dir)
+
+            def snapshot(columnar=columnar, items=items, rng=rng):
+                return columnar.observed_daily_velocity(items[rng.integers(len(items))], TODAY, lookback_days=7)
+            yield "ColumnarSales.observed_daily_velocity", params, snapshot
+
+            # Model-backed benchmarks depend only on the item count: run them on the longest history
+            if years != max(scale["years"]):
+                continue
+            monthly_df = build_monthly_frame(sales_df)
+            model_path, feature_cols = train_small_model(monthly_df, workdir)
+            forecaster = DemandForecaster(str(model_path), feature_cols)
+            forecaster.warm(TODAY.year, TODAY.year + 1)
+            model = load_model(model_path)
+            item_params = {"items": n_items}
+
+            def predict(forecaster=forecaster, items=items, rng=rng):
+                date = TODAY + pd.Timedelta(days=int(rng.integers(365)))
+                return forecaster.predict_daily_velocity(items[rng.integers(len(items))], date)
+            yield "DemandForecaster.predict_daily_velocity", item_params, predict
+
+            for months_ahead in scale["months_ahead"]:
+                yield (
+                    "yearly_buy_analysis",
+                    {**item_params, "months_ahead": months_ahead},
+                    lambda m=months_ahead: yearly_buy_analysis(items[0], TODAY, m, model, feature_cols),
+                )
+                yield (
+                    "portfolio_buy_analysis",
+                    {**item_params, "months_ahead": months_ahead},
+                    lambda m=months_ahead: portfolio_buy_analysis(items, TODAY, m, model, feature_cols),
+                )
+
+            for horizon_days in scale["horizon_days"]:
+                horizon = {**item_params, "horizon_days": horizon_days}
+                yield "simulate_plan", horizon, lambda h=horizon_days: simulate_plan(
+                    items[0], TODAY, h, current_stock=40.0, buy_delay_days=3, buy_discount=0.05,
+                    buy_quantity=120.0, predicted_velocity_fn=forecaster.predict_daily_velocity,
+                )
+                yield "optimized_buy_decision", horizon, lambda h=horizon_days: optimized_buy_decision(
+                    items[0], TODAY, current_stock=40.0, observed_weekly_daily_velocity=6.0,
+                    predicted_daily_velocity_fn=forecaster.predict_daily_velocity,
+                    x=100.0, discount_x=0.03, y=50.0, discount_x_plus_y=0.08, horizon_days=h,
+                )
+                yield "replenishment_plan", horizon, lambda h=horizon_days: replenishment_plan(
+                    items[0], TODAY, current_stock=40.0, observed_daily_velocity=6.0,
+                    predicted_daily_velocity_fn=forecaster.predict_daily_velocity,
+                    horizon_days=h, offer_tiers=[(100.0, 0.03), (150.0, 0.08)], order_cost=5.0,
+                )
+
+
+def benchmark_key(name: str, params: dict) -> str:
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items() if k != "rows") + "]"
+
+
+def run(scale_name: str = "quick", repeat: int = 5, only: str = None) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="strategy-bench-") as workdir:
+        for name, params, fn in benchmarks(SCALES[scale_name], Path(workdir)):
+            key = benchmark_key(name, params)
+            if only and only not in key:
+                continue
+            results[key] = {"name": name, "params": params, **measure(fn, repeat)}
+            print(f"{key:<72} {results[key]['median_s'] * 1e3:10.3f} ms", flush=True)
+
+    import sklearn
+    return {
+        "meta": {
+            "scale": scale_name,
+            "repeat": repeat,
+            "only": only,
+            "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.25):
+    """
+    (rows, regressions, added, missing): per common benchmark (key, baseline s, current s,
+    ratio), a regression being a ratio above 1 + threshold; keys only in the current
+    results; baseline keys absent from the current results that its --only did not exclude.
+    """
+    only = current.get("meta", {}).get("only")
+    added = [key for key in current["results"] if key not in baseline["results"]]
+    missing = [
+        key for key in baseline["results"]
+        if key not in current["results"] and (not only or only in key)
+    ]
+    rows, regressions = [], []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        ratio = result["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        rows.append((key, base["median_s"], result["median_s"], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(key)
+    return rows, regressions, added, missing
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Strategy package microbenchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_cmd.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    run_cmd.add_argument("--repeat", type=int, default=5)
+    run_cmd.add_argument("--only", default=None, help="run only benchmarks whose key contains this text")
+    run_cmd.add_argument("--out", type=Path, default=Path("bench-results.json"))
+
+    compare_cmd = commands.add_parser("compare", help="fail when results regressed against a baseline")
+    compare_cmd.add_argument("baseline", type=Path)
+    compare_cmd.add_argument("current", type=Path)
+    compare_cmd.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.command == "run":
+        report = run(args.scale, args.repeat, args.only)
+        args.out.write_text(json.dumps(report, indent=2))
+        print(f"{len(report['results'])} benchmarks written to {args.out}")
+        return 0
+
+    rows, regressions, added, missing = compare(
+        json.loads(args.baseline.read_text()), json.loads(args.current.read_text()), args.threshold
+    )
+    for key, base, current, ratio in rows:
+        flag = "  REGRESSION" if key in regressions else ""
+        print(f"{key:<72} {base * 1e3:10.3f} -> {current * 1e3:10.3f} ms  x{ratio:5.2f}{flag}")
+    for key in added:
+        print(f"{key:<72} new, no baseline")
+    for key in missing:
+        print(f"{key:<72} MISSING from results")
+    print(f"{len(regressions)} of {len(rows)} benchmarks regressed by more than {args.threshold:.0%}, "
+          f"{len(added)} new, {len(missing)} missing")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import json
+from typing import Callable, Hashable, List, Optional
+
+from pydantic import BaseModel
+
+from .metrics import CACHE_EVENTS
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+def request_digest(*parts) -> str:
+    """
+    Stable key for parts (request models, dates, versions): the same in every process
+    whatever its hash seed, and the same whether defaults were sent or omitted.
+    """
+    payload = [p.model_dump(mode="json") if isinstance(p, BaseModel) else p for p in parts]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class SingleFlight:
+    """
+    Deduplicates identical in-flight async calls: while a call for `key` is running,
+    further callers with the same key await that call instead of starting their own.
+    """
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable):
+        """
+        Awaits fn() (a coroutine factory), or the already running call for key.
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        CACHE_EVENTS.inc(1, "single_flight", "miss" if task is None else "hit")
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        # Shield so one disconnecting caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "hit_rate": self.coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects keys submitted within window_s (or until max_batch distinct keys) and
+    resolves them all with one batch_fn(keys) -> values call, run off the event loop.
+    Identical keys within a window share one slot.
+    """
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], list],
+        window_s: float = 0.002,
+        max_batch: int = 1024,
+        name: str = "micro_batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.window_s = window_s
+        self.max_batch = max_batch
+
+        self._pending = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self.queries = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self.batched_keys = 0
+        self.max_batch_seen = 0
+        self.batch_size_counts = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+
+    async def submit(self, key: Hashable):
+        loop = asyncio.get_running_loop()
+        self.queries += 1
+        future = self._pending.get(key)
+        CACHE_EVENTS.inc(1, self.name, "miss" if future is None else "hit")
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            future = loop.create_future()
+            self._pending[key] = future
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    async def submit_many(self, keys) -> list:
+        return list(await asyncio.gather(*(self.submit(key) for key in keys)))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            asyncio.ensure_future(self._run(pending))
+
+    async def _run(self, pending: dict):
+        keys = list(pending)
+        self._record(len(keys))
+        try:
+            values = await asyncio.get_running_loop().run_in_executor(None, self.batch_fn, keys)
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, value in zip(pending.values(), values):
+            if not future.done():
+                future.set_result(value)
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.batched_keys += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+        bucket = next((b for b in BATCH_SIZE_BUCKETS if size <= b), BATCH_SIZE_BUCKETS[-1])
+        self.batch_size_counts[bucket] += 1
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "deduplicated": self.deduplicated,
+            "dedup_rate": self.deduplicated / self.queries if self.queries else 0.0,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_keys / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_size_counts": {f"le_{b}": n for b, n in self.batch_size_counts.items()},
+        }
@@ -0,0 +1,118 @@
+"""
+Sales history served straight from the published snapshot's memory-mapped arrays.
+
+Every API process (uvicorn --workers N) attaches read-only to the same files, so
+the history is held once in the page cache instead of once per process, and
+nothing is parsed or indexed at startup. Lookback queries use the snapshot's
+index arrays: rows are sorted by (item, day) with per-item offsets, and an
+(item, client) sorted copy of days and quantities covers per-client queries;
+a window is two binary searches inside the item's (or pair's) slice.
+"""
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import day_ordinals
+from .snapshot import read_manifest, snapshot_column, snapshot_sales_frame
+
+
+class ColumnarSales:
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.manifest = read_manifest(self.snapshot_dir)
+        categories = self.manifest["categories"]
+        self.items = categories["item_name"]
+        self.clients = categories.get("client_id")
+        self.has_clients = self.clients is not None
+        self.rows = self.manifest["rows"]
+
+        self._item_codes = {item: code for code, item in enumerate(self.items)}
+        self._client_codes = {client: code for code, client in enumerate(self.clients or [])}
+        # Plain ndarray views of the mappings: np.memmap slicing adds per-call overhead
+        self.sold_day = np.asarray(snapshot_column(self.snapshot_dir, "sales", "sold_day"))
+        self.quantity = np.asarray(snapshot_column(self.snapshot_dir, "sales", "quantity_sold"))
+        self.index = {
+            name: np.asarray(snapshot_column(self.snapshot_dir, "index", name))
+            for name in self.manifest["index_columns"]
+        }
+
+    def _slice(self, item: str, client_id: Optional[str]):
+        """
+        (days, quantities) of one item, or of one (item, client) pair, sorted by day.
+        """
+        code = self._item_codes.get(item)
+        if code is None:
+            return None
+        if client_id is None or not self.has_clients:
+            offsets = self.index["item_offsets"]
+            lo, hi = offsets[code], offsets[code + 1]
+            return self.sold_day[lo:hi], self.quantity[lo:hi]
+
+        client = self._client_codes.get(str(client_id))
+        if client is None:
+            return None
+        keys = self.index["pair_keys"]
+        key = code * len(self.clients) + client
+        pos = np.searchsorted(keys, key)
+        if pos == len(keys) or keys[pos] != key:
+            return None
+        lo, hi = self.index["pair_offsets"][pos], self.index["pair_offsets"][pos + 1]
+        return self.index["pair_sold_day"][lo:hi], self.index["pair_quantity"][lo:hi]
+
+    def quantity_between(
+        self,
+        item: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        client_id: Optional[str] = None,
+    ) -> float:
+        """
+        Total quantity sold with start <= sold_date <= end (same semantics as SalesIndex).
+        """
+        found = self._slice(item, client_id)
+        if found is None:
+            return 0.0
+        days, qty = found
+        start_day = int(day_ordinals(start))
+        if pd.Timestamp(start) != pd.Timestamp(start).normalize():
+            start_day += 1
+        lo = np.searchsorted(days, start_day, side="left")
+        hi = np.searchsorted(days, int(day_ordinals(end)), side="right")
+        return float(qty[lo:hi].sum(dtype=np.int64))
+
+    def observed_daily_velocity(
+        self,
+        item: str,
+        as_of: pd.Timestamp,
+        lookback_days: int = 7,
+        client_id: Optional[str] = None,
+    ) -> float:
+        start = as_of - pd.Timedelta(days=lookback_days)
+        return self.quantity_between(item, start, as_of, client_id=client_id) / float(lookback_days)
+
+    def frame(self) -> pd.DataFrame:
+        """
+        The history as a compact-layout DataFrame over the mapped columns (no copy).
+        """
+        return snapshot_sales_frame(self.snapshot_dir, self.manifest)
+
+    def memory_report(self) -> dict:
+        """
+        Bytes of each mapped array; shared by every process attached to the snapshot.
+        """
+        columns = {
+            f"{prefix}.{name}": int(snapshot_column(self.snapshot_dir, prefix, name).nbytes)
+            for prefix, names in (("sales", self.manifest["sales_columns"]), ("index", self.manifest["index_columns"]))
+            for name in names
+        }
+        total = sum(columns.values())
+        return {
+            "rows": self.rows,
+            "columns": columns,
+            "total_bytes": total,
+            "bytes_per_row": round(total / self.rows, 2) if self.rows else 0.0,
+            "shared": True,
+            "snapshot_dir": str(self.snapshot_dir),
+        }
@@ -1,28 +1,154 @@
-import pandas as pd
-import pandas as pd
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
 # Project root: PythonProject/
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-def load_sales_data(relative_path: str = "app/sales_transactions.csv") -> pd.DataFrame:
+# Columns kept by the compact loader (the others are unused by the strategy code)
+COMPACT_COLUMNS = ("item_name", "category", "client_id", "quantity_sold", "sold_date")
+CATEGORICAL_COLUMNS = ("item_name", "category", "client_id")
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+
+def load_sales_data(
+    relative_path: str = "app/sales_transactions.csv",
+    compact: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Parsed sales transactions.
+
+    compact=True streams the CSV in chunks of chunk_rows and keeps only COMPACT_COLUMNS:
+    categorical item_name/category/client_id, the smallest integer dtype for
+    quantity_sold and an int32 sold_day ordinal in place of sold_date.
+    """
     csv_path = BASE_DIR / relative_path
 
     if not csv_path.exists():
         raise FileNotFoundError(f"Sales CSV not found at: {csv_path}")
 
+    if compact:
+        return read_compact_sales(csv_path, chunk_rows=chunk_rows)
+
     df = pd.read_csv(csv_path)
     df["sold_date"] = pd.to_datetime(df["sold_date"])
     return df
 
 
+def read_compact_sales(
+    csv_path: Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    columns=COMPACT_COLUMNS,
+    start_offset: int = 0,
+) -> pd.DataFrame:
+    """
+    Chunked CSV reader behind load_sales_data(compact=True); peak memory is the
+    compact result plus one chunk. start_offset > 0 (a line start) parses only the
+    rows from that byte on, e.g. the rows appended since an earlier read.
+    """
+    parts = {}
+    with open(csv_path, "rb") as f:
+        names = f.readline().decode().strip().split(",")
+        f.seek(start_offset or 0)
+        chunks = pd.read_csv(
+            f,
+            header=0 if not start_offset else None,
+            names=names,
+            usecols=lambda col: col in columns,
+            dtype={col: "category" for col in CATEGORICAL_COLUMNS},
+            chunksize=chunk_rows,
+        )
+        for chunk in chunks:
+            for col in chunk.columns:
+                if col == "sold_date":
+                    values = day_ordinals(pd.to_datetime(chunk[col])).astype(np.int32)
+                    parts.setdefault("sold_day", []).append(values)
+                elif col in CATEGORICAL_COLUMNS:
+                    parts.setdefault(col, []).append(chunk[col].array)
+                else:
+                    values = chunk[col].to_numpy()
+                    parts.setdefault(col, []).append(values.astype(smallest_int(values)))
+
+    if not parts:
+        return pd.DataFrame({col: [] for col in ("item_name", "quantity_sold", "sold_day")})
+
+    data = {}
+    for col, values in parts.items():
+        if col in CATEGORICAL_COLUMNS:
+            data[col] = union_categoricals(values, sort_categories=True)
+        else:
+            merged = np.concatenate(values)
+            data[col] = merged.astype(smallest_int(merged)) if col == "quantity_sold" else merged
+    return pd.DataFrame(data, copy=False)
+
+
+def smallest_int(values: np.ndarray):
+    """
+    Narrowest signed integer dtype that holds every value.
+    """
+    if not len(values):
+        return np.int16
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= values.min() and values.max() <= info.max:
+            return dtype
+    return np.int64
+
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """
+    Bytes held by each column (deep, i.e. including string payloads), the total and bytes per row.
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    total = int(usage.sum())
+    return {
+        "rows": len(df),
+        "columns": {col: int(nbytes) for col, nbytes in usage.items()},
+        "total_bytes": total,
+        "bytes_per_row": round(total / len(df), 2) if len(df) else 0.0,
+    }
+
+
+def day_ordinals(dates) -> np.ndarray:
+    """
+    Days since 1970-01-01 for a date or array-like of dates.
+    """
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def sale_days(sales_df: pd.DataFrame) -> np.ndarray:
+    """
+    Day ordinals of each sale, from either layout: sold_day (compact) or sold_date.
+    """
+    if "sold_day" in sales_df.columns:
+        return sales_df["sold_day"].to_numpy().astype(np.int64)
+    return day_ordinals(sales_df["sold_date"])
+
+
+def sale_months(sales_df: pd.DataFrame) -> pd.Series:
+    """
+    Monthly period of each sale, named sold_date as in build_monthly_frame.
+    """
+    if "sold_day" not in sales_df.columns:
+        return sales_df["sold_date"].dt.to_period("M")
+    months = sale_days(sales_df).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    periods = pd.arrays.PeriodArray(months, dtype=pd.PeriodDtype("M"))
+    return pd.Series(periods, index=sales_df.index, name="sold_date")
+
+
 def build_monthly_frame(sales_df: pd.DataFrame) -> pd.DataFrame:
     monthly = (
         sales_df
-        .groupby(["item_name", sales_df["sold_date"].dt.to_period("M")])
+        .groupby(["item_name", sale_months(sales_df)], observed=True)
         .agg(total_quantity=("quantity_sold", "sum"))
         .reset_index()
     )
+    if isinstance(monthly["item_name"].dtype, pd.CategoricalDtype):
+        monthly["item_name"] = monthly["item_name"].astype(str)
+    monthly["total_quantity"] = monthly["total_quantity"].astype(np.int64)
     monthly["month"] = monthly["sold_date"].dt.month
     monthly["year"] = monthly["sold_date"].dt.year
     return monthly
@@ -1,30 +1,135 @@
-import joblib
+import threading
+
+import numpy as np
 import pandas as pd
 
 from pathlib import Path
-import joblib
+
+from .data import day_ordinals
+from .metrics import count_inference, stage
 
 BASE_DIR = Path(__file__).resolve().parents[1]  
 
+ITEM_PREFIX = "item_name_"
+
+def month_ordinals(dates) -> np.ndarray:
+    """
+    Months since 1970-01 for a date or array-like of dates.
+    """
+    return np.asarray(dates, dtype="datetime64[M]").astype(np.int64)
+
 class DemandForecaster:
-    def __init__(self, monthly_model_path: str, monthly_feature_cols):
-        model_path = BASE_DIR / monthly_model_path
-        self.model = joblib.load(model_path)
+    """
+    Monthly demand forecaster backed by a precomputed item x month table.
+
+    The model's only inputs are (item one-hot, year, month), so every item for a
+    whole year is predicted with one batched model.predict the first time that
+    year is needed; later lookups are plain array indexing.
+    """
+    def __init__(self, monthly_model_path: str, monthly_feature_cols, model=None):
+        if model is None:
+            # Imported here so `python -m strategy.forest` does not pre-import itself via the package
+            from .forest import load_model
+            model = load_model(BASE_DIR / monthly_model_path)
+        self.model = model
         self.monthly_feature_cols = monthly_feature_cols
 
+        self.items = [col[len(ITEM_PREFIX):] for col in monthly_feature_cols if col.startswith(ITEM_PREFIX)]
+        self._item_index = {item: i for i, item in enumerate(self.items)}
+        # Unknown items map to the extra last row (all one-hot columns zero)
+        self._unknown_item = len(self.items)
 
-    def predict_monthly_demand(self, item: str, year: int, month: int) -> float:
-        row = {"month": month, "year": year}
+        # (first year, array[n_items + 1, n_years * 12]); swapped atomically
+        self._table = (0, np.empty((len(self.items) + 1, 0)))
+        self._lock = threading.Lock()
+
+    def _features(self, item_codes, year_col, month_col) -> pd.DataFrame:
+        X = pd.DataFrame({"month": month_col, "year": year_col})
         for col in self.monthly_feature_cols:
-            if col.startswith("item_name_"):
-                row[col] = int(col == f"item_name_{item}")
-        X = pd.DataFrame([row])
-        return float(self.model.predict(X)[0])
+            if col.startswith(ITEM_PREFIX):
+                X[col] = (item_codes == self._item_index[col[len(ITEM_PREFIX):]]).astype(int)
+        return X[list(self.monthly_feature_cols)]
+
+    def _predict_years(self, years) -> np.ndarray:
+        years = np.asarray(years)
+        n_rows = len(self.items) + 1
+        item_codes = np.repeat(np.arange(n_rows), len(years) * 12)
+        year_col = np.tile(np.repeat(years, 12), n_rows)
+        month_col = np.tile(np.arange(1, 13), n_rows * len(years))
+        X = self._features(item_codes, year_col, month_col)
+
+        count_inference("monthly_demand", len(X))
+        with stage("forecaster.predict"):
+            return np.asarray(self.model.predict(X), dtype=float).reshape(n_rows, len(years) * 12)
+
+    def warm(self, first_year: int, last_year: int):
+        """
+        Ensures the forecast table covers first_year..last_year (inclusive).
+        """
+        table_first, table = self._table
+        table_last = table_first + table.shape[1] // 12 - 1
+        if table.shape[1] and table_first <= first_year and last_year <= table_last:
+            return
+
+        with self._lock:
+            table_first, table = self._table
+            if not table.shape[1]:
+                self._table = (first_year, self._predict_years(np.arange(first_year, last_year + 1)))
+                return
+
+            table_last = table_first + table.shape[1] // 12 - 1
+            parts = [table]
+            if first_year < table_first:
+                parts.insert(0, self._predict_years(np.arange(first_year, table_first)))
+            if last_year > table_last:
+                parts.append(self._predict_years(np.arange(table_last + 1, last_year + 1)))
+            self._table = (min(first_year, table_first), np.concatenate(parts, axis=1))
+
+    def predict_many(self, items, dates) -> np.ndarray:
+        """
+        Monthly demand for each (item, date) pair; items and dates broadcast together.
+        """
+        codes = np.vectorize(
+            lambda item: self._item_index.get(item, self._unknown_item), otypes=[np.int64]
+        )(np.asarray(items, dtype=object))
+        months = month_ordinals(dates)
+        if months.size:
+            self.warm(int(months.min()) // 12 + 1970, int(months.max()) // 12 + 1970)
+
+        table_first, table = self._table
+        return table[codes, months - (table_first - 1970) * 12]
+
+    def predict_monthly_demand(self, item: str, year: int, month: int) -> float:
+        self.warm(year, year)
+        table_first, table = self._table
+        code = self._item_index.get(item, self._unknown_item)
+        return float(table[code, (year - table_first) * 12 + month - 1])
 
     def predict_daily_velocity(self, item: str, date: pd.Timestamp) -> float:
         monthly = self.predict_monthly_demand(item, date.year, date.month)
         return monthly / 30.0
 
+    def predict_daily_velocities(self, item: str, dates) -> np.ndarray:
+        """
+        Vectorized predict_daily_velocity over an array of dates.
+        """
+        return self.predict_many(item, dates) / 30.0
+
+    def predict_tree_daily_velocities(self, item: str, dates) -> np.ndarray:
+        """
+        (n_trees, len(dates)) daily velocity according to each tree of the forest;
+        not cached, one small predict per call.
+        """
+        from .forest import tree_predictions
+
+        months, index = np.unique(month_ordinals(dates), return_inverse=True)
+        codes = np.full(len(months), self._item_index.get(item, self._unknown_item))
+        X = self._features(codes, months // 12 + 1970, months % 12 + 1)
+
+        count_inference("monthly_demand_trees", len(X))
+        with stage("forecaster.predict_trees"):
+            return tree_predictions(self.model, X)[:, index.ravel()] / 30.0
+
 
 from typing import Optional
 import pandas as pd
@@ -44,7 +149,13 @@ def observed_daily_velocity_from_sales(
     """
     start = as_of - pd.Timedelta(days=lookback_days)
     df = sales_df[(sales_df["item_name"] == item)]
-    df = df[(df["sold_date"] >= start) & (df["sold_date"] <= as_of)]
+    if "sold_day" in df.columns:
+        # Compact layout: a sale on day d counts as midnight of d, as with sold_date
+        start = pd.Timestamp(start)
+        first_day = int(day_ordinals(start)) + int(start != start.normalize())
+        df = df[(df["sold_day"] >= first_day) & (df["sold_day"] <= int(day_ordinals(as_of)))]
+    else:
+        df = df[(df["sold_date"] >= start) & (df["sold_date"] <= as_of)]
 
     if client_id is not None and client_col in df.columns:
         df = df[df[client_col] == client_id]
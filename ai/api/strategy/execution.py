@@ -0,0 +1,129 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+class ExecutorBusy(Exception):
+    """Raised when the pool already has max_pending tasks outstanding."""
+
+
+def _ping():
+    return os.getpid()
+
+
+def restart_context():
+    # A running server has the event loop and helper threads going; forking it could copy
+    # a lock some other thread holds. forkserver children fork from a clean server process
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class StrategyExecutor:
+    """
+    Runs CPU-bound strategy work off the event loop.
+
+    - max_workers > 0: a process pool forked at startup, after the model and sales
+      data are loaded, so every worker starts warm and shares those pages copy-on-write
+    - max_workers == 0: a small thread pool (no extra processes, GIL-bound)
+
+    restart() replaces the pool while the server is running, so it never forks the
+    server: its workers come from a forkserver (spawn where unavailable) and set up
+    their state with an initializer.
+
+    Callers await run(); at most max_pending tasks may be outstanding (running or
+    queued, including ones whose caller already timed out) before ExecutorBusy.
+    """
+    def __init__(self, max_workers: int, max_pending: int, timeout_s: float):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_s = timeout_s
+        self.pool = None
+        self._outstanding = 0
+        self._lock = threading.Lock()
+
+    def start(self, mp_context=None, initializer=None, initargs=()):
+        if self.max_workers > 0:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp_context or multiprocessing.get_context("fork"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+            # Start every worker now rather than on the first requests
+            for f in [self.pool.submit(_ping) for _ in range(self.max_workers)]:
+                f.result()
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=4)
+
+    def restart(self, initializer=None, initargs=()):
+        """
+        Replaces the process pool with a new one whose workers run initializer(*initargs)
+        first (e.g. load a reloaded model); tasks already running on the old pool finish
+        there. If the new workers fail to start, the old pool stays and the error is
+        raised. Thread mode shares the server's state already.
+        """
+        if self.max_workers <= 0 or self.pool is None:
+            return
+        old = self.pool
+        try:
+            self.start(restart_context(), initializer, initargs)
+        except BaseException:
+            if self.pool is not old:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = old
+            raise
+        old.shutdown(wait=False)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    @property
+    def outstanding(self) -> int:
+        return self._outstanding
+
+    def _release(self, _future):
+        with self._lock:
+            self._outstanding -= 1
+
+    async def run(self, fn, *args, timeout_s: Optional[float] = None):
+        """
+        Dispatches fn(*args) to the pool and awaits its result.
+        Raises ExecutorBusy when the queue is full and asyncio.TimeoutError on timeout.
+        """
+        with self._lock:
+            if self._outstanding >= self.max_pending:
+                raise ExecutorBusy(f"{self._outstanding} strategy tasks already pending")
+            self._outstanding += 1
+
+        try:
+            future = self.pool.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout_s if timeout_s is not None else self.timeout_s
+            )
+        except asyncio.TimeoutError:
+            # Drop it if it has not started yet; a running task finishes in the background
+            future.cancel()
+            raise
+
+
+def executor_from_env() -> StrategyExecutor:
+    """
+    STRATEGY_WORKERS (default: CPU count), STRATEGY_MAX_PENDING (default: 8 per worker),
+    STRATEGY_TIMEOUT_S (default: 30).
+    """
+    workers = int(os.getenv("STRATEGY_WORKERS", os.cpu_count() or 1))
+    return StrategyExecutor(
+        max_workers=workers,
+        max_pending=int(os.getenv("STRATEGY_MAX_PENDING", 8 * max(workers, 1))),
+        timeout_s=float(os.getenv("STRATEGY_TIMEOUT_S", "30")),
+    )
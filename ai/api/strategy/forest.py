@@ -0,0 +1,266 @@
+"""
+Flattened, memory-mappable inference for the sklearn RandomForest models.
+
+export_forest() concatenates every tree's nodes into contiguous arrays
+(feature, threshold, left, right, value) stored as .npy files next to a small
+meta.json; FlatForest evaluates all trees for a batch of rows with vectorized
+traversal and reproduces model.predict exactly.
+
+    python -m strategy.forest models/monthly_demand_model.pkl [out_dir]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .locks import file_lock
+from .metrics import timed
+
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+META = "meta.json"
+
+
+def flat_path(model_path: Path) -> Path:
+    """
+    Default export location for a pickled model: models/x.pkl -> models/x.flat/
+    """
+    return Path(model_path).with_suffix(".flat")
+
+
+def export_lock(out_dir: Path) -> Path:
+    # Next to the export rather than inside it, so it exists before the first export
+    out_dir = Path(out_dir)
+    return out_dir.with_name(f".{out_dir.name}.lock")
+
+
+def export_forest(model, out_dir: Path, source_path: Path = None):
+    """
+    Writes a fitted RandomForestRegressor/RandomForestClassifier as flat arrays.
+    Leaves point to themselves, so traversal can run a fixed max_depth steps.
+
+    The export is written to a temporary directory first and then moved into out_dir
+    file by file, meta.json last, under the export lock; readers (load_model) take
+    the same lock shared, so they never see a half-replaced export.
+    """
+    out_dir = Path(out_dir)
+    out_dir.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(export_lock(out_dir)):
+        return _export(model, out_dir, source_path)
+
+
+def _export(model, out_dir: Path, source_path: Path = None) -> dict:
+    # Caller holds the export lock
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{out_dir.name}.", dir=out_dir.parent))
+    try:
+        meta = _write_export(model, tmp_dir, source_path)
+        # Every file is replaced, never rewritten in place: a running server may have the
+        # previous arrays memory-mapped, and truncating those files under it would crash it
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            os.replace(tmp_dir / f"{name}.npy", out_dir / f"{name}.npy")
+        os.replace(tmp_dir / META, out_dir / META)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return meta
+
+
+def _write_export(model, out_dir: Path, source_path: Path = None) -> dict:
+    is_classifier = hasattr(model, "classes_")
+
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n = tree.node_count
+        nodes = np.arange(n)
+        leaf = tree.children_left == -1
+
+        features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+        thresholds.append(np.where(leaf, 0.0, tree.threshold))
+        lefts.append((np.where(leaf, nodes, tree.children_left) + offset).astype(np.int32))
+        rights.append((np.where(leaf, nodes, tree.children_right) + offset).astype(np.int32))
+
+        if is_classifier:
+            # Same normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :].astype(float)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(proba / normalizer)
+        else:
+            values.append(tree.value[:, :, 0].astype(float))
+
+        roots.append(offset)
+        offset += n
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays = {
+        "feature": np.concatenate(features),
+        "threshold": np.concatenate(thresholds),
+        "left": np.concatenate(lefts),
+        "right": np.concatenate(rights),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+    meta = {
+        "kind": "classifier" if is_classifier else "regressor",
+        "n_trees": len(model.estimators_),
+        "n_nodes": offset,
+        "max_depth": int(max_depth),
+        "n_features": int(model.n_features_in_),
+        "feature_names": [str(c) for c in getattr(model, "feature_names_in_", [])],
+        "classes": model.classes_.tolist() if is_classifier else None,
+    }
+    if source_path is not None:
+        stat = Path(source_path).stat()
+        meta["source_size"], meta["source_mtime_ns"] = stat.st_size, stat.st_mtime_ns
+
+    for name, values in arrays.items():
+        np.save(out_dir / f"{name}.npy", values)
+    (out_dir / META).write_text(json.dumps(meta))
+    return meta
+
+
+class FlatForest:
+    """
+    Vectorized evaluation of an exported forest: all trees x all rows at once.
+    """
+    def __init__(self, arrays: dict, meta: dict):
+        self.meta = meta
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = meta["max_depth"]
+        self.n_trees = meta["n_trees"]
+        self.feature_names_in_ = np.asarray(meta["feature_names"], dtype=object) if meta["feature_names"] else None
+        self.classes_ = np.asarray(meta["classes"]) if meta["classes"] is not None else None
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "FlatForest":
+        path = Path(path)
+        meta = json.loads((path / META).read_text())
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in ARRAYS}
+        return cls(arrays, meta)
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names_in_ is not None:
+                X = X[list(self.feature_names_in_)]
+            X = X.to_numpy()
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf node index reached in every tree: (n_trees, n_rows).
+        """
+        X = self._matrix(X)
+        n_rows, n_features = X.shape
+        values = X.ravel()
+
+        node = np.repeat(self.roots, n_rows).astype(np.int64)
+        row_offset = np.tile(np.arange(n_rows, dtype=np.int64) * n_features, self.n_trees)
+        # Only paths that have not reached a leaf are advanced each step
+        active = np.arange(len(node))
+        for _ in range(self.max_depth):
+            current = node[active]
+            go_left = values[row_offset[active] + self.feature[current]] <= self.threshold[current]
+            nxt = np.where(go_left, self.left[current], self.right[current])
+            node[active] = nxt
+            active = active[nxt != current]
+            if not len(active):
+                break
+        return node.reshape(self.n_trees, n_rows)
+
+    def predict_trees(self, X) -> np.ndarray:
+        """
+        Per-tree outputs: (n_trees, n_rows) for regressors, (n_trees, n_rows, n_classes) for classifiers.
+        """
+        values = self.value[self.apply(X)]
+        return values[..., 0] if self.classes_ is None and values.shape[-1] == 1 else values
+
+    def _mean_over_trees(self, per_tree: np.ndarray) -> np.ndarray:
+        # Sequential accumulation in tree order, like the forest's own `out += prediction`
+        return np.cumsum(per_tree, axis=0)[-1] / self.n_trees
+
+    def predict_proba(self, X) -> np.ndarray:
+        return self._mean_over_trees(self.predict_trees(X))
+
+    def predict(self, X) -> np.ndarray:
+        if self.classes_ is not None:
+            return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+        return self._mean_over_trees(self.predict_trees(X))
+
+
+def tree_predictions(model, X) -> np.ndarray:
+    """
+    (n_trees, n_rows) outputs of a regression forest, flat or sklearn.
+    """
+    if isinstance(model, FlatForest):
+        return model.predict_trees(X)
+    X = np.asarray(X, dtype=np.float32)
+    return np.stack([tree.predict(X) for tree in model.estimators_])
+
+
+@timed("model_load")
+def load_model(model_path: Path, export_stale: bool = False):
+    """
+    Loads a pickled forest, preferring its flat export when one exists and is
+    up to date with the pickle; otherwise falls back to joblib.load.
+
+    export_stale=True writes a missing or outdated flat export first, so the model
+    is always served memory-mapped (processes loading it share its pages); a
+    read-only models directory falls back to the unpickled model.
+    """
+    model_path = Path(model_path)
+    flat = flat_path(model_path)
+    with file_lock(export_lock(flat), shared=True):
+        if flat_is_current(flat, model_path):
+            return FlatForest.load(flat)
+    model = joblib.load(model_path)
+    if export_stale and hasattr(model, "estimators_"):
+        try:
+            return export_and_load(model, model_path)
+        except OSError:
+            return model
+    return model
+
+
+def flat_is_current(flat: Path, model_path: Path) -> bool:
+    """
+    True when flat holds an export of the current model_path (or model_path is gone).
+    """
+    if not (flat / META).exists():
+        return False
+    meta = json.loads((flat / META).read_text())
+    stat = model_path.stat() if model_path.exists() else None
+    return stat is None or (meta.get("source_size"), meta.get("source_mtime_ns")) == (stat.st_size, stat.st_mtime_ns)
+
+
+def export_and_load(model, model_path: Path) -> "FlatForest":
+    """
+    Exports model (loaded from model_path) unless another process already did, and
+    memory-maps the export; one process exports while the others wait on the lock.
+    """
+    model_path = Path(model_path)
+    flat = flat_path(model_path)
+    with file_lock(export_lock(flat)):
+        if not flat_is_current(flat, model_path):
+            _export(model, flat, model_path)
+        return FlatForest.load(flat)
+
+
+if __name__ == "__main__":
+    source = Path(sys.argv[1])
+    out = Path(sys.argv[2]) if len(sys.argv) > 2 else flat_path(source)
+    meta = export_forest(joblib.load(source), out, source_path=source)
+    print(f"Exported {meta['n_trees']} trees / {meta['n_nodes']} nodes to {out}")
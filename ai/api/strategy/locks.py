@@ -0,0 +1,34 @@
+"""
+Cross-process file locks (fcntl.flock) for artifacts several API processes share:
+the sales snapshot and the flat model exports.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, concurrent builds just redo the work
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path, shared: bool = False):
+    """
+    Holds an exclusive (or shared) lock on the lock file at path while the block runs.
+    Where the lock file cannot be created (read-only deployment) the block runs unlocked:
+    nothing is written there anyway.
+    """
+    if fcntl is None:
+        yield
+        return
+    try:
+        lock = open(Path(path), "a")
+    except OSError:
+        yield
+        return
+    with lock:
+        fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
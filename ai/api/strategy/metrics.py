@@ -0,0 +1,243 @@
+"""
+In-process metrics: counters, fixed-bucket histograms and callback gauges,
+rendered in the Prometheus text exposition format.
+
+Recording is a dict lookup, a bisect and a lock (about a microsecond), cheap
+enough to leave on; STRATEGY_METRICS=0 turns stage timing off entirely.
+
+Work running in executor worker processes records into a per-call buffer
+instead of the (forked, private) worker registry: run_collected() returns the
+buffered records with the result and the API process merges them with
+REGISTRY.merge().
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Sequence, Tuple
+
+ENABLED = os.getenv("STRATEGY_METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, labels: Tuple, value: float):
+        buffer = getattr(_local, "buffer", None)
+        if buffer is not None:
+            buffer.append((self.name, labels, value))
+        else:
+            self._apply(labels, value)
+
+    def _apply(self, labels: Tuple, value: float):
+        raise NotImplementedError
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, *labels):
+        self._record(labels, amount)
+
+    def _apply(self, labels, value):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> list:
+        lines = self.header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        self._record(labels, value)
+
+    def _apply(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # per-bucket counts (last one is +Inf), sum, count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self) -> list:
+        lines = self.header()
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._values.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                label_text = _label_text(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {total:.9g}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """
+    Read at render time from a callback returning a number or {label tuple: number}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, fn: Callable, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def render(self) -> list:
+        lines = self.header()
+        values = self.fn()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {float(value):g}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric):
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge(self, name: str, help_text: str, fn: Callable, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help_text, fn, labelnames))
+
+    def merge(self, records):
+        """
+        Applies records buffered by run_collected (possibly in another process).
+        """
+        for name, labels, value in records:
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric._apply(tuple(labels), value)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "strategy_stage_seconds", "Wall time spent per processing stage.", ["stage"]
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "strategy_request_seconds", "End-to-end HTTP request latency.", ["endpoint"]
+)
+REQUESTS = REGISTRY.counter(
+    "strategy_requests_total", "HTTP requests by endpoint and status code.", ["endpoint", "status"]
+)
+CACHE_EVENTS = REGISTRY.counter(
+    "strategy_cache_events_total", "Cache and coalescing lookups by outcome (hit or miss).", ["cache", "result"]
+)
+MODEL_INFERENCES = REGISTRY.counter(
+    "strategy_model_inferences_total", "model.predict calls.", ["model"]
+)
+MODEL_ROWS = REGISTRY.counter(
+    "strategy_model_rows_total", "Rows passed to model.predict.", ["model"]
+)
+SIMULATED_PLAN_DAYS = REGISTRY.counter(
+    "strategy_simulated_plan_days_total", "Plan-days evaluated by the inventory simulator."
+)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the block into strategy_stage_seconds{stage=name}.
+    """
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - started, name)
+
+
+def timed(name: str):
+    """
+    Decorator form of stage().
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count_inference(model: str, rows: int):
+    MODEL_INFERENCES.inc(1, model)
+    MODEL_ROWS.inc(rows, model)
+
+
+def run_collected(fn, *args):
+    """
+    Runs fn(*args) with this thread's metrics buffered; returns (result, records).
+    Used as the executor task so worker-side timings reach the API process.
+    """
+    _local.buffer = records = []
+    try:
+        with stage(f"worker.{getattr(fn, '__name__', 'task').lstrip('_')}"):
+            result = fn(*args)
+    finally:
+        _local.buffer = None
+    return result, records
@@ -0,0 +1,104 @@
+"""
+Monte Carlo demand uncertainty for buy plans.
+
+Demand paths come from the forest itself: each path follows one randomly drawn
+tree's forecast (model uncertainty), blended with the observed velocity like
+blended_velocity_fn, and daily sales are Poisson draws around that rate
+(day-to-day noise). All paths x plans go through simulate_plans as one
+broadcast array computation, in path chunks that bound memory; the chunks are
+independent, so a caller can shard them with a process pool's map.
+"""
+from functools import partial
+
+import numpy as np
+
+from .simulator import simulate_plans
+
+DEFAULT_PATHS = 1000
+PERCENTILES = (5, 50, 95)
+
+
+def tree_demand_paths(
+    tree_daily_velocity: np.ndarray,
+    observed_velocity: float,
+    alpha_observed: float = 0.6,
+    n_paths: int = DEFAULT_PATHS,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    (n_paths, horizon) daily demand from (n_trees, horizon) per-tree velocities.
+    """
+    rng = np.random.default_rng(seed)
+    trees = rng.integers(0, tree_daily_velocity.shape[0], size=n_paths)
+    rate = alpha_observed * float(observed_velocity) + (1.0 - alpha_observed) * tree_daily_velocity[trees]
+    return rng.poisson(np.maximum(rate, 0.0)).astype(float)
+
+
+def _simulate_chunk(paths, supplier_prices, retail_prices, current_stock, plans, stockout_penalty_per_unit):
+    delay, discount, quantity = plans
+    batch = simulate_plans(
+        demand=paths[:, None, :],
+        supplier_prices=supplier_prices,
+        retail_prices=retail_prices,
+        current_stock=current_stock,
+        buy_delay_days=delay,
+        buy_discount=discount,
+        buy_quantity=quantity,
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+    )
+    return batch["profit"], batch["lost_units"]
+
+
+def simulate_paths(
+    paths: np.ndarray,
+    supplier_prices: np.ndarray,
+    retail_prices: np.ndarray,
+    current_stock: float,
+    buy_delay_days,
+    buy_discount,
+    buy_quantity,
+    stockout_penalty_per_unit: float = None,
+    max_cells: int = 1 << 18,
+    map_fn=map,
+):
+    """
+    Every plan on every demand path; returns (profit, lost_units), both (n_paths, n_plans).
+    map_fn runs the path chunks (pass a process pool's map to shard them).
+    """
+    plans = (
+        np.asarray(buy_delay_days, dtype=np.int64),
+        np.asarray(buy_discount, dtype=float),
+        np.asarray(buy_quantity, dtype=float),
+    )
+    rows = max(1, max_cells // max(plans[0].size * paths.shape[1], 1))
+    chunks = [paths[i:i + rows] for i in range(0, len(paths), rows)]
+    simulate = partial(
+        _simulate_chunk,
+        supplier_prices=supplier_prices,
+        retail_prices=retail_prices,
+        current_stock=current_stock,
+        plans=plans,
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+    )
+    results = list(map_fn(simulate, chunks))
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def plan_risk(profit: np.ndarray, lost_units: np.ndarray, percentiles=PERCENTILES) -> list:
+    """
+    Per plan (column): expected profit, profit percentiles, stockout probability
+    (share of paths losing any sale) and expected lost units.
+    """
+    quantiles = np.percentile(profit, percentiles, axis=0)
+    expected = profit.mean(axis=0)
+    stockout = (lost_units > 1e-9).mean(axis=0)
+    expected_lost = lost_units.mean(axis=0)
+    return [
+        {
+            "expected_profit": round(float(expected[j]), 2),
+            **{f"profit_p{p}": round(float(quantiles[i, j]), 2) for i, p in enumerate(percentiles)},
+            "stockout_probability": round(float(stockout[j]), 4),
+            "expected_lost_units": round(float(expected_lost[j]), 2),
+        }
+        for j in range(profit.shape[1])
+    ]
@@ -1,8 +1,17 @@
-import joblib
+from functools import lru_cache
 from pathlib import Path
 
+from .forest import load_model
+
 BASE_DIR = Path(__file__).resolve().parents[1]
 
-def load_monthly_demand_model():
-    model_path = BASE_DIR / "models" / "monthly_demand_model.pkl"
-    return joblib.load(model_path)
+MONTHLY_MODEL_PATH = BASE_DIR / "models" / "monthly_demand_model.pkl"
+
+def load_monthly_demand_model(model_path: Path = MONTHLY_MODEL_PATH):
+    # Served from the flat export (models/monthly_demand_model.flat/), written first if outdated
+    return load_model(model_path, export_stale=True)
+
+@lru_cache(maxsize=1)
+def load_buy_decision_model():
+    model_path = BASE_DIR / "models" / "buy_decision_model.pkl"
+    return load_model(model_path)
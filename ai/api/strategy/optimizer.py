@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
-from .simulator import simulate_plan
-from .pricing import supplier_price, retail_price
+from .simulator import simulate_restocks, plan_result
+from .montecarlo import plan_risk, simulate_paths
+from .pricing import supplier_price, retail_price, supplier_price_calendar, retail_price_calendar
 
 def blended_velocity_fn(
     predicted_daily_velocity_fn,
@@ -24,6 +26,206 @@ def compute_stockout_penalty_per_unit(item: str, date: pd.Timestamp) -> float:
     """
     return max(0.0, retail_price(item, date) - supplier_price(item, date))
 
+def plan_inputs(item: str, today: pd.Timestamp, horizon_days: int, velocity_fn):
+    """
+    Precomputes the day-indexed demand and price vectors consumed by simulate_plans.
+    """
+    dates = pd.date_range(today, periods=horizon_days)
+    demand = np.array([velocity_fn(item, d) for d in dates], dtype=float)
+    return demand, supplier_price_calendar(item, dates), retail_price_calendar(item, dates)
+
+def offer_discounts(quantities, offer_tiers) -> np.ndarray:
+    """
+    Supplier discount earned by each quantity: the best tier (min_quantity, discount)
+    it reaches, 0 below every tier.
+    """
+    quantities = np.asarray(quantities, dtype=float)
+    discount = np.zeros(quantities.shape)
+    for min_quantity, tier_discount in offer_tiers:
+        discount = np.where(quantities >= min_quantity, np.maximum(discount, tier_discount), discount)
+    return discount
+
+def quantity_grid(x: float, y: float, points: int = 8) -> np.ndarray:
+    """
+    Default order sizes: `points` even steps up to 2 * (x + y), plus the tier sizes x and x + y.
+    """
+    top = 2.0 * (x + y)
+    grid = np.concatenate([np.linspace(top / points, top, points), [x, x + y]])
+    return np.unique(np.round(grid[grid > 0]))
+
+def scenario_name(plan: dict) -> str:
+    if plan["buy_quantity"] == 0:
+        return "no_order"
+    delay = plan["buy_delay_days"]
+    when = "buy_now" if delay == 0 else f"wait_{delay}_days"
+    return f"{when}_qty_{plan['buy_quantity']:g}"
+
+def search_buy_plans(
+    demand: np.ndarray,
+    supplier_prices: np.ndarray,
+    retail_prices: np.ndarray,
+    current_stock: float,
+    delays,
+    quantities,
+    offer_tiers,
+    stockout_penalty_per_unit: float = None,
+    top_k: int = 5,
+    include_no_order: bool = True,
+):
+    """
+    Evaluates the single-restock plans delays x quantities (discount from offer_tiers),
+    plus the no-order baseline (quantity 0) unless include_no_order is False, and
+    returns (top_k plans best first, search stats). Raises ValueError for an empty
+    horizon or when there is no plan to evaluate.
+
+    Dominance pruning (exact): for a given delay, every quantity that covers all demand
+    left after the buy sells the same units, so within one discount tier only the
+    smallest such quantity can be optimal; the larger ones are never evaluated.
+    """
+    demand = np.asarray(demand, dtype=float)
+    if not len(demand):
+        raise ValueError("The horizon must have at least one day")
+    delays = np.asarray(delays, dtype=np.int64)
+    quantities = np.unique(np.asarray(quantities, dtype=float))
+    quantities = quantities[quantities > 0]
+    if not len(delays):
+        quantities = quantities[:0]
+    discounts = offer_discounts(quantities, offer_tiers)
+
+    # Units still needed after the buy day for each delay (demand left minus stock on hand)
+    cum = np.cumsum(demand)
+    demand_before = cum[delays] - demand[delays]
+    needed = np.maximum(cum[-1] - demand_before - np.maximum(current_stock - demand_before, 0.0), 0.0)
+
+    # delays x quantities, quantities ascending: covering starts at one column per row,
+    # keep it and every column where the tier changes
+    covers = quantities[None, :] >= needed[:, None]
+    new_tier = np.concatenate([[True], discounts[1:] != discounts[:-1]])
+    first_cover = covers & (new_tier | ~np.concatenate([np.zeros((len(delays), 1), bool), covers[:, :-1]], axis=1))
+    rows, cols = np.nonzero(~covers | first_cover)
+
+    # The no-order baseline goes first, so it wins ties against any order
+    baseline = [0] if include_no_order else []
+    buy_delay = np.concatenate([np.array(baseline, dtype=np.int64), delays[rows]])
+    buy_discount = np.concatenate([np.zeros(len(baseline)), discounts[cols]])
+    buy_quantity = np.concatenate([np.zeros(len(baseline)), quantities[cols]])
+    if not len(buy_quantity):
+        raise ValueError("No buy plans to evaluate: no delays or no positive order quantities")
+
+    plans = simulate_restocks(
+        demand=demand,
+        supplier_prices=supplier_prices,
+        retail_prices=retail_prices,
+        current_stock=current_stock,
+        buy_delay_days=buy_delay,
+        buy_discount=buy_discount,
+        buy_quantity=buy_quantity,
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+    )
+
+    # Stable sort over (delay, quantity) order: among equal profits the earlier, smaller order wins
+    best = np.argsort(-np.round(plans["profit"], 2), kind="stable")[:max(top_k, 1)]
+    candidates = len(delays) * len(quantities) + len(baseline)
+    stats = {"candidates": candidates, "evaluated": int(len(buy_quantity)), "pruned": int(candidates - len(buy_quantity))}
+    return [plan_result(plans, i) for i in best], stats
+
+MC_CANDIDATES = 20
+
+def rank_under_uncertainty(plans, demand_paths, supplier_prices, retail_prices, current_stock, stockout_penalty_per_unit):
+    """
+    Re-ranks plans by expected profit over demand paths; each plan gains a "risk" entry.
+    """
+    profit, lost_units = simulate_paths(
+        demand_paths, supplier_prices, retail_prices, current_stock,
+        buy_delay_days=[plan["buy_delay_days"] for plan in plans],
+        buy_discount=[plan["buy_discount"] for plan in plans],
+        buy_quantity=[plan["buy_quantity"] for plan in plans],
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+    )
+    for plan, risk in zip(plans, plan_risk(profit, lost_units)):
+        plan["risk"] = risk
+    return sorted(plans, key=lambda plan: -plan["risk"]["expected_profit"])
+
+def choose_buy_plan(
+    demand: np.ndarray,
+    supplier_prices: np.ndarray,
+    retail_prices: np.ndarray,
+    current_stock: float,
+    stockout_penalty_per_unit: float,
+
+    x: float,
+    discount_x: float,
+
+    y: float,
+    discount_x_plus_y: float,
+
+    emergency_days_cover: float = 2.0,
+    max_delay_days: int = None,
+    quantities=None,
+    offer_tiers=None,
+    top_k: int = 5,
+    demand_paths: np.ndarray = None,
+):
+    """
+    The decision of optimized_buy_decision from precomputed day vectors (demand[0] is
+    today's expected velocity); shared by the single and the batch endpoints.
+    """
+    demand = np.asarray(demand, dtype=float)
+    if not len(demand):
+        raise ValueError("horizon_days must be at least 1")
+    if max_delay_days is not None and max_delay_days < 0:
+        raise ValueError("max_delay_days must be at least 0")
+    if offer_tiers is None:
+        offer_tiers = [(x, discount_x), (x + y, discount_x_plus_y)]
+    quantities = quantity_grid(x, y) if quantities is None else np.asarray(quantities, dtype=float)
+    quantities = quantities[quantities > 0]
+    if not len(quantities):
+        # No order size given: consider ordering exactly the shortfall over the horizon
+        shortfall = np.ceil(demand.sum() - current_stock)
+        quantities = np.array([shortfall]) if shortfall > 0 else quantities
+
+    expected_daily = float(demand[0])
+    emergency = expected_daily > 0 and current_stock < emergency_days_cover * expected_daily
+    # In an emergency the order has to go out today, and not ordering is only an option
+    # when there is nothing to order
+    last_delay = len(demand) - 1 if max_delay_days is None else min(max_delay_days, len(demand) - 1)
+    delays = [0] if emergency else np.arange(last_delay + 1)
+
+    ranked, stats = search_buy_plans(
+        demand, supplier_prices, retail_prices, current_stock,
+        delays=delays,
+        quantities=quantities,
+        offer_tiers=offer_tiers,
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+        top_k=top_k if demand_paths is None else max(top_k, MC_CANDIDATES),
+        include_no_order=not (emergency and len(quantities)),
+    )
+    if demand_paths is not None:
+        ranked = rank_under_uncertainty(
+            ranked, demand_paths, supplier_prices, retail_prices, current_stock, stockout_penalty_per_unit
+        )[:max(top_k, 1)]
+        stats["paths"] = len(demand_paths)
+    best = ranked[0]
+
+    if best["buy_quantity"] == 0:
+        decision = "WAIT"
+    elif emergency:
+        decision = "EMERGENCY_BUY"
+    else:
+        decision = "BUY_NOW" if best["buy_delay_days"] == 0 else "WAIT"
+    result = {
+        "decision": decision,
+        "best_plan": best,
+        "alternatives": ranked[1:],
+        "scenarios": {scenario_name(plan): plan for plan in ranked},
+        "search": stats,
+    }
+    if decision == "EMERGENCY_BUY":
+        result["reason"] = f"Stock is below {emergency_days_cover} days of expected demand"
+    elif best["buy_quantity"] == 0:
+        result["reason"] = "Not ordering is the most profitable plan over the horizon"
+    return result
+
 def optimized_buy_decision(
     item: str,
     today: pd.Timestamp,
@@ -40,15 +242,33 @@ def optimized_buy_decision(
     horizon_days: int = 14,
     alpha_observed: float = 0.6,
     emergency_days_cover: float = 2.0,
+
+    max_delay_days: int = None,
+    quantities=None,
+    offer_tiers=None,
+    top_k: int = 5,
+    demand_paths: np.ndarray = None,
 ):
 
     """
-    Decision among:
-      - EMERGENCY_BUY (if you cannot cover N days of demand)
-      - BUY_NOW (3% discount, qty x, immediate)
-      - WAIT (10% discount, qty x+y, in 3 days)
+    Searches single-restock plans over buy delay (0..max_delay_days, default the whole
+    horizon) x order quantity (default quantity_grid(x, y)), each priced with the best
+    supplier offer tier it reaches (default: x units at discount_x, x+y at discount_x_plus_y),
+    against the no-order baseline.
+
+    Decision:
+      - EMERGENCY_BUY (if you cannot cover N days of demand): the best plan buying today
+      - BUY_NOW: the best plan buys today
+      - WAIT: the best plan buys later (best_plan["buy_delay_days"]), or not at all
+        (best_plan["buy_quantity"] == 0)
 
     emergency_days_cover: if current stock < emergency_days_cover * expected daily velocity => EMERGENCY
+    Returns the best plan, up to top_k - 1 alternatives and all of them as named scenarios.
+
+    demand_paths ((n_paths, horizon_days), see montecarlo.tree_demand_paths) turns on the
+    Monte Carlo mode: the MC_CANDIDATES best plans on the point forecast are simulated on
+    every path and ranked by expected profit, each with its profit percentiles and
+    stockout probability under "risk".
     """
     velocity = blended_velocity_fn(
         predicted_daily_velocity_fn=predicted_daily_velocity_fn,
@@ -56,58 +276,73 @@ def optimized_buy_decision(
         alpha_observed=alpha_observed,
     )
 
-    expected_daily = velocity(item, today)
-    if expected_daily > 0 and current_stock < emergency_days_cover * expected_daily:
-        # Emergency scenario: buy NOW but maybe larger (x+y) to reduce repeat emergencies
-        penalty = compute_stockout_penalty_per_unit(item, today)
-        emergency = simulate_plan(
-            item=item,
-            start_date=today,
-            horizon_days=horizon_days,
-            current_stock=current_stock,
-            buy_delay_days=0,
-            buy_discount=0.03,
-            buy_quantity=(x + y),
-            predicted_velocity_fn=velocity,
-            stockout_penalty_per_unit=penalty,
-        )
-        return {
-            "decision": "EMERGENCY_BUY",
-            "reason": f"Stock is below {emergency_days_cover} days of expected demand",
-            "scenarios": {"emergency_buy": emergency},
-        }
-
-    penalty = compute_stockout_penalty_per_unit(item, today)
-
-    buy_now = simulate_plan(
-        item=item,
-        start_date=today,
-        horizon_days=horizon_days,
-        current_stock=current_stock,
-        buy_delay_days=0,
-        buy_discount=discount_x,
-        buy_quantity=x,
-        predicted_velocity_fn=velocity,
-        stockout_penalty_per_unit=penalty,
+    if horizon_days < 1:
+        raise ValueError("horizon_days must be at least 1")
+    demand, supplier_prices, retail_prices = plan_inputs(item, today, horizon_days, velocity)
+    return choose_buy_plan(
+        demand, supplier_prices, retail_prices, current_stock,
+        stockout_penalty_per_unit=compute_stockout_penalty_per_unit(item, today),
+        x=x, discount_x=discount_x, y=y, discount_x_plus_y=discount_x_plus_y,
+        emergency_days_cover=emergency_days_cover,
+        max_delay_days=max_delay_days,
+        quantities=quantities,
+        offer_tiers=offer_tiers,
+        top_k=top_k,
+        demand_paths=demand_paths,
     )
 
-    wait_3 = simulate_plan(
-        item=item,
-        start_date=today,
-        horizon_days=horizon_days,
-        current_stock=current_stock,
-        buy_delay_days=3,
-        buy_discount=discount_x_plus_y,
-        buy_quantity=(x + y),
-        predicted_velocity_fn=velocity,
-        stockout_penalty_per_unit=penalty,
-    )
+def optimized_buy_decisions(
+    items,
+    today: pd.Timestamp,
+    current_stock,
+    observed_daily_velocity,
+    predicted_daily_velocity,
+
+    x,
+    discount_x,
+
+    y,
+    discount_x_plus_y,
+
+    horizon_days: int = 14,
+    alpha_observed: float = 0.6,
+    emergency_days_cover: float = 2.0,
+):
+    """
+    optimized_buy_decision for many items/stock levels at once.
+    - items, current_stock, observed_daily_velocity, x, discount_x, y, discount_x_plus_y: one entry per row
+    - predicted_daily_velocity: (rows, horizon_days) model velocity from today onwards
+
+    Demand and prices are computed for all rows at once; every row then runs the same
+    plan search as the single endpoint (choose_buy_plan), so both give the same decision.
+    Returns a columnar dict with each row's best plan.
+    """
+    if horizon_days < 1:
+        raise ValueError("horizon_days must be at least 1")
+    dates = pd.date_range(today, periods=horizon_days)
+    observed = np.asarray(observed_daily_velocity, dtype=float)
+    demand = alpha_observed * observed[:, None] + (1.0 - alpha_observed) * np.asarray(predicted_daily_velocity, dtype=float)
+
+    supplier_prices = np.stack([supplier_price_calendar(item, dates) for item in items])
+    retail_prices = np.stack([retail_price_calendar(item, dates) for item in items])
+    penalty = np.maximum(0.0, retail_prices[:, 0] - supplier_prices[:, 0])
+
+    results = [
+        choose_buy_plan(
+            demand[i], supplier_prices[i], retail_prices[i], float(current_stock[i]),
+            stockout_penalty_per_unit=float(penalty[i]),
+            x=float(x[i]), discount_x=float(discount_x[i]),
+            y=float(y[i]), discount_x_plus_y=float(discount_x_plus_y[i]),
+            emergency_days_cover=emergency_days_cover,
+            top_k=1,
+        )
+        for i in range(len(items))
+    ]
+    plan_keys = list(results[0]["best_plan"]) if results else []
 
-    decision = "BUY_NOW" if buy_now["profit"] >= wait_3["profit"] else "WAIT"
     return {
-        "decision": decision,
-        "scenarios": {
-            "buy_now": buy_now,
-            "wait_3_days": wait_3,
-        }
+        "item": list(items),
+        "decision": [result["decision"] for result in results],
+        "expected_daily_velocity": np.round(demand[:, 0], 4).tolist(),
+        "best_plan": {key: [result["best_plan"][key] for result in results] for key in plan_keys},
     }
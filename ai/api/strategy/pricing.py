@@ -1,31 +1,122 @@
+import os
+import zlib
+from functools import lru_cache
+
 import numpy as np
+import pandas as pd
+
+from .metrics import CACHE_EVENTS, stage
 
 HOLDING_COST_PER_DAY = 0.005  
 
-def supplier_price(item: str, date):
-    base = 0.30
+# Seed of the supplier promo draws; every strategy function prices from the same calendar
+PRICE_SEED = int(os.getenv("STRATEGY_PRICE_SEED", "0"))
+
+SUPPLIER_BASE = 0.30
+RETAIL_BASE = 0.50
+PROMO_PROBABILITY = 0.03
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def promo_draws(item: str, days: np.ndarray, seed: int = PRICE_SEED) -> np.ndarray:
+    """
+    Uniform [0, 1) draw per (item, day ordinal, seed). Counter-based, so a given day
+    gets the same draw whatever date range it is requested in.
+    """
+    key = _splitmix64(np.array([seed], dtype=np.uint64) * np.uint64(0x100000001) + np.uint64(zlib.crc32(item.encode())))
+    bits = _splitmix64(key + np.asarray(days, dtype=np.int64).astype(np.uint64))
+    return (bits >> np.uint64(11)).astype(float) / float(1 << 53)
+
+
+def _month_and_day(days: np.ndarray):
+    dates = np.asarray(days, dtype=np.int64).astype("datetime64[D]")
+    month_start = dates.astype("datetime64[M]")
+    month = (month_start - dates.astype("datetime64[Y]")).astype(int) + 1
+    day = (dates - month_start).astype(int) + 1
+    return month, day
+
+
+def supplier_prices(item: str, days: np.ndarray, seed: int = PRICE_SEED) -> np.ndarray:
+    """
+    Supplier price per day ordinal:
+    - day >= 25: 20% off
+    - November: 25% off
+    - otherwise a 3% chance of a 30% promo (seeded draw)
+    """
+    month, day = _month_and_day(days)
+    prices = np.full(month.shape, SUPPLIER_BASE)
+    prices[promo_draws(item, days, seed) < PROMO_PROBABILITY] = round(SUPPLIER_BASE * 0.70, 2)
+    prices[month == 11] = round(SUPPLIER_BASE * 0.75, 2)
+    prices[day >= 25] = round(SUPPLIER_BASE * 0.80, 2)
+    return prices
+
+
+def retail_prices(item: str, days: np.ndarray) -> np.ndarray:
+    """
+    Retail price per day ordinal: December +40%, April +25%, June-August +10%.
+    """
+    month, _ = _month_and_day(days)
+    prices = np.full(month.shape, RETAIL_BASE)
+    prices[np.isin(month, [6, 7, 8])] = round(RETAIL_BASE * 1.10, 2)
+    prices[month == 4] = round(RETAIL_BASE * 1.25, 2)
+    prices[month == 12] = round(RETAIL_BASE * 1.40, 2)
+    return prices
+
+
+@lru_cache(maxsize=1024)
+def price_calendar(item: str, first_day: int, n_days: int, seed: int = PRICE_SEED):
+    """
+    (supplier, retail) price arrays for n_days consecutive days from day ordinal first_day.
+    Cached per (item, date range, seed); the arrays are shared, hence read-only.
+    """
+    days = np.arange(first_day, first_day + n_days)
+    with stage("pricing.calendar"):
+        supplier = supplier_prices(item, days, seed)
+        retail = retail_prices(item, days)
+    supplier.setflags(write=False)
+    retail.setflags(write=False)
+    return supplier, retail
+
+
+def _calendar_for(item: str, dates, seed: int):
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    if not days.size:
+        empty = np.empty(days.shape)
+        return empty, empty
+    first = int(days.min())
+    misses = price_calendar.cache_info().misses
+    supplier, retail = price_calendar(item, first, int(days.max()) - first + 1, seed)
+    CACHE_EVENTS.inc(1, "price_calendar", "miss" if price_calendar.cache_info().misses != misses else "hit")
+    return supplier[days - first], retail[days - first]
+
 
-    if date.day >= 25:
-        return round(base * 0.80, 2) 
+def _day(date) -> np.ndarray:
+    return np.asarray([pd.Timestamp(date)], dtype="datetime64[D]").astype(np.int64)
 
-    if date.month == 11:
-        return round(base * 0.75, 2)
 
-    if np.random.rand() < 0.03:
-        return round(base * 0.70, 2)
+def supplier_price(item: str, date, seed: int = PRICE_SEED) -> float:
+    return float(supplier_prices(item, _day(date), seed)[0])
 
-    return base
 
-def retail_price(item: str, date):
-    base = 0.50
+def retail_price(item: str, date) -> float:
+    return float(retail_prices(item, _day(date))[0])
 
-    if date.month == 12:
-        return round(base * 1.40, 2)
 
-    if date.month == 4:
-        return round(base * 1.25, 2)
+def supplier_price_calendar(item: str, dates: pd.DatetimeIndex, seed: int = PRICE_SEED) -> np.ndarray:
+    """
+    Supplier prices for a range of dates, read from the cached calendar.
+    """
+    return _calendar_for(item, dates, seed)[0]
 
-    if date.month in [6, 7, 8]:
-        return round(base * 1.10, 2)
 
-    return base
+def retail_price_calendar(item: str, dates: pd.DatetimeIndex, seed: int = PRICE_SEED) -> np.ndarray:
+    """
+    Retail prices for a range of dates, read from the cached calendar.
+    """
+    return _calendar_for(item, dates, seed)[1]
@@ -0,0 +1,167 @@
+"""
+Opt-in profiling of single requests.
+
+Two modes:
+- "sample": a background thread samples the profiled thread's stack every
+  interval_s and counts collapsed stacks ("root;caller;callee count" lines, the
+  input format of flamegraph.pl / speedscope / inferno)
+- "cprofile": deterministic cProfile of the task; kept as pstats text
+  (sorted by cumulative time) plus caller->callee edges as collapsed stacks
+
+Work running in executor workers is profiled there by run_profiled(), which
+returns the profile next to the task's result and metrics records.
+"""
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from .metrics import run_collected
+
+MODES = ("sample", "cprofile")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval while active (context manager).
+    """
+    def __init__(self, thread_id: Optional[int] = None, interval_s: float = 0.001):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval_s = interval_s
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def collapsed(self, prefix: str = "") -> str:
+        prefix = prefix + ";" if prefix else ""
+        return "".join(f"{prefix}{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _cprofile_collapsed(stats: pstats.Stats, prefix: str = "") -> str:
+    """
+    cProfile only records caller->callee pairs, so each edge becomes a two-frame
+    stack weighted by the callee's time (in microseconds) attributed to that caller.
+    """
+    prefix = prefix + ";" if prefix else ""
+    lines = []
+    for (filename, line, name), (_, _, tottime, _, callers) in stats.stats.items():
+        callee = f"{name} ({os.path.basename(filename)}:{line})"
+        if not callers:
+            lines.append((f"{prefix}{callee}", tottime))
+        for (c_file, c_line, c_name), caller_stats in callers.items():
+            caller = f"{c_name} ({os.path.basename(c_file)}:{c_line})"
+            lines.append((f"{prefix}{caller};{callee}", caller_stats[2]))
+    return "".join(f"{stack} {int(seconds * 1e6)}\n" for stack, seconds in sorted(lines) if seconds > 0)
+
+
+def run_profiled(mode: str, interval_s: float, fn, *args):
+    """
+    run_collected(fn, *args) under the given profiler; returns (result, records, profile).
+    """
+    started = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result, records = run_collected(fn, *args)
+        finally:
+            profiler.disable()
+        stats = pstats.Stats(profiler)
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats("cumulative").print_stats(60)
+        profile = {"collapsed": _cprofile_collapsed(stats, "worker"), "pstats": text.getvalue(), "units": "microseconds"}
+    else:
+        with StackSampler(interval_s=interval_s) as sampler:
+            result, records = run_collected(fn, *args)
+        profile = {"collapsed": sampler.collapsed("worker"), "samples": sampler.samples, "units": "samples"}
+
+    profile.update(mode=mode, task=getattr(fn, "__name__", "task"), duration_s=time.perf_counter() - started)
+    return result, records, profile
+
+
+class ProfileStore:
+    """
+    The most recent max_profiles profiles, by id.
+    """
+    def __init__(self, max_profiles: int = 50):
+        self.max_profiles = max_profiles
+        self._profiles = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> str:
+        with self._lock:
+            profile_id = f"p{next(self._ids)}"
+            self._profiles[profile_id] = {"id": profile_id, "created": time.time(), **profile}
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+            return profile_id
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        return self._profiles.get(profile_id)
+
+    def summaries(self) -> list:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        keys = ("id", "created", "endpoint", "mode", "task", "duration_s")
+        return [{key: profile.get(key) for key in keys} for profile in reversed(profiles)]
+
+
+class ProfilingConfig:
+    """
+    STRATEGY_PROFILING=1 enables the hook (off by default); STRATEGY_PROFILE_MODE picks
+    the default mode, STRATEGY_PROFILE_INTERVAL_S the sampling interval and
+    STRATEGY_PROFILE_KEEP how many profiles are retained.
+    """
+    def __init__(self):
+        self.enabled = os.getenv("STRATEGY_PROFILING", "0") == "1"
+        self.default_mode = os.getenv("STRATEGY_PROFILE_MODE", "sample")
+        self.interval_s = float(os.getenv("STRATEGY_PROFILE_INTERVAL_S", "0.001"))
+        self.keep = int(os.getenv("STRATEGY_PROFILE_KEEP", "50"))
+
+    def requested_mode(self, header: Optional[str], query: Optional[str]) -> Optional[str]:
+        """
+        Mode asked for by an X-Profile header or ?profile= flag ("1"/"true" = default mode).
+        """
+        if not self.enabled:
+            return None
+        value = (header or query or "").strip().lower()
+        if value in ("", "0", "false", "no"):
+            return None
+        if value in MODES:
+            return value
+        return self.default_mode
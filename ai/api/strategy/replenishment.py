@@ -0,0 +1,172 @@
+"""
+Multi-order replenishment planning by dynamic programming over days.
+
+simulate_plan models one restock; plan_replenishment picks the profit-maximizing
+order (possibly none) for every day of the horizon. The state is the opening
+stock, discretized into n_levels + 1 evenly spaced levels; an order raises the
+stock to a level, so each day's decision is a target level >= the current one.
+
+Day economics are simulate_plans': an order arrives the day it is placed and is
+paid at that day's supplier price less the offer-tier discount, sales are
+min(stock, demand) at the retail price, end-of-day stock costs
+HOLDING_COST_PER_DAY * supplier price and lost units the stockout penalty.
+Stock left at the end of the horizon carries no value, as in simulate_plan.
+"""
+import numpy as np
+import pandas as pd
+
+from .metrics import timed
+from .optimizer import blended_velocity_fn, compute_stockout_penalty_per_unit, offer_discounts, plan_inputs
+from .pricing import HOLDING_COST_PER_DAY
+
+DEFAULT_LEVELS = 120
+COVER_DAYS = 30
+
+
+def default_max_stock(demand: np.ndarray, current_stock: float, offer_tiers, cover_days: int = COVER_DAYS) -> float:
+    """
+    Top of the stock grid: the largest cover_days demand window, the current stock
+    or the largest tier quantity, whichever is highest.
+    """
+    cum = np.concatenate([[0.0], np.cumsum(demand)])
+    window = min(cover_days, len(demand))
+    peak = float(np.max(cum[window:] - cum[:-window])) if window else 0.0
+    tiers = max((min_quantity for min_quantity, _ in offer_tiers), default=0.0)
+    return max(peak, float(current_stock), float(tiers), 1.0)
+
+
+@timed("replenishment")
+def plan_replenishment(
+    demand,
+    supplier_prices,
+    retail_prices,
+    current_stock: float,
+    offer_tiers=(),
+    order_cost: float = 0.0,
+    stockout_penalty_per_unit: float = None,
+    n_levels: int = DEFAULT_LEVELS,
+    max_stock: float = None,
+):
+    """
+    Backward pass: value[t, i] is the best profit from day t on opening with level i;
+    every (level, target level) pair of a day is scored at once as a
+    (n_levels + 1) x (n_levels + 1) array, so a day costs one vectorized argmax.
+
+    Forward pass: replays the policy from the exact current stock (off-grid stock
+    is kept as is; the next day's value is interpolated) and accounts the orders.
+    order_cost is a fixed cost per order (delivery, handling).
+    """
+    demand = np.asarray(demand, dtype=float)
+    supplier = np.asarray(supplier_prices, dtype=float)
+    retail = np.asarray(retail_prices, dtype=float)
+    holding_rate = HOLDING_COST_PER_DAY * np.maximum(supplier, 0.0001)
+    penalty = stockout_penalty_per_unit if stockout_penalty_per_unit is not None else 0.0
+    horizon = len(demand)
+
+    if max_stock is None:
+        max_stock = default_max_stock(demand, current_stock, offer_tiers)
+    levels = np.linspace(0.0, max_stock, n_levels + 1)
+
+    # Order of (target - level) grid steps: discounted unit cost x quantity, +inf below the level
+    steps = np.arange(n_levels + 1)
+    step_units = levels - levels[0]
+    step_cost = (1.0 - offer_discounts(step_units, offer_tiers)) * step_units
+    step_fixed = np.where(steps > 0, order_cost, 0.0)
+    gap = steps[None, :] - steps[:, None]
+    order_units_cost = np.where(gap >= 0, step_cost[np.maximum(gap, 0)], np.inf)
+    order_fixed = step_fixed[np.maximum(gap, 0)]
+
+    def day_value(t, opening, next_value):
+        sold = np.minimum(opening, demand[t])
+        end = opening - sold
+        reward = sold * retail[t] - end * holding_rate[t] - (demand[t] - sold) * penalty
+        return reward + np.interp(end, levels, next_value)
+
+    value = np.zeros((horizon + 1, n_levels + 1))
+    for t in range(horizon - 1, -1, -1):
+        after_order = day_value(t, levels, value[t + 1])
+        value[t] = np.max(after_order[None, :] - supplier[t] * order_units_cost - order_fixed, axis=1)
+
+    orders, stock_path = [], np.empty(horizon)
+    revenue = cogs = holding = fixed = lost_units = 0.0
+    stock = float(current_stock)
+    for t in range(horizon):
+        # Keep the stock, or raise it to any grid level above it
+        opening = np.concatenate([[stock], levels[levels > stock]])
+        quantity = opening - stock
+        discount = offer_discounts(quantity, offer_tiers)
+        cost = supplier[t] * (1.0 - discount) * quantity + np.where(quantity > 0, order_cost, 0.0)
+        choice = int(np.argmax(day_value(t, opening, value[t + 1]) - cost))
+
+        if quantity[choice] > 0:
+            orders.append({
+                "day": t,
+                "quantity": round(float(quantity[choice]), 2),
+                "unit_price": round(float(supplier[t]), 4),
+                "discount": float(discount[choice]),
+                "cost": round(float(cost[choice]), 2),
+            })
+            cogs += supplier[t] * (1.0 - discount[choice]) * quantity[choice]
+            fixed += order_cost
+
+        sold = min(opening[choice], demand[t])
+        stock = opening[choice] - sold
+        revenue += sold * retail[t]
+        holding += stock * holding_rate[t]
+        lost_units += demand[t] - sold
+        stock_path[t] = stock
+
+    profit = revenue - cogs - fixed - holding - lost_units * penalty
+    return {
+        "orders": orders,
+        "profit": round(profit, 2),
+        "revenue": round(revenue, 2),
+        "cogs": round(cogs, 2),
+        "order_costs": round(fixed, 2),
+        "holding_cost": round(holding, 2),
+        "lost_units": round(lost_units, 2),
+        "stockout_penalty": round(lost_units * penalty, 2),
+        "ending_stock": round(stock, 2),
+        "stock": np.round(stock_path, 2).tolist(),
+        "stock_step": round(float(levels[1]), 4),
+    }
+
+
+def replenishment_plan(
+    item: str,
+    today: pd.Timestamp,
+    current_stock: float,
+    observed_daily_velocity: float,
+    predicted_daily_velocity_fn,
+    horizon_days: int = 90,
+    alpha_observed: float = 0.6,
+    offer_tiers=(),
+    order_cost: float = 0.0,
+    n_levels: int = DEFAULT_LEVELS,
+    max_stock: float = None,
+):
+    """
+    plan_replenishment on the item's blended demand and price calendars from today;
+    orders carry their date.
+    """
+    velocity = blended_velocity_fn(
+        predicted_daily_velocity_fn=predicted_daily_velocity_fn,
+        observed_velocity=observed_daily_velocity,
+        alpha_observed=alpha_observed,
+    )
+    demand, supplier_prices, retail_prices = plan_inputs(item, today, horizon_days, velocity)
+
+    plan = plan_replenishment(
+        demand,
+        supplier_prices,
+        retail_prices,
+        current_stock,
+        offer_tiers=offer_tiers,
+        order_cost=order_cost,
+        stockout_penalty_per_unit=compute_stockout_penalty_per_unit(item, today),
+        n_levels=n_levels,
+        max_stock=max_stock,
+    )
+    for order in plan["orders"]:
+        order["date"] = str((today + pd.Timedelta(days=order["day"])).date())
+    return plan
@@ -0,0 +1,155 @@
+"""
+Result cache for the strategy endpoints: serialized JSON responses by request key.
+
+Two tiers:
+- memory: LRU bounded by the total size of the cached bodies, entries expire after ttl_s
+- disk (optional): one file per key under a shared directory, so several API
+  processes (uvicorn --workers N) reuse each other's results; written atomically
+  and expired by mtime
+
+Keys are built by the caller and must include everything the result depends on
+(request, model version, data version, price seed), so a new model or new sales
+data simply stops matching old entries, which then age out.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from .metrics import CACHE_EVENTS
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    expires: float
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def file_version(path) -> str:
+    """
+    Cheap identity of a file (size and mtime), identical across processes.
+    """
+    path = Path(path)
+    if not path.exists():
+        return "missing"
+    stat = path.stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 << 20, ttl_s: float = 300.0, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _store(self, key: str, entry: CachedBody):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old.body)
+            self._entries[key] = entry
+            self.nbytes += len(entry.body)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted.body)
+
+    def _read_disk(self, key: str) -> Optional[CachedBody]:
+        path = self._disk_path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+            if age > self.ttl_s:
+                path.unlink()
+                return None
+            body = path.read_bytes()
+        except OSError:
+            return None
+        return CachedBody(body, etag_for(body), time.monotonic() + self.ttl_s - age)
+
+    def get(self, key: str):
+        """
+        (entry, tier) with tier "memory" or "disk", or (None, None) on a miss.
+        """
+        if not self.enabled:
+            return None, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                del self._entries[key]
+                self.nbytes -= len(entry.body)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            CACHE_EVENTS.inc(1, "result", "hit")
+            return entry, "memory"
+
+        if self.disk_dir is not None:
+            entry = self._read_disk(key)
+            if entry is not None:
+                self._store(key, entry)
+                CACHE_EVENTS.inc(1, "result", "disk_hit")
+                return entry, "disk"
+        CACHE_EVENTS.inc(1, "result", "miss")
+        return None, None
+
+    def put(self, key: str, body: bytes) -> CachedBody:
+        entry = CachedBody(body, etag_for(body), time.monotonic() + self.ttl_s)
+        if not self.enabled:
+            return entry
+        self._store(key, entry)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_bytes(body)
+                os.replace(tmp, path)
+            except OSError:
+                # The disk tier is best effort; the memory tier still has the entry
+                pass
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+        }
+
+
+def result_cache_from_env() -> ResultCache:
+    """
+    STRATEGY_CACHE_MB (default 64, 0 disables), STRATEGY_CACHE_TTL_S (default 300) and
+    STRATEGY_CACHE_DIR (shared disk tier, off by default).
+    """
+    return ResultCache(
+        max_bytes=int(float(os.getenv("STRATEGY_CACHE_MB", "64")) * (1 << 20)),
+        ttl_s=float(os.getenv("STRATEGY_CACHE_TTL_S", "300")),
+        disk_dir=os.getenv("STRATEGY_CACHE_DIR") or None,
+    )
@@ -0,0 +1,142 @@
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import day_ordinals, sale_days
+
+
+class _Series:
+    """
+    Sorted day ordinals with prefix sums of quantity for one item (or item, client).
+    Appends of newer days grow the arrays in place (amortized O(batch));
+    out-of-order rows trigger a re-sort of this series only.
+    """
+    def __init__(self, days: np.ndarray, qty: np.ndarray):
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        cum = np.concatenate([[0.0], np.cumsum(qty[order], dtype=float)])
+        # (days, prefix sums, size) swapped as one tuple so readers never see a torn state
+        self._state = (days, cum, len(days))
+
+    def extend(self, days: np.ndarray, qty: np.ndarray):
+        old_days, old_cum, size = self._state
+        order = np.argsort(days, kind="stable")
+        days, qty = days[order], qty[order]
+
+        if size and days[0] < old_days[size - 1]:
+            self.__init__(
+                np.concatenate([old_days[:size], days]),
+                np.concatenate([np.diff(old_cum[:size + 1]), qty]),
+            )
+            return
+
+        new_size = size + len(days)
+        if new_size > len(old_days):
+            capacity = max(new_size, 2 * len(old_days))
+            grown_days = np.empty(capacity, dtype=np.int64)
+            grown_cum = np.empty(capacity + 1, dtype=float)
+            grown_days[:size] = old_days[:size]
+            grown_cum[:size + 1] = old_cum[:size + 1]
+            old_days, old_cum = grown_days, grown_cum
+
+        old_days[size:new_size] = days
+        old_cum[size + 1:new_size + 1] = old_cum[size] + np.cumsum(qty, dtype=float)
+        self._state = (old_days, old_cum, new_size)
+
+    def total_between(self, start_day: int, end_day: int) -> float:
+        """
+        Sum of quantity for start_day <= day <= end_day (two binary searches).
+        """
+        days, cum, size = self._state
+        lo = np.searchsorted(days[:size], start_day, side="left")
+        hi = np.searchsorted(days[:size], end_day, side="right")
+        return float(cum[hi] - cum[lo])
+
+
+class SalesIndex:
+    """
+    In-memory index over sales history: per item and per (item, client), sorted
+    day ordinals with prefix sums of quantity_sold. Any lookback window is then
+    answered with two binary searches instead of a scan of the whole frame.
+    """
+    def __init__(self, sales_df: Optional[pd.DataFrame] = None, client_col: str = "client_id"):
+        self.client_col = client_col
+        self.has_clients = False
+        self._items = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+        if sales_df is not None:
+            self.has_clients = client_col in sales_df.columns
+            self.append(sales_df)
+
+    def append(self, rows: pd.DataFrame):
+        """
+        Adds new sales rows (item_name, sold_date or sold_day, quantity_sold[, client_id]).
+        Rows without a client id (missing column or NA) only count towards item totals.
+        """
+        if not len(rows):
+            return
+        days = sale_days(rows)
+        qty = rows["quantity_sold"].to_numpy(dtype=float)
+        items = rows["item_name"].to_numpy()
+        known = None
+        if self.has_clients and self.client_col in rows.columns:
+            known = rows[self.client_col].notna().to_numpy()
+
+        with self._lock:
+            self._extend(self._items, items, days, qty)
+            if known is not None and known.any():
+                clients = rows[self.client_col].to_numpy()[known]
+                keys = pd.MultiIndex.from_arrays([items[known], clients]).to_numpy()
+                self._extend(self._clients, keys, days[known], qty[known])
+
+    @staticmethod
+    def _extend(series_by_key, keys, days, qty):
+        codes, uniques = pd.factorize(keys)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for code, key in enumerate(uniques):
+            rows = order[bounds[code]:bounds[code + 1]]
+            series = series_by_key.get(key)
+            if series is None:
+                series_by_key[key] = _Series(days[rows], qty[rows])
+            else:
+                series.extend(days[rows], qty[rows])
+
+    def quantity_between(
+        self,
+        item: str,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        client_id: Optional[str] = None,
+    ) -> float:
+        """
+        Total quantity sold with start <= sold_date <= end.
+        """
+        if client_id is not None and self.has_clients:
+            series = self._clients.get((item, client_id))
+        else:
+            series = self._items.get(item)
+        if series is None:
+            return 0.0
+
+        start_day = int(day_ordinals(start))
+        if pd.Timestamp(start) != pd.Timestamp(start).normalize():
+            start_day += 1
+        return series.total_between(start_day, int(day_ordinals(end)))
+
+    def observed_daily_velocity(
+        self,
+        item: str,
+        as_of: pd.Timestamp,
+        lookback_days: int = 7,
+        client_id: Optional[str] = None,
+    ) -> float:
+        """
+        Same result as observed_daily_velocity_from_sales, answered from the index.
+        """
+        start = as_of - pd.Timedelta(days=lookback_days)
+        qty = self.quantity_between(item, start, as_of, client_id=client_id)
+        return float(qty) / float(lookback_days)
@@ -0,0 +1,126 @@
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .data import day_ordinals, memory_report, sale_days
+from .sales_index import SalesIndex
+
+REQUIRED_COLUMNS = ("item_name", "sold_date", "quantity_sold")
+
+
+class SalesStore:
+    """
+    In-process sales history that accepts live appends.
+
+    Appends update, in O(batch):
+    - the SalesIndex used for recent (observed) velocity
+    - per-(item, month) quantity totals, from which monthly_frame() is materialized on demand
+    The version counter increases with every append so derived caches can tell when
+    the sales data changed.
+
+    The base history is either a DataFrame (indexed in this process) or a
+    ColumnarSales attached to the shared snapshot; in the latter case the
+    SalesIndex holds only the rows appended since startup, and velocities add
+    the two.
+    """
+    def __init__(self, sales, monthly_df: pd.DataFrame, client_col: str = "client_id"):
+        self.base = sales
+        if isinstance(sales, pd.DataFrame):
+            self.shared = None
+            self.index = SalesIndex(sales, client_col=client_col)
+            self.rows = len(sales)
+        else:
+            self.shared = sales
+            self.index = SalesIndex(client_col=client_col)
+            self.index.has_clients = sales.has_clients
+            self.rows = sales.rows
+        self.version = 0
+
+        self._monthly = dict(zip(
+            zip(monthly_df["item_name"].astype(str), monthly_df["sold_date"].array.asi8),
+            monthly_df["total_quantity"].to_numpy(dtype=np.int64).tolist(),
+        ))
+        self._monthly_df: Optional[pd.DataFrame] = monthly_df
+        self._appended = []
+        self._lock = threading.Lock()
+
+    def append(self, rows: pd.DataFrame) -> int:
+        """
+        Adds one or many sales rows; returns the new data version.
+        """
+        missing = [col for col in REQUIRED_COLUMNS if col not in rows.columns]
+        if missing:
+            raise ValueError(f"Missing sales columns: {', '.join(missing)}")
+
+        rows = rows.copy()
+        rows["sold_date"] = pd.to_datetime(rows["sold_date"], errors="coerce")
+        if rows["sold_date"].isna().any():
+            raise ValueError("Invalid sold_date in sales rows")
+        rows["quantity_sold"] = pd.to_numeric(rows["quantity_sold"], errors="coerce")
+        if rows["quantity_sold"].isna().any():
+            raise ValueError("Invalid quantity_sold in sales rows")
+        rows["item_name"] = rows["item_name"].astype(str)
+
+        months = day_ordinals(rows["sold_date"]).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        totals = rows.groupby([rows["item_name"], months])["quantity_sold"].sum()
+
+        with self._lock:
+            self.index.append(rows)
+            for key, qty in totals.items():
+                self._monthly[key] = self._monthly.get(key, 0) + int(qty)
+            self._appended.append(rows)
+            self._monthly_df = None
+            self.rows += len(rows)
+            self.version += 1
+            return self.version
+
+    def observed_daily_velocity(self, item: str, as_of: pd.Timestamp, lookback_days: int = 7, client_id: Optional[str] = None) -> float:
+        if self.shared is None:
+            return self.index.observed_daily_velocity(item, as_of, lookback_days=lookback_days, client_id=client_id)
+        start = as_of - pd.Timedelta(days=lookback_days)
+        qty = self.shared.quantity_between(item, start, as_of, client_id=client_id)
+        if self.version:
+            qty += self.index.quantity_between(item, start, as_of, client_id=client_id)
+        return qty / float(lookback_days)
+
+    def monthly_frame(self) -> pd.DataFrame:
+        """
+        Current monthly aggregates in the build_monthly_frame layout.
+        """
+        with self._lock:
+            if self._monthly_df is None:
+                keys = sorted(self._monthly)
+                monthly = pd.DataFrame({
+                    "item_name": [item for item, _ in keys],
+                    "sold_date": pd.arrays.PeriodArray(np.array([m for _, m in keys], dtype=np.int64), dtype=pd.PeriodDtype("M")),
+                    "total_quantity": [self._monthly[key] for key in keys],
+                })
+                monthly["month"] = monthly["sold_date"].dt.month
+                monthly["year"] = monthly["sold_date"].dt.year
+                self._monthly_df = monthly
+            return self._monthly_df
+
+    def sales_frame(self) -> pd.DataFrame:
+        """
+        Base history plus every appended row (materialized on demand).
+        """
+        with self._lock:
+            appended = list(self._appended)
+        base_df = self.base if self.shared is None else self.shared.frame()
+        if not appended:
+            return base_df
+        columns = list(base_df.columns)
+        if "sold_day" in columns:
+            appended = [rows.assign(sold_day=sale_days(rows).astype(np.int32)) for rows in appended]
+        appended = [rows.reindex(columns=columns) for rows in appended]
+        return pd.concat([base_df.astype({"item_name": str}), *appended], ignore_index=True)
+
+    def memory_report(self) -> dict:
+        """
+        memory_report of the base history (the mapped arrays when shared).
+        """
+        if self.shared is not None:
+            return self.shared.memory_report()
+        return memory_report(self.base)
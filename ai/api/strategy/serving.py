@@ -0,0 +1,95 @@
+"""
+The monthly demand model being served, and what replacing it takes.
+
+ServingModel bundles the model with the DemandForecaster built on it (and its
+warmed forecast table) and the model file's version. Replacing the model is a
+single reference assignment of a fully prepared bundle: requests never see a
+half-built forecaster, and requests in flight finish on the bundle they started
+with.
+"""
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from .demand import DemandForecaster
+from .forest import export_and_load, load_model
+from .metrics import REGISTRY
+from .result_cache import file_version
+
+MODEL_RELOADS = REGISTRY.counter(
+    "strategy_model_reloads_total", "Model reload attempts by outcome.", ["result"]
+)
+
+
+class ServingModel(NamedTuple):
+    model: object
+    forecaster: DemandForecaster
+    version: str
+    path: Path
+
+
+def model_summary(model) -> dict:
+    meta = getattr(model, "meta", None)
+    if meta is not None:
+        return {"format": "flat", "n_trees": meta["n_trees"], "n_features": meta["n_features"]}
+    return {
+        "format": "pickle",
+        "n_trees": len(getattr(model, "estimators_", [])),
+        "n_features": int(getattr(model, "n_features_in_", 0)),
+    }
+
+
+def check_model(model, feature_cols, forecaster: DemandForecaster) -> list:
+    """
+    Problems that make a model unfit to serve: wrong inputs, or a forecast table
+    with non-finite or negative demand.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and len(names) and list(names) != list(feature_cols):
+        return ["model feature columns differ from the sales data's"]
+    if model_summary(model)["n_features"] != len(feature_cols):
+        return [f"model expects {model_summary(model)['n_features']} features, the sales data has {len(feature_cols)}"]
+
+    table = forecaster._table[1]
+    errors = []
+    if not np.all(np.isfinite(table)):
+        errors.append("forecast table has non-finite values")
+    elif (table < 0).any():
+        errors.append("forecast table has negative demand")
+    return errors
+
+
+def prepare_serving_model(model_path, feature_cols, years, export: bool = True):
+    """
+    Loads model_path, builds and warms its forecaster for years (first, last) and
+    validates the result. Returns (ServingModel or None, report).
+
+    Only a model that passed is written as a flat export and served memory-mapped
+    from it; export=False (validate only) never writes to the models directory.
+    """
+    model_path = Path(model_path)
+    report = {"path": str(model_path), "version": file_version(model_path)}
+    try:
+        model = load_model(model_path)
+        forecaster = DemandForecaster(None, feature_cols, model=model)
+        forecaster.warm(*years)
+    except Exception as e:
+        return None, {**report, "ok": False, "errors": [f"{type(e).__name__}: {e}"]}
+
+    errors = check_model(model, feature_cols, forecaster)
+    if not errors and export and hasattr(model, "estimators_"):
+        try:
+            # The flat export predicts exactly like the pickle, so the warmed table stays valid
+            model = forecaster.model = export_and_load(model, model_path)
+        except OSError:
+            pass  # read-only models directory: serve the unpickled model
+    report.update(
+        ok=not errors,
+        errors=errors,
+        **model_summary(model),
+        mean_monthly_demand=round(float(forecaster._table[1].mean()), 4) if not errors else None,
+    )
+    if errors:
+        return None, report
+    return ServingModel(model, forecaster, report["version"], model_path), report
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-from strategy.pricing import supplier_price, retail_price, HOLDING_COST_PER_DAY
+from strategy.pricing import HOLDING_COST_PER_DAY, supplier_price_calendar, retail_price_calendar
+from strategy.metrics import SIMULATED_PLAN_DAYS, timed
 
 def simulate_plan(
     item: str,
@@ -19,52 +23,190 @@ def simulate_plan(
     - buy happens at day == buy_delay_days (at that day's supplier price * (1-discount))
     - demand is predicted_velocity_fn(item, date)
     - stockouts lose sales; optionally apply penalty per unit (e.g. lost margin)
+
+    Prices come from the shared pricing calendar, so a day has one supplier price
+    for both the restock and the holding cost; the arithmetic is simulate_plans'.
+    """
+    dates = pd.date_range(start_date, periods=horizon_days)
+    demand = np.array([float(predicted_velocity_fn(item, date)) for date in dates])
+
+    batch = simulate_plans(
+        demand=demand,
+        supplier_prices=supplier_price_calendar(item, dates),
+        retail_prices=retail_price_calendar(item, dates),
+        current_stock=current_stock,
+        buy_delay_days=buy_delay_days,
+        buy_discount=buy_discount,
+        buy_quantity=buy_quantity,
+        stockout_penalty_per_unit=stockout_penalty_per_unit,
+    )
+    result = plan_result(batch, ())
+    result["buy_discount"] = buy_discount
+    result["buy_quantity"] = buy_quantity
+    return result
+
+@timed("simulate")
+def simulate_plans(
+    demand,
+    supplier_prices,
+    retail_prices,
+    current_stock,
+    buy_delay_days,
+    buy_discount,
+    buy_quantity,
+    stockout_penalty_per_unit: Optional[float] = None,
+):
+    """
+    Array version of simulate_plan: evaluates many plans in one pass.
+    - demand / supplier_prices / retail_prices are precomputed day-indexed vectors
+      (last axis = horizon); leading axes broadcast against the plan arrays
+    - current_stock, buy_delay_days, buy_discount, buy_quantity are arrays of plans
+    - demand must be non-negative
+
+    With a single restock, end-of-day stock has a closed form: before the buy it is
+    max(stock - cumulative demand, 0), after it the same from the restocked level.
+    Returns a columnar dict of arrays with the simulate_plan breakdown (unrounded).
+    """
+    demand = np.asarray(demand, dtype=float)
+    supplier = np.asarray(supplier_prices, dtype=float)
+    retail = np.asarray(retail_prices, dtype=float)
+    horizon = demand.shape[-1]
+
+    delay = np.asarray(buy_delay_days)
+    discount = np.asarray(buy_discount, dtype=float)
+    quantity = np.asarray(buy_quantity, dtype=float)
+    stock0 = np.asarray(current_stock, dtype=float)
+
+    days = np.arange(horizon)
+    d = delay[..., None]
+    q = np.where(quantity > 0, quantity, 0.0)[..., None]
+    s0 = stock0[..., None]
+
+    cum_demand = np.cumsum(demand, axis=-1)
+    before_buy = np.maximum(s0 - cum_demand, 0.0)
+
+    is_buy_day = days == d
+    demand_before_buy = np.sum(np.where(is_buy_day, cum_demand - demand, 0.0), axis=-1, keepdims=True)
+    restocked = np.maximum(s0 - demand_before_buy, 0.0) + q
+    after_buy = np.maximum(restocked - (cum_demand - demand_before_buy), 0.0)
+    stock = np.where(days < d, before_buy, after_buy)
+
+    opening = np.concatenate(
+        [np.broadcast_to(s0, stock.shape[:-1] + (1,)), stock[..., :-1]], axis=-1
+    ) + np.where(is_buy_day, q, 0.0)
+    sold = opening - stock
+    lost = np.maximum(demand - sold, 0.0)
+
+    bought = (delay < horizon) & (quantity > 0)
+    buy_price = np.sum(np.where(is_buy_day, supplier, 0.0), axis=-1)
+    cogs = np.where(bought, buy_price * (1.0 - discount) * quantity, 0.0)
+
+    revenue = np.sum(sold * retail, axis=-1)
+    holding = np.sum(stock * (HOLDING_COST_PER_DAY * np.maximum(supplier, 0.0001)), axis=-1)
+    lost_units = np.sum(lost, axis=-1)
+    penalty = lost_units * (stockout_penalty_per_unit if stockout_penalty_per_unit is not None else 0.0)
+
+    shape = revenue.shape
+    SIMULATED_PLAN_DAYS.inc(revenue.size * horizon)
+    return {
+        "profit": revenue - cogs - holding - penalty,
+        "revenue": revenue,
+        "cogs": np.broadcast_to(cogs, shape),
+        "holding_cost": holding,
+        "lost_units": lost_units,
+        "stockout_penalty": np.broadcast_to(penalty, shape),
+        "ending_stock": stock[..., -1],
+        "buy_delay_days": np.broadcast_to(delay, shape),
+        "buy_discount": np.broadcast_to(discount, shape),
+        "buy_quantity": np.broadcast_to(quantity, shape),
+    }
+
+@timed("simulate")
+def simulate_restocks(
+    demand,
+    supplier_prices,
+    retail_prices,
+    current_stock: float,
+    buy_delay_days,
+    buy_discount,
+    buy_quantity,
+    stockout_penalty_per_unit: Optional[float] = None,
+):
+    """
+    simulate_plans for many plans of one item (1-D day vectors, scalar stock, every
+    buy_delay_days inside the horizon) without materializing plans x days.
+
+    After the buy, stock is positive until cumulative demand reaches the restocked
+    level, so a binary search finds that day and prefix sums over the days give
+    revenue and holding cost; the days before the buy follow the no-buy trajectory.
+    Same columnar output as simulate_plans.
     """
-    stock = float(current_stock)
-    total_profit = 0.0
-    lost_units = 0.0
-    total_revenue = 0.0
-    total_cogs = 0.0
-    total_holding = 0.0
-    total_stockout_penalty = 0.0
-
-    for day in range(horizon_days):
-        date = start_date + pd.Timedelta(days=day)
-
-        # Restock on the chosen day
-        if day == buy_delay_days and buy_quantity > 0:
-            unit_cost = supplier_price(item, date) * (1.0 - buy_discount)
-            total_cogs += unit_cost * buy_quantity
-            stock += buy_quantity
-
-        demand = float(predicted_velocity_fn(item, date))
-        sold = min(stock, demand)
-        stock -= sold
-
-        if sold < demand:
-            lost = demand - sold
-            lost_units += lost
-            if stockout_penalty_per_unit is not None:
-                total_stockout_penalty += stockout_penalty_per_unit * lost
-
-        sell_price = retail_price(item, date)
-        revenue = sold * sell_price
-        total_revenue += revenue
-
-        holding_cost = stock * HOLDING_COST_PER_DAY * max(supplier_price(item, date), 0.0001)
-        total_holding += holding_cost
-
-    total_profit = total_revenue - total_cogs - total_holding - total_stockout_penalty
+    demand = np.asarray(demand, dtype=float)
+    retail = np.asarray(retail_prices, dtype=float)
+    supplier = np.asarray(supplier_prices, dtype=float)
+    holding_rate = HOLDING_COST_PER_DAY * np.maximum(supplier, 0.0001)
+    horizon = len(demand)
+
+    delay = np.asarray(buy_delay_days, dtype=np.int64)
+    discount = np.asarray(buy_discount, dtype=float)
+    quantity = np.asarray(buy_quantity, dtype=float)
+    q = np.maximum(quantity, 0.0)
+    s0 = float(current_stock)
 
+    def prefix(values):
+        return np.concatenate([[0.0], np.cumsum(values)])
+
+    cum_demand = np.cumsum(demand)
+    demand_before = cum_demand - demand
+
+    # No-buy trajectory, used up to the buy day
+    no_buy_stock = np.maximum(s0 - cum_demand, 0.0)
+    no_buy_sold = np.concatenate([[s0], no_buy_stock[:-1]]) - no_buy_stock
+    revenue_before = prefix(no_buy_sold * retail)[delay]
+    holding_before = prefix(no_buy_stock * holding_rate)[delay]
+    sold_before = np.minimum(s0, demand_before[delay])
+
+    # From the buy day, stock is level - cum_demand until it runs out on day `out`
+    level = np.maximum(s0 - demand_before[delay], 0.0) + q + demand_before[delay]
+    out = np.maximum(np.searchsorted(cum_demand, level, side="left"), delay)
+    out_day = np.minimum(out, horizon - 1)
+    partial = np.where(out < horizon, level - demand_before[out_day], 0.0)
+
+    demand_revenue = prefix(demand * retail)
+    revenue_after = demand_revenue[out] - demand_revenue[delay] + partial * retail[out_day]
+    holding_prefix, weighted_prefix = prefix(holding_rate), prefix(cum_demand * holding_rate)
+    holding_after = (
+        level * (holding_prefix[out] - holding_prefix[delay]) - (weighted_prefix[out] - weighted_prefix[delay])
+    )
+    sold_after = np.minimum(level, cum_demand[-1]) - demand_before[delay]
+
+    bought = quantity > 0
+    cogs = np.where(bought, supplier[delay] * (1.0 - discount) * quantity, 0.0)
+    revenue = revenue_before + revenue_after
+    holding = holding_before + holding_after
+    lost_units = cum_demand[-1] - sold_before - sold_after
+    penalty = lost_units * (stockout_penalty_per_unit if stockout_penalty_per_unit is not None else 0.0)
+
+    SIMULATED_PLAN_DAYS.inc(revenue.size * horizon)
     return {
-        "profit": round(total_profit, 2),
-        "revenue": round(total_revenue, 2),
-        "cogs": round(total_cogs, 2),
-        "holding_cost": round(total_holding, 2),
-        "lost_units": round(lost_units, 2),
-        "stockout_penalty": round(total_stockout_penalty, 2),
-        "ending_stock": round(stock, 2),
-        "buy_delay_days": buy_delay_days,
-        "buy_discount": buy_discount,
-        "buy_quantity": buy_quantity,
+        "profit": revenue - cogs - holding - penalty,
+        "revenue": revenue,
+        "cogs": cogs,
+        "holding_cost": holding,
+        "lost_units": lost_units,
+        "stockout_penalty": penalty,
+        "ending_stock": np.maximum(level - cum_demand[-1], 0.0),
+        "buy_delay_days": delay,
+        "buy_discount": discount,
+        "buy_quantity": quantity,
     }
+
+def plan_result(batch, index):
+    """
+    Extracts one plan from a simulate_plans result in the simulate_plan dict format.
+    """
+    row = {key: values[index].item() for key, values in batch.items()}
+    for key in ("profit", "revenue", "cogs", "holding_cost", "lost_units", "stockout_penalty", "ending_stock"):
+        row[key] = round(row[key], 2)
+    row["buy_delay_days"] = int(row["buy_delay_days"])
+    return row
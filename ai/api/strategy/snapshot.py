@@ -0,0 +1,323 @@
+"""
+Binary snapshot of the prepared datasets used by the API.
+
+A build step parses sales_transactions.csv once and writes typed, columnar .npy
+files (parsed sales with compact dtypes, monthly aggregates) plus the feature
+column list and a content hash of the CSV. Startup loads the snapshot with
+memory-mapped arrays and only falls back to the CSV when the hash changes.
+Sales are returned in the compact layout of load_sales_data(compact=True).
+
+Sales rows are stored sorted by (item, day) next to index arrays (per-item row
+offsets, and an (item, client) sorted copy of days and quantities), which is
+the layout ColumnarSales serves from: this is the published shared store that
+every API process attaches to read-only. Publishing is this module's CLI (or
+the first process to find the snapshot stale, under a file lock); set
+STRATEGY_SNAPSHOT_DIR to a tmpfs such as /dev/shm to keep it in shared memory.
+
+    python -m strategy.snapshot [csv_path] [snapshot_dir]
+"""
+import hashlib
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .data import BASE_DIR, build_monthly_frame, get_monthly_feature_columns, memory_report, read_compact_sales, sale_days, smallest_int
+from .locks import file_lock
+from .metrics import timed
+
+SNAPSHOT_VERSION = 3
+MANIFEST = "manifest.json"
+
+DEFAULT_CSV = "app/sales_transactions.csv"
+DEFAULT_SNAPSHOT_DIR = os.getenv("STRATEGY_SNAPSHOT_DIR", "app/snapshot")
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(values):
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(smallest_int(codes)), [str(u) for u in uniques]
+
+
+def _save(path: Path, values: np.ndarray):
+    # Replaced, never rewritten in place: attached processes may have the old file mapped
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, values)
+    os.replace(tmp, path)
+
+
+def _write_manifest(snapshot_dir: Path, manifest: dict):
+    tmp = snapshot_dir / f"{MANIFEST}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, snapshot_dir / MANIFEST)
+
+
+def store_index(columns: dict, categories: dict) -> dict:
+    """
+    Index arrays over columns already sorted by (item, day): item row offsets and,
+    with clients, the (item, client) groups' keys, offsets, days and quantities.
+    """
+    items = columns["item_name"]
+    index = {"item_offsets": np.searchsorted(items, np.arange(len(categories["item_name"]) + 1)).astype(np.int64)}
+    if "client_id" in columns:
+        clients = columns["client_id"]
+        known = np.flatnonzero(clients >= 0)
+        pair = items[known].astype(np.int64) * len(categories["client_id"]) + clients[known]
+        sort = np.lexsort((columns["sold_day"][known], pair))
+        order = known[sort]
+        keys, starts = np.unique(pair[sort], return_index=True)
+        index.update(
+            pair_keys=keys,
+            pair_offsets=np.append(starts, len(order)).astype(np.int64),
+            pair_sold_day=columns["sold_day"][order],
+            pair_quantity=columns["quantity_sold"][order],
+        )
+    return index
+
+
+@contextmanager
+def snapshot_lock(snapshot_dir: Path, shared: bool = False):
+    """
+    Lock on the snapshot directory: exclusive to build, so one process builds while the
+    others wait; shared to check and load, so no build runs in between.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    with file_lock(snapshot_dir / ".lock", shared=shared):
+        yield
+
+
+def build_snapshot(csv_path: Path, snapshot_dir: Path, sales_df: pd.DataFrame = None):
+    """
+    Writes the columnar snapshot for csv_path into snapshot_dir and returns its manifest.
+    """
+    csv_path, snapshot_dir = Path(csv_path), Path(snapshot_dir)
+    if sales_df is None:
+        sales_df = read_compact_sales(csv_path)
+    monthly_df = build_monthly_frame(sales_df)
+    feature_cols = get_monthly_feature_columns(monthly_df)
+
+    columns = {"sold_day": sale_days(sales_df).astype(np.int32)}
+    categories = {}
+    for col in ("item_name", "category", "client_id"):
+        if col in sales_df.columns:
+            columns[col], categories[col] = _encode(sales_df[col])
+
+    quantity = sales_df["quantity_sold"].to_numpy()
+    columns["quantity_sold"] = quantity.astype(smallest_int(quantity))
+    for col in ("unit_cost", "unit_price", "profit"):
+        if col in sales_df.columns:
+            columns[col] = sales_df[col].to_numpy(dtype=np.float32)
+    if "holiday_spike" in sales_df.columns:
+        columns["holiday_spike"] = sales_df["holiday_spike"].to_numpy(dtype=bool)
+
+    order = np.lexsort((columns["sold_day"], columns["item_name"]))
+    columns = {name: values[order] for name, values in columns.items()}
+    index = store_index(columns, categories)
+
+    items = categories["item_name"]
+    monthly_columns = {
+        "item_name": pd.Index(items).get_indexer(monthly_df["item_name"].astype(str)).astype(np.int16),
+        "period": monthly_df["sold_date"].array.asi8.astype(np.int32),
+        "total_quantity": monthly_df["total_quantity"].to_numpy(dtype=np.int64),
+    }
+
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    # Drop the old manifest first so a half-written snapshot is never considered valid
+    (snapshot_dir / MANIFEST).unlink(missing_ok=True)
+    for name, values in columns.items():
+        _save(snapshot_dir / f"sales.{name}.npy", values)
+    for name, values in monthly_columns.items():
+        _save(snapshot_dir / f"monthly.{name}.npy", values)
+    for name, values in index.items():
+        _save(snapshot_dir / f"index.{name}.npy", values)
+
+    stat = csv_path.stat()
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "csv_sha256": file_sha256(csv_path),
+        "csv_size": stat.st_size,
+        "csv_mtime_ns": stat.st_mtime_ns,
+        "rows": len(sales_df),
+        "sales_columns": list(columns),
+        "monthly_columns": list(monthly_columns),
+        "index_columns": list(index),
+        "categories": categories,
+        "feature_cols": list(feature_cols),
+    }
+    _write_manifest(snapshot_dir, manifest)
+    return manifest
+
+
+def snapshot_is_current(csv_path: Path, snapshot_dir: Path, locked: bool = False) -> bool:
+    """
+    True when the snapshot was built from the current CSV contents.
+    Size + mtime is checked first; the content hash only when those differ.
+    Pass locked=True when the caller already holds snapshot_lock.
+    """
+    csv_path, snapshot_dir = Path(csv_path), Path(snapshot_dir)
+    manifest_path = snapshot_dir / MANIFEST
+    if not manifest_path.exists():
+        return False
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return False
+
+    stat = csv_path.stat()
+    if stat.st_size == manifest["csv_size"] and stat.st_mtime_ns == manifest["csv_mtime_ns"]:
+        return True
+    if file_sha256(csv_path) != manifest["csv_sha256"]:
+        return False
+
+    # Same contents, touched file: remember the new stat for next time
+    try:
+        if locked:
+            _refresh_manifest_stat(csv_path, snapshot_dir, manifest["csv_sha256"])
+        else:
+            with snapshot_lock(snapshot_dir):
+                _refresh_manifest_stat(csv_path, snapshot_dir, manifest["csv_sha256"])
+    except OSError:
+        pass  # read-only snapshot: the hash is checked again next time
+    return True
+
+
+def _refresh_manifest_stat(csv_path: Path, snapshot_dir: Path, sha256: str):
+    # Re-read under the lock: another process may have rebuilt the snapshot meanwhile
+    manifest = read_manifest(snapshot_dir)
+    if manifest.get("csv_sha256") != sha256:
+        return
+    stat = csv_path.stat()
+    manifest["csv_size"], manifest["csv_mtime_ns"] = stat.st_size, stat.st_mtime_ns
+    _write_manifest(snapshot_dir, manifest)
+
+
+def read_manifest(snapshot_dir: Path) -> dict:
+    return json.loads((Path(snapshot_dir) / MANIFEST).read_text())
+
+
+def snapshot_column(snapshot_dir: Path, prefix: str, name: str) -> np.ndarray:
+    """
+    One snapshot array, memory-mapped read-only.
+    """
+    return np.load(Path(snapshot_dir) / f"{prefix}.{name}.npy", mmap_mode="r")
+
+
+def snapshot_sales_frame(snapshot_dir: Path, manifest: dict) -> pd.DataFrame:
+    categories = manifest["categories"]
+    sales = {}
+    for name in manifest["sales_columns"]:
+        values = snapshot_column(snapshot_dir, "sales", name)
+        if name in categories:
+            sales[name] = pd.Categorical.from_codes(values, categories[name])
+        else:
+            sales[name] = values
+    return pd.DataFrame(sales, copy=False)
+
+
+def snapshot_monthly_frame(snapshot_dir: Path, manifest: dict) -> pd.DataFrame:
+    item_codes = snapshot_column(snapshot_dir, "monthly", "item_name")
+    periods = snapshot_column(snapshot_dir, "monthly", "period")
+    monthly_df = pd.DataFrame({
+        "item_name": np.asarray(manifest["categories"]["item_name"], dtype=object)[item_codes],
+        "sold_date": pd.arrays.PeriodArray(periods.astype(np.int64), dtype=pd.PeriodDtype("M")),
+        "total_quantity": snapshot_column(snapshot_dir, "monthly", "total_quantity"),
+    }, copy=False)
+    monthly_df["month"] = monthly_df["sold_date"].dt.month
+    monthly_df["year"] = monthly_df["sold_date"].dt.year
+    return monthly_df
+
+
+def load_snapshot(snapshot_dir: Path):
+    """
+    Loads (sales_df, monthly_df, feature_cols) from a snapshot; numeric columns are memory-mapped.
+    """
+    manifest = read_manifest(snapshot_dir)
+    return (
+        snapshot_sales_frame(snapshot_dir, manifest),
+        snapshot_monthly_frame(snapshot_dir, manifest),
+        pd.Index(manifest["feature_cols"]),
+    )
+
+
+@timed("data_load")
+def load_prepared_data(relative_path: str = DEFAULT_CSV, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR):
+    """
+    (sales_df, monthly_df, feature_cols) from the snapshot when it matches the CSV,
+    otherwise parsed from the CSV and written back as a fresh snapshot.
+    """
+    csv_path = BASE_DIR / relative_path
+    snapshot_path = BASE_DIR / snapshot_dir
+
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Sales CSV not found at: {csv_path}")
+
+    sales_df = None
+    try:
+        # The check and the load run under one lock: a build in between would swap the files
+        with snapshot_lock(snapshot_path, shared=True):
+            if snapshot_is_current(csv_path, snapshot_path, locked=True):
+                return load_snapshot(snapshot_path)
+
+        sales_df = read_compact_sales(csv_path)
+        with snapshot_lock(snapshot_path):
+            if not snapshot_is_current(csv_path, snapshot_path, locked=True):
+                build_snapshot(csv_path, snapshot_path, sales_df=sales_df)
+            return load_snapshot(snapshot_path)
+    except OSError:
+        # Read-only deployment: serve from the CSV without caching it
+        if sales_df is None:
+            sales_df = read_compact_sales(csv_path)
+        monthly_df = build_monthly_frame(sales_df)
+        return sales_df, monthly_df, get_monthly_feature_columns(monthly_df)
+
+
+@timed("data_load")
+def attach_sales_store(relative_path: str = DEFAULT_CSV, snapshot_dir: str = DEFAULT_SNAPSHOT_DIR):
+    """
+    (ColumnarSales, monthly_df, feature_cols) attached read-only to the published
+    snapshot; publishes it first (once, under the lock) when it is missing or stale.
+    """
+    from .columnar_sales import ColumnarSales
+
+    csv_path = BASE_DIR / relative_path
+    snapshot_path = BASE_DIR / snapshot_dir
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Sales CSV not found at: {csv_path}")
+
+    def attach():
+        sales = ColumnarSales(snapshot_path)
+        return sales, snapshot_monthly_frame(snapshot_path, sales.manifest), pd.Index(sales.manifest["feature_cols"])
+
+    # The check and the attach run under one lock: a build in between would swap the files.
+    # Once attached the mapped arrays stay valid, as builds replace files rather than rewrite them.
+    with snapshot_lock(snapshot_path, shared=True):
+        if snapshot_is_current(csv_path, snapshot_path, locked=True):
+            return attach()
+    with snapshot_lock(snapshot_path):
+        if not snapshot_is_current(csv_path, snapshot_path, locked=True):
+            build_snapshot(csv_path, snapshot_path)
+        return attach()
+
+
+if __name__ == "__main__":
+    csv = Path(sys.argv[1]) if len(sys.argv) > 1 else BASE_DIR / DEFAULT_CSV
+    out = Path(sys.argv[2]) if len(sys.argv) > 2 else BASE_DIR / DEFAULT_SNAPSHOT_DIR
+    with snapshot_lock(out):
+        manifest = build_snapshot(csv, out)
+    print(f"Snapshot of {manifest['rows']} rows written to {out} (sha256 {manifest['csv_sha256'][:12]})")
+    report = memory_report(load_snapshot(out)[0])
+    for col, nbytes in report["columns"].items():
+        print(f"{col:>15}: {nbytes / 2**20:10.2f} MiB")
+    print(f"In memory: {report['total_bytes'] / 2**20:.2f} MiB ({report['bytes_per_row']} bytes/row)")
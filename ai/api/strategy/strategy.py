@@ -1,28 +1,12 @@
 import pandas as pd
 import numpy as np
-import joblib
-
-HOLDING_COST_PER_DAY = 0.005
-
-def supplier_price(item, date):
-    base = 0.30
-    if date.day >= 25:
-        return round(base * 0.80, 2)
-    if date.month == 11:
-        return round(base * 0.75, 2)
-    if np.random.rand() < 0.03:
-        return round(base * 0.70, 2)
-    return base
-
-def retail_price(item, date):
-    base = 0.50
-    if date.month == 12:
-        return round(base * 1.40, 2)
-    if date.month == 4:
-        return round(base * 1.25, 2)
-    if date.month in [6, 7, 8]:
-        return round(base * 1.10, 2)
-    return base
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .pricing import HOLDING_COST_PER_DAY, supplier_price_calendar, retail_price_calendar
+from .monthly_model import load_buy_decision_model
+from .metrics import count_inference, stage
+
+BUY_WINDOW_DAYS = 90
 
 def predict_monthly_demand(item, year, month, model, feature_cols):
     row = {"month": month, "year": year}
@@ -32,52 +16,136 @@ def predict_monthly_demand(item, year, month, model, feature_cols):
 
     return model.predict(pd.DataFrame([row]))[0]
 
-
-def yearly_buy_analysis(item, start_date, months_ahead, model, feature_cols):
+def predict_monthly_demands(item, years, months, model, feature_cols):
+    """
+    Batched predict_monthly_demand: one model.predict for all (year, month) pairs.
+    item may be a single name or an array aligned with years/months.
+    """
+    X = pd.DataFrame({"month": np.asarray(months), "year": np.asarray(years)})
+    item = np.asarray(item)
+    for col in feature_cols:
+        if col.startswith("item_name_"):
+            X[col] = (item == col[len("item_name_"):]).astype(int)
+    count_inference("monthly_demand", len(X))
+    with stage("forecaster.predict"):
+        return np.asarray(model.predict(X[list(feature_cols)]), dtype=float)
+
+
+def buy_date_profits(buy_prices, sell_prices, daily_demand, window=BUY_WINDOW_DAYS):
+    """
+    Expected profit of buying on each date and selling over the following `window` days.
+    All inputs are day-indexed along the last axis; leading axes (e.g. items) broadcast.
+
+    Rows whose worst-case margin stays positive over the whole window are summed with
+    prefix sums in O(days); only rows where the margin clip can bind fall back to an
+    explicit (rows x window) matrix.
+    """
+    buy, sell, demand = np.broadcast_arrays(
+        np.asarray(buy_prices, dtype=float),
+        np.asarray(sell_prices, dtype=float),
+        np.asarray(daily_demand, dtype=float),
+    )
+    shape = buy.shape
+    n = shape[-1]
+    buy, sell, demand = (a.reshape(-1, n) for a in (buy, sell, demand))
+
+    i = np.arange(n)
+    end = np.minimum(i + window, n)
+    offsets = np.arange(window)
+
+    # Prefix sums over sell*demand, demand and day*demand
+    zero = np.zeros((len(buy), 1))
+    p_sd = np.concatenate([zero, np.cumsum(sell * demand, axis=1)], axis=1)
+    p_d = np.concatenate([zero, np.cumsum(demand, axis=1)], axis=1)
+    p_jd = np.concatenate([zero, np.cumsum(i * demand, axis=1)], axis=1)
+
+    revenue = p_sd[:, end] - p_sd[:, i]
+    units = p_d[:, end] - p_d[:, i]
+    unit_days = (p_jd[:, end] - p_jd[:, i]) - i * units
+    profits = revenue - buy * units - HOLDING_COST_PER_DAY * buy * unit_days
+
+    # Rows where some margin in the window may be negative need the clipped sum
+    sell_padded = np.pad(sell, ((0, 0), (0, window - 1)), constant_values=np.inf)
+    min_sell = sliding_window_view(sell_padded, window, axis=1).min(axis=2)
+    worst_margin = min_sell - buy * (1.0 + HOLDING_COST_PER_DAY * (window - 1))
+    rows, days = np.nonzero(worst_margin < 0)
+
+    if len(rows):
+        cols = days[:, None] + offsets
+        in_range = cols < n
+        cols = np.minimum(cols, n - 1)
+        row_buy = buy[rows, days][:, None]
+        margin = sell[rows[:, None], cols] - row_buy - offsets * HOLDING_COST_PER_DAY * row_buy
+        margin = np.where(in_range & (margin > 0), margin, 0.0)
+        profits[rows, days] = (margin * demand[rows[:, None], cols]).sum(axis=1)
+
+    return profits.reshape(shape)
+
+
+def horizon_months(start_date, months_ahead):
+    """
+    Distinct (year, month) periods covered by a yearly_buy_analysis horizon, in order.
+    """
+    return pd.date_range(start_date, periods=months_ahead * 30).to_period("M").unique()
+
+
+def yearly_buy_analysis_batch(items, start_date, months_ahead, model, feature_cols, monthly_forecast=None):
+    """
+    yearly_buy_analysis for several items sharing one horizon: a single predict for
+    all items x months and one buy_date_profits pass over the (items, dates) matrix.
+    monthly_forecast, if given, is the precomputed (items, horizon_months) demand.
+    Returns (dates, profits) with profits rounded and shaped (len(items), len(dates)).
+    """
+    items = list(items)
     dates = pd.date_range(start_date, periods=months_ahead * 30)
 
-    demand_cache = {}
-
-    for d in dates:
-        key = (d.year, d.month)
-        if key not in demand_cache:
-            monthly = predict_monthly_demand(
-                item=item,
-                year=d.year,
-                month=d.month,
-                model=model,
-                feature_cols=feature_cols
-            )
-            demand_cache[key] = monthly / 30
-
-    results = []
-
-    for i, buy_date in enumerate(dates):
-        buy_price = supplier_price(item, buy_date)
-        total_profit = 0.0
-
-        for future_date in dates[i:i + 90]:
-            sell_price = retail_price(item, future_date)
-            holding_days = (future_date - buy_date).days
-            holding_cost = holding_days * HOLDING_COST_PER_DAY * buy_price
-
-            margin = sell_price - buy_price - holding_cost
-            if margin <= 0:
-                continue
-
-            daily_demand = demand_cache[(future_date.year, future_date.month)]
-            total_profit += margin * daily_demand
-
-        results.append({
-            "buy_date": buy_date.date(),
-            "expected_profit": round(total_profit, 2)
-        })
-
-    df = pd.DataFrame(results)
+    periods = dates.to_period("M")
+    months = periods.unique()
+    if monthly_forecast is not None:
+        monthly = np.asarray(monthly_forecast, dtype=float).reshape(len(items), len(months))
+    else:
+        monthly = predict_monthly_demands(
+            item=np.repeat(np.asarray(items, dtype=object), len(months)),
+            years=np.tile(months.year, len(items)),
+            months=np.tile(months.month, len(items)),
+            model=model,
+            feature_cols=feature_cols
+        ).reshape(len(items), len(months))
+    daily_demand = (monthly / 30)[:, months.get_indexer(periods)]
+
+    buy_prices = np.stack([supplier_price_calendar(item, dates) for item in items])
+    sell_prices = np.stack([retail_price_calendar(item, dates) for item in items])
+    with stage("profit_kernel"):
+        profits = buy_date_profits(buy_prices, sell_prices, daily_demand)
+    return dates, np.round(profits, 2)
+
+
+def portfolio_buy_analysis(items, start_date, months_ahead, model, feature_cols, monthly_forecast=None):
+    """
+    Best buy date of every item in a portfolio from one (items, dates) profit matrix.
+    Returns (dates, profits, best) with best[i] the index of item i's best date.
+    """
+    dates, profits = yearly_buy_analysis_batch(
+        items, start_date, months_ahead, model, feature_cols, monthly_forecast=monthly_forecast
+    )
+    best = profits.argmax(axis=1) if len(dates) else np.zeros(len(profits), dtype=np.int64)
+    return dates, profits, best
+
+
+def yearly_buy_analysis(item, start_date, months_ahead, model, feature_cols, monthly_forecast=None):
+    dates, profits = yearly_buy_analysis_batch(
+        [item], start_date, months_ahead, model, feature_cols, monthly_forecast=monthly_forecast
+    )
+
+    df = pd.DataFrame({
+        "buy_date": dates.date,
+        "expected_profit": profits[0]
+    })
     best = df.loc[df["expected_profit"].idxmax()]
     return df, best
 
-def buy_decision(daily_demand, stock, holiday):
+def buy_decision(daily_demand, stock, holiday, model=None):
+    decision_model = model if model is not None else load_buy_decision_model()
     return decision_model.predict(pd.DataFrame([{
         "daily_customer_demand": daily_demand,
         "stock_remaining": stock,
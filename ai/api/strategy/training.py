@@ -0,0 +1,330 @@
+"""
+Training pipeline for the monthly demand and buy decision models.
+
+    python -m strategy.training [--sales CSV] [--inventory CSV] [--models DIR] [--full] [--workers N]
+
+Stages (each timed and reported):
+- hash: content hashes of both CSVs. Monthly aggregates and the labelled inventory
+  matrix are cached under <models>/.cache keyed by those hashes, and a model whose
+  inputs did not change since the last run is not retrained.
+- features: when the sales CSV only grew (the previous contents are a prefix), only
+  the appended bytes are parsed and added to the cached monthly aggregates.
+- train: both forests are fit in parallel worker processes. If the appended sales
+  only touch the last --recent-months months, the demand forest is refreshed instead
+  of refit: its oldest --refresh-fraction trees are replaced by trees fit on the
+  updated data. --full always refits from scratch.
+- export: the joblib .pkl plus the flat export loaded by the API.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+
+from .data import BASE_DIR, read_compact_sales, sale_months
+from .forest import export_forest, flat_path
+
+N_ESTIMATORS = 300
+RANDOM_STATE = 42
+DECISION_FEATURES = ["daily_customer_demand", "stock_remaining", "holiday_spike"]
+
+MONTHLY_MODEL = "monthly_demand_model"
+DECISION_MODEL = "buy_decision_model"
+STATE = "state.json"
+
+
+class StageTimer:
+    """
+    Wall-clock seconds per named stage, in the order the stages ran.
+    """
+    def __init__(self):
+        self.seconds = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def report(self) -> str:
+        width = max(map(len, self.seconds), default=0)
+        lines = [f"{name:<{width}}  {seconds:8.3f}s" for name, seconds in self.seconds.items()]
+        lines.append(f"{'total':<{width}}  {time.perf_counter() - self.started:8.3f}s")
+        return "\n".join(lines)
+
+
+def file_hashes(path: Path, prefix_size: int = None, chunk_size: int = 1 << 20):
+    """
+    (sha256 of the file, sha256 of its first prefix_size bytes) from a single read.
+    The prefix hash is None when prefix_size is not given or exceeds the file size.
+    """
+    digest, prefix = hashlib.sha256(), None
+    read = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            if prefix_size is not None and read < prefix_size <= read + len(chunk):
+                head = digest.copy()
+                head.update(chunk[:prefix_size - read])
+                prefix = head.hexdigest()
+            digest.update(chunk)
+            read += len(chunk)
+    if prefix_size == 0:
+        prefix = hashlib.sha256().hexdigest()
+    return digest.hexdigest(), prefix
+
+
+def label_decisions(stock: np.ndarray, demand: np.ndarray) -> np.ndarray:
+    """
+    Vectorized label_decision: EMERGENCY_BUY below 2 days of demand, WAIT above 6, else BUY_NOW.
+    """
+    return np.select(
+        [stock < demand * 2, stock > demand * 6],
+        ["EMERGENCY_BUY", "WAIT"],
+        default="BUY_NOW",
+    )
+
+
+def monthly_aggregates(sales_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    total_quantity per (item_name, period ordinal), sorted like build_monthly_frame.
+    """
+    return (
+        sales_df
+        .groupby([sales_df["item_name"].astype(str), sale_months(sales_df).array.asi8], observed=True)
+        ["quantity_sold"].sum()
+        .astype(np.int64)
+        .rename_axis(["item_name", "period"])
+        .rename("total_quantity")
+        .reset_index()
+    )
+
+
+def merge_aggregates(*aggregates: pd.DataFrame) -> pd.DataFrame:
+    return (
+        pd.concat(aggregates, ignore_index=True)
+        .groupby(["item_name", "period"])["total_quantity"].sum()
+        .reset_index()
+    )
+
+
+def monthly_matrix(aggregates: pd.DataFrame):
+    """
+    (X, y) for the monthly demand model, with the columns of the original training script.
+    """
+    periods = pd.arrays.PeriodArray(aggregates["period"].to_numpy(dtype=np.int64), dtype=pd.PeriodDtype("M"))
+    monthly = pd.DataFrame({
+        "item_name": aggregates["item_name"].to_numpy(dtype=object),
+        "sold_date": periods,
+        "total_quantity": aggregates["total_quantity"].to_numpy(),
+    })
+    monthly["month"] = monthly["sold_date"].dt.month
+    monthly["year"] = monthly["sold_date"].dt.year
+    encoded = pd.get_dummies(monthly, columns=["item_name"])
+    return encoded.drop(columns=["total_quantity", "sold_date"]), encoded["total_quantity"]
+
+
+def decision_matrix(inventory_csv: Path):
+    """
+    (X, y) for the buy decision model from inventory_velocity.csv.
+    """
+    inv_df = pd.read_csv(inventory_csv, usecols=DECISION_FEATURES)
+    labels = label_decisions(inv_df["stock_remaining"].to_numpy(), inv_df["daily_customer_demand"].to_numpy())
+    return inv_df[DECISION_FEATURES], pd.Series(labels, name="decision")
+
+
+def _fit_monthly(X, y, out_path: str, n_jobs: int, refresh_trees: int = 0) -> dict:
+    timer = StageTimer()
+    with timer.stage("fit"):
+        if refresh_trees:
+            model = joblib.load(out_path)
+            model.set_params(warm_start=True, n_estimators=len(model.estimators_) + refresh_trees, n_jobs=n_jobs)
+            model.fit(X, y)
+            # Retire the oldest trees so the forest keeps its size
+            model.estimators_ = model.estimators_[refresh_trees:]
+            model.set_params(warm_start=False, n_estimators=len(model.estimators_))
+        else:
+            model = RandomForestRegressor(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE, n_jobs=n_jobs)
+            model.fit(X, y)
+    with timer.stage("export"):
+        _save(model, Path(out_path))
+    return {"timings": timer.seconds, "trees_fit": refresh_trees or N_ESTIMATORS}
+
+
+def _fit_decision(X, y, out_path: str, n_jobs: int) -> dict:
+    timer = StageTimer()
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=RANDOM_STATE)
+    with timer.stage("fit"):
+        model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE, n_jobs=n_jobs)
+        model.fit(X_train, y_train)
+    with timer.stage("export"):
+        _save(model, Path(out_path))
+    with timer.stage("evaluate"):
+        report = classification_report(y_test, model.predict(X_test))
+    return {"timings": timer.seconds, "trees_fit": N_ESTIMATORS, "report": report}
+
+
+def _save(model, out_path: Path):
+    tmp = out_path.with_suffix(".pkl.tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, out_path)
+    export_forest(model, flat_path(out_path), out_path)
+
+
+def train(
+    sales_csv: Path,
+    inventory_csv: Path,
+    models_dir: Path,
+    workers: int = 2,
+    full: bool = False,
+    force: bool = False,
+    recent_months: int = 3,
+    refresh_fraction: float = 0.25,
+) -> dict:
+    """
+    Runs the pipeline and returns a summary: per-stage timings and what was (re)trained.
+    """
+    models_dir = Path(models_dir)
+    cache_dir = models_dir / ".cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    state_path = cache_dir / STATE
+    state = json.loads(state_path.read_text()) if state_path.exists() else {}
+    timer = StageTimer()
+
+    previous = state.get("sales")
+    with timer.stage("hash"):
+        sales_sha, prefix_sha = file_hashes(sales_csv, previous["size"] if previous else None)
+        inventory_sha, _ = file_hashes(inventory_csv)
+
+    # Monthly aggregates: cached, extended with the appended rows, or rebuilt
+    changed_periods = None
+    with timer.stage("features.monthly"):
+        cached = cache_dir / f"sales-{sales_sha}.pkl"
+        previous_cache = cache_dir / f"sales-{previous['sha256']}.pkl" if previous else None
+        if cached.exists():
+            aggregates = pd.read_pickle(cached)
+        elif not full and prefix_sha is not None and prefix_sha == previous["sha256"] and previous_cache.exists():
+            appended = monthly_aggregates(read_compact_sales(sales_csv, start_offset=previous["size"]))
+            aggregates = merge_aggregates(pd.read_pickle(previous_cache), appended)
+            changed_periods = appended["period"].unique()
+        else:
+            aggregates = monthly_aggregates(read_compact_sales(sales_csv))
+        aggregates.to_pickle(cached)
+        if previous_cache is not None and previous_cache != cached:
+            previous_cache.unlink(missing_ok=True)
+        X_monthly, y_monthly = monthly_matrix(aggregates)
+
+    with timer.stage("features.decision"):
+        cached = cache_dir / f"inventory-{inventory_sha}.pkl"
+        if cached.exists():
+            X_decision, y_decision = pd.read_pickle(cached)
+        else:
+            for old in cache_dir.glob("inventory-*.pkl"):
+                old.unlink()
+            X_decision, y_decision = decision_matrix(inventory_csv)
+            pd.to_pickle((X_decision, y_decision), cached)
+
+    models = state.get("models", {})
+    monthly_path = models_dir / f"{MONTHLY_MODEL}.pkl"
+    decision_path = models_dir / f"{DECISION_MODEL}.pkl"
+    jobs = {}
+
+    if force or full or models.get(MONTHLY_MODEL, {}).get("inputs") != sales_sha or not monthly_path.exists():
+        refresh_trees = 0
+        last_period = models.get(MONTHLY_MODEL, {}).get("last_period")
+        if (
+            not full and not force and changed_periods is not None and len(changed_periods)
+            and monthly_path.exists() and last_period is not None
+            and models[MONTHLY_MODEL].get("columns") == list(X_monthly.columns)
+            and changed_periods.min() > last_period - recent_months
+        ):
+            refresh_trees = max(1, math.ceil(N_ESTIMATORS * refresh_fraction))
+        jobs[MONTHLY_MODEL] = (_fit_monthly, X_monthly, y_monthly, str(monthly_path), refresh_trees)
+
+    if force or full or models.get(DECISION_MODEL, {}).get("inputs") != inventory_sha or not decision_path.exists():
+        jobs[DECISION_MODEL] = (_fit_decision, X_decision, y_decision, str(decision_path))
+
+    results = {}
+    with timer.stage("train"):
+        n_jobs = max(1, (os.cpu_count() or 1) // max(1, min(workers, len(jobs))))
+        if len(jobs) > 1 and workers > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                futures = {name: pool.submit(fn, *args[:3], n_jobs, *args[3:]) for name, (fn, *args) in jobs.items()}
+                results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: fn(*args[:3], n_jobs, *args[3:]) for name, (fn, *args) in jobs.items()}
+
+    # Stages that ran inside the workers, e.g. train.monthly_demand_model.fit
+    for name, result in results.items():
+        for stage, seconds in result["timings"].items():
+            timer.seconds[f"train.{name}.{stage}"] = seconds
+
+    if MONTHLY_MODEL in results:
+        models[MONTHLY_MODEL] = {
+            "inputs": sales_sha,
+            "columns": list(X_monthly.columns),
+            "last_period": int(aggregates["period"].max()),
+        }
+    if DECISION_MODEL in results:
+        models[DECISION_MODEL] = {"inputs": inventory_sha}
+    state = {
+        "sales": {"sha256": sales_sha, "size": Path(sales_csv).stat().st_size},
+        "models": models,
+    }
+    tmp = state_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, state_path)
+
+    return {
+        "trained": {name: result["trees_fit"] for name, result in results.items()},
+        "incremental_features": changed_periods is not None,
+        "reports": {name: result["report"] for name, result in results.items() if "report" in result},
+        "timings": timer,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the monthly demand and buy decision models.")
+    parser.add_argument("--sales", type=Path, default=BASE_DIR / "app" / "sales_transactions.csv")
+    parser.add_argument("--inventory", type=Path, default=BASE_DIR / "app" / "inventory_velocity.csv")
+    parser.add_argument("--models", type=Path, default=BASE_DIR / "models")
+    parser.add_argument("--workers", type=int, default=2, help="processes training models in parallel")
+    parser.add_argument("--full", action="store_true", help="ignore cached aggregates and refit every model from scratch")
+    parser.add_argument("--force", action="store_true", help="retrain even when the inputs did not change")
+    parser.add_argument("--recent-months", type=int, default=3, help="appended sales within this many months allow a refresh")
+    parser.add_argument("--refresh-fraction", type=float, default=0.25, help="share of demand trees replaced by a refresh")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    summary = train(
+        args.sales, args.inventory, args.models,
+        workers=args.workers, full=args.full, force=args.force,
+        recent_months=args.recent_months, refresh_fraction=args.refresh_fraction,
+    )
+    for name in (MONTHLY_MODEL, DECISION_MODEL):
+        if name in summary["trained"]:
+            print(f"{name}: fit {summary['trained'][name]} trees")
+        else:
+            print(f"{name}: inputs unchanged, kept")
+    for report in summary["reports"].values():
+        print(report)
+    print(summary["timings"].report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(API_DIR))
+
+ADMIN_TOKEN = "test-admin-token"
+ADMIN = {"X-Admin-Token": ADMIN_TOKEN}
+# Read by main at import
+os.environ["STRATEGY_ADMIN_TOKEN"] = ADMIN_TOKEN
+
+HAS_SERVING_DATA = (API_DIR / "app" / "sales_transactions.csv").exists() and (
+    API_DIR / "models" / "monthly_demand_model.pkl"
+).exists()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    TestClient over the real app; needs the sales CSV and the trained models.
+    """
+    if not HAS_SERVING_DATA:
+        pytest.skip("needs app/sales_transactions.csv and models/monthly_demand_model.pkl")
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
@@ -0,0 +1,56 @@
+import pytest
+
+from conftest import ADMIN
+
+DECISION = {"item": "Eggs", "stock": 20, "x": 50, "discount_x": 0.03, "y": 50, "discount_x_plus_y": 0.08}
+
+
+def test_optimized_decision_validates_search_bounds(client):
+    assert client.post("/strategy/optimized-decision", json={**DECISION, "horizon_days": 0}).status_code == 422
+    assert client.post("/strategy/optimized-decision", json={**DECISION, "max_delay_days": -1}).status_code == 422
+    batch = {"items": [DECISION], "horizon_days": 0}
+    assert client.post("/strategy/optimized-decision/batch", json=batch).status_code == 422
+
+
+def test_optimized_decision_without_order_sizes(client):
+    for body in ({**DECISION, "x": 0, "y": 0}, {**DECISION, "quantities": []}):
+        response = client.post("/strategy/optimized-decision", json=body)
+        assert response.status_code == 200
+        assert response.json()["decision"] in ("BUY_NOW", "WAIT", "EMERGENCY_BUY")
+
+
+def test_batch_and_single_decisions_agree(client):
+    single = client.post("/strategy/optimized-decision", json=DECISION).json()
+    batch = client.post("/strategy/optimized-decision/batch", json={"items": [DECISION]}).json()
+    assert batch["decision"] == [single["decision"]]
+    assert batch["best_plan"]["buy_quantity"] == [single["best_plan"]["buy_quantity"]]
+
+
+def test_ingest_rows_without_client_and_malformed_rows(client):
+    row = {"item_name": "Eggs", "sold_date": "2025-01-09", "quantity_sold": 3}
+    assert client.post("/sales/ingest", json={"rows": [row]}, headers=ADMIN).status_code == 200
+    malformed = {"rows": [{**row, "sold_date": "not a date"}]}
+    assert client.post("/sales/ingest", json=malformed, headers=ADMIN).status_code == 422
+
+
+def test_ingest_requires_the_admin_token(client):
+    body = {"rows": [{"item_name": "Eggs", "sold_date": "2025-01-09", "quantity_sold": 3}]}
+    assert client.post("/sales/ingest", json=body).status_code == 403
+    assert client.post("/sales/ingest", json=body, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_explicit_defaults_share_the_etag(client):
+    first = client.post("/strategy/optimized-decision", json=DECISION)
+    second = client.post("/strategy/optimized-decision", json={**DECISION, "horizon_days": 14, "client_id": None})
+    assert first.headers["ETag"] == second.headers["ETag"]
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/strategy/best-buy-date", {"item": "Eggs", "start_date": "2025-01-01"}),
+    ("/strategy/best-buy-date/batch", {"items": ["Eggs"], "start_date": "2025-01-01"}),
+    ("/strategy/best-buy-date/portfolio", {"start_date": "2025-01-01"}),
+])
+def test_months_ahead_is_bounded(client, path, body):
+    for months_ahead in (0, -1, 37):
+        assert client.post(path, json={**body, "months_ahead": months_ahead}).status_code == 422
+    assert client.post(path, json={**body, "months_ahead": 36}).status_code == 200
@@ -0,0 +1,21 @@
+from strategy.bench import compare
+
+
+def report(results, only=None):
+    return {"meta": {"only": only}, "results": {key: {"median_s": s} for key, s in results.items()}}
+
+
+def test_compare_reports_regressions_new_and_missing_benchmarks():
+    baseline = report({"a[items=10]": 1.0, "b[items=10]": 1.0, "c[items=10]": 1.0})
+    current = report({"a[items=10]": 1.5, "b[items=10]": 1.0, "d[items=10]": 1.0})
+    rows, regressions, added, missing = compare(baseline, current, threshold=0.25)
+    assert [key for key, *_ in rows] == ["a[items=10]", "b[items=10]"]
+    assert regressions == ["a[items=10]"]
+    assert added == ["d[items=10]"]
+    assert missing == ["c[items=10]"]
+
+
+def test_compare_ignores_benchmarks_excluded_by_only():
+    baseline = report({"a[items=10]": 1.0, "b[items=10]": 1.0})
+    current = report({"a[items=10]": 1.0}, only="a[")
+    assert compare(baseline, current)[3] == []
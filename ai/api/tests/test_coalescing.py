@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+from conftest import API_DIR
+
+KEY_SCRIPT = """
+from typing import List, Optional
+
+import pandas as pd
+from pydantic import BaseModel
+
+from strategy.coalescing import request_digest
+
+
+class Request(BaseModel):
+    item: str
+    stock: float
+    x: float = 0.0
+    y: float = 0.0
+    items: Optional[List[str]] = None
+
+
+req = Request(item="Eggs", stock=20, x=50, y=50, items=["Eggs", "Milk"])
+print(request_digest("optimized-decision", req, pd.Timestamp("2025-03-03"), ("v1", 42, None), None))
+"""
+
+
+def digest_with_seed(seed: int) -> str:
+    env = {**os.environ, "PYTHONHASHSEED": str(seed)}
+    out = subprocess.run(
+        [sys.executable, "-c", KEY_SCRIPT], cwd=API_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip()
+
+
+def test_request_digest_is_stable_across_hash_seeds():
+    assert len({digest_with_seed(seed) for seed in (1, 2, 3)}) == 1
+
+
+def test_request_digest_ignores_whether_defaults_were_sent():
+    from pydantic import BaseModel
+
+    from strategy.coalescing import request_digest
+
+    class Request(BaseModel):
+        item: str
+        x: float = 0.0
+
+    assert request_digest(Request(item="Eggs")) == request_digest(Request(item="Eggs", x=0.0))
+    assert request_digest(Request(item="Eggs")) != request_digest(Request(item="Eggs", x=1.0))
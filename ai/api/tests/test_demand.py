@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from strategy.demand import DemandForecaster
+
+FEATURE_COLS = pd.Index(["month", "year", "item_name_Eggs", "item_name_Milk", "item_name_Tea"])
+ITEMS = ["Eggs", "Milk", "Tea"]
+
+
+def reference_monthly(model, item, year, month):
+    # The baseline predict_monthly_demand: one single-row predict per lookup
+    row = {"month": month, "year": year}
+    for col in FEATURE_COLS:
+        if col.startswith("item_name_"):
+            row[col] = int(col == f"item_name_{item}")
+    return float(model.predict(pd.DataFrame([row])[list(FEATURE_COLS)])[0])
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    item = rng.integers(0, len(ITEMS), 400)
+    X = pd.DataFrame({"month": rng.integers(1, 13, 400), "year": rng.integers(2022, 2027, 400)})
+    for code, name in enumerate(ITEMS):
+        X[f"item_name_{name}"] = (item == code).astype(int)
+    y = 30 + 5 * X["month"] + 10 * item + (X["year"] - 2022) * 2 + rng.random(400)
+    return RandomForestRegressor(n_estimators=10, max_depth=8, random_state=0).fit(X[list(FEATURE_COLS)], y)
+
+
+def test_table_matches_per_row_predict(model):
+    forecaster = DemandForecaster("unused.pkl", FEATURE_COLS, model=model)
+    # Warm the middle first so the table is later extended on both sides
+    forecaster.warm(2024, 2024)
+    rng = np.random.default_rng(1)
+    items = ITEMS + ["Unknown"]
+    for _ in range(60):
+        item = items[rng.integers(len(items))]
+        year, month = int(rng.integers(2021, 2028)), int(rng.integers(1, 13))
+        expected = reference_monthly(model, item, year, month)
+        assert forecaster.predict_monthly_demand(item, year, month) == pytest.approx(expected, rel=1e-12)
+        date = pd.Timestamp(year=year, month=month, day=int(rng.integers(1, 29)))
+        assert forecaster.predict_daily_velocity(item, date) == pytest.approx(expected / 30.0, rel=1e-12)
+
+
+def test_predict_many_matches_per_row_predict(model):
+    forecaster = DemandForecaster("unused.pkl", FEATURE_COLS, model=model)
+    dates = pd.date_range("2024-11-20", periods=120)
+    items = np.array([ITEMS[i % 3] for i in range(len(dates))], dtype=object)
+    expected = [reference_monthly(model, item, d.year, d.month) for item, d in zip(items, dates)]
+    np.testing.assert_allclose(forecaster.predict_many(items, dates.values), expected, rtol=1e-12)
+    np.testing.assert_allclose(
+        forecaster.predict_daily_velocities("Milk", dates.values),
+        [reference_monthly(model, "Milk", d.year, d.month) / 30.0 for d in dates],
+        rtol=1e-12,
+    )
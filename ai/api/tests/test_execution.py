@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from strategy.execution import StrategyExecutor, restart_context
+
+LOADED = None
+
+
+def load(value):
+    global LOADED
+    LOADED = value
+
+
+def loaded():
+    return LOADED
+
+
+def fail(_value):
+    raise RuntimeError("cannot load model")
+
+
+@pytest.fixture
+def executor():
+    ex = StrategyExecutor(max_workers=2, max_pending=8, timeout_s=30.0)
+    ex.start()
+    yield ex
+    ex.shutdown()
+
+
+def test_restart_uses_fresh_workers_with_initializer(executor):
+    old = executor.pool
+    executor.restart(load, ("alt.pkl",))
+    assert executor.pool is not old
+    assert executor.pool._mp_context.get_start_method() == restart_context().get_start_method() != "fork"
+    assert asyncio.run(executor.run(loaded)) == "alt.pkl"
+
+
+def test_failed_restart_keeps_old_pool(executor):
+    old = executor.pool
+    with pytest.raises(Exception):
+        executor.restart(fail, ("alt.pkl",))
+    assert executor.pool is old
+    assert asyncio.run(executor.run(loaded)) is None
@@ -0,0 +1,68 @@
+import multiprocessing
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from strategy.forest import FlatForest, flat_path, load_model
+from strategy.serving import prepare_serving_model
+
+FEATURE_COLS = pd.Index(["month", "year", "item_name_Eggs", "item_name_Milk"])
+
+
+def features(n: int = 200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    eggs = rng.integers(0, 2, n)
+    return pd.DataFrame({
+        "month": rng.integers(1, 13, n),
+        "year": rng.integers(2022, 2026, n),
+        "item_name_Eggs": eggs,
+        "item_name_Milk": 1 - eggs,
+    })
+
+
+def train(path, columns=FEATURE_COLS, seed: int = 0):
+    X = features(seed=seed)[list(columns)]
+    y = X["month"] * 3.0 + np.random.default_rng(seed).random(len(X))
+    model = RandomForestRegressor(n_estimators=8, max_depth=6, random_state=seed).fit(X, y)
+    joblib.dump(model, path)
+    return model
+
+
+def _load_and_predict(path):
+    model = load_model(path, export_stale=True)
+    return type(model).__name__, model.predict(features(20, seed=1)).tolist()
+
+
+def test_concurrent_exports_load_consistently(tmp_path):
+    path = tmp_path / "model.pkl"
+    model = train(path)
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        results = pool.map(_load_and_predict, [path] * 8)
+    expected = model.predict(features(20, seed=1))
+    for kind, predictions in results:
+        assert kind == "FlatForest"
+        np.testing.assert_allclose(predictions, expected)
+    assert isinstance(load_model(path), FlatForest)
+    assert not list(tmp_path.glob(".model.flat.*/"))
+
+
+def test_validation_does_not_export(tmp_path):
+    path = tmp_path / "model.pkl"
+    train(path)
+    bundle, report = prepare_serving_model(path, FEATURE_COLS, (2025, 2025), export=False)
+    assert report["ok"] and bundle is not None
+    assert not flat_path(path).exists()
+
+    bundle, report = prepare_serving_model(path, FEATURE_COLS, (2025, 2025))
+    assert report["ok"] and report["format"] == "flat"
+    assert (flat_path(path) / "meta.json").exists()
+
+
+def test_rejected_model_is_not_exported(tmp_path):
+    path = tmp_path / "model.pkl"
+    train(path, columns=["month", "year", "item_name_Eggs"])
+    bundle, report = prepare_serving_model(path, FEATURE_COLS, (2025, 2025))
+    assert bundle is None and not report["ok"]
+    assert not flat_path(path).exists()
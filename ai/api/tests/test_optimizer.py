@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.optimizer import (
+    choose_buy_plan,
+    optimized_buy_decision,
+    optimized_buy_decisions,
+    quantity_grid,
+    search_buy_plans,
+)
+
+TODAY = pd.Timestamp("2025-03-03")
+
+
+def decision(**kwargs):
+    args = dict(
+        item="Eggs", today=TODAY, current_stock=20.0, observed_weekly_daily_velocity=5.0,
+        predicted_daily_velocity_fn=lambda item, date: 5.0,
+        x=50.0, discount_x=0.03, y=50.0, discount_x_plus_y=0.08,
+    )
+    args.update(kwargs)
+    return optimized_buy_decision(**args)
+
+
+def test_empty_horizon_is_rejected():
+    with pytest.raises(ValueError):
+        decision(horizon_days=0)
+    with pytest.raises(ValueError):
+        search_buy_plans(np.array([]), np.array([]), np.array([]), 10.0, [0], [10.0], [])
+
+
+def test_negative_max_delay_is_rejected():
+    with pytest.raises(ValueError):
+        decision(max_delay_days=-1)
+
+
+@pytest.mark.parametrize("kwargs", [{"x": 0.0, "y": 0.0}, {"quantities": []}, {"quantities": [0.0]}])
+def test_no_order_quantities_still_decide(kwargs):
+    result = decision(**kwargs)
+    assert result["decision"] in ("BUY_NOW", "WAIT")
+    assert result["best_plan"]["buy_quantity"] >= 0
+    assert quantity_grid(0.0, 0.0).size == 0
+
+
+def test_emergency_without_quantities_orders_the_shortfall():
+    result = decision(current_stock=1.0, x=0.0, y=0.0, horizon_days=10)
+    assert result["decision"] == "EMERGENCY_BUY"
+    assert result["best_plan"]["buy_delay_days"] == 0
+    assert result["best_plan"]["buy_quantity"] == np.ceil(10 * 5.0 - 1.0)
+
+
+def test_covered_demand_does_not_order():
+    result = decision(current_stock=1000.0)
+    assert result["decision"] == "WAIT"
+    assert result["best_plan"]["buy_quantity"] == 0
+    assert "no_order" in result["scenarios"]
+
+
+def test_no_order_baseline_is_searched():
+    demand = np.full(5, 2.0)
+    prices = np.full(5, 1.0)
+    plans, stats = search_buy_plans(demand, prices * 0.3, prices, 100.0, np.arange(5), [10.0, 20.0], [], top_k=50)
+    assert plans[0]["buy_quantity"] == 0
+    assert stats["evaluated"] == len(plans)
+
+
+def test_batch_matches_single_decision():
+    rows = [(20.0, 50.0, 50.0), (1.0, 50.0, 50.0), (1000.0, 50.0, 50.0), (15.0, 0.0, 0.0)]
+    predicted = np.full((len(rows), 14), 5.0)
+    batch = optimized_buy_decisions(
+        items=["Eggs"] * len(rows), today=TODAY,
+        current_stock=[stock for stock, _, _ in rows],
+        observed_daily_velocity=np.full(len(rows), 5.0),
+        predicted_daily_velocity=predicted,
+        x=[x for _, x, _ in rows], discount_x=[0.03] * len(rows),
+        y=[y for _, _, y in rows], discount_x_plus_y=[0.08] * len(rows),
+    )
+    for i, (stock, x, y) in enumerate(rows):
+        single = decision(current_stock=stock, x=x, y=y)
+        assert batch["decision"][i] == single["decision"]
+        assert batch["best_plan"]["buy_quantity"][i] == single["best_plan"]["buy_quantity"]
+        assert batch["best_plan"]["buy_delay_days"][i] == single["best_plan"]["buy_delay_days"]
+
+
+def test_choose_buy_plan_uses_tier_discount_in_emergency():
+    demand = np.full(7, 10.0)
+    result = choose_buy_plan(
+        demand, np.full(7, 0.3), np.full(7, 0.5), 5.0, 0.2,
+        x=50.0, discount_x=0.05, y=50.0, discount_x_plus_y=0.1,
+    )
+    assert result["decision"] == "EMERGENCY_BUY"
+    assert result["best_plan"]["buy_discount"] in (0.0, 0.05, 0.1)
+
+
+def test_batch_empty_horizon_is_rejected():
+    with pytest.raises(ValueError):
+        optimized_buy_decisions(
+            items=["Eggs"], today=TODAY, current_stock=[20.0],
+            observed_daily_velocity=np.array([5.0]), predicted_daily_velocity=np.empty((1, 0)),
+            x=[50.0], discount_x=[0.03], y=[50.0], discount_x_plus_y=[0.08], horizon_days=0,
+        )
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import API_DIR
+from strategy.pricing import (
+    PROMO_PROBABILITY, price_calendar, promo_draws, retail_price, retail_price_calendar, supplier_price,
+    supplier_price_calendar,
+)
+
+DATES = pd.date_range("2024-01-01", "2026-12-31")
+
+CALENDAR_SCRIPT = """
+import json
+import pandas as pd
+from strategy.pricing import supplier_price_calendar
+print(json.dumps(supplier_price_calendar("Eggs", pd.date_range("2024-01-01", "2026-12-31")).tolist()))
+"""
+
+
+def day_ordinal(date):
+    return (date - pd.Timestamp("1970-01-01")).days
+
+
+def reference_supplier(item, date, seed):
+    # The baseline rules, with the seeded draw in place of np.random.rand()
+    base = 0.30
+    if date.day >= 25:
+        return round(base * 0.80, 2)
+    if date.month == 11:
+        return round(base * 0.75, 2)
+    if promo_draws(item, np.array([day_ordinal(date)]), seed)[0] < PROMO_PROBABILITY:
+        return round(base * 0.70, 2)
+    return base
+
+
+def reference_retail(date):
+    base = 0.50
+    if date.month == 12:
+        return round(base * 1.40, 2)
+    if date.month == 4:
+        return round(base * 1.25, 2)
+    if date.month in [6, 7, 8]:
+        return round(base * 1.10, 2)
+    return base
+
+
+@pytest.mark.parametrize("seed", [0, 7])
+def test_calendars_match_the_baseline_rules(seed):
+    for item in ("Eggs", "Milk"):
+        supplier = supplier_price_calendar(item, DATES, seed=seed)
+        assert supplier.tolist() == [reference_supplier(item, d, seed) for d in DATES]
+        assert (supplier == 0.21).any()
+        assert [supplier_price(item, d, seed=seed) for d in DATES[::37]] == supplier[::37].tolist()
+    retail = retail_price_calendar("Eggs", DATES)
+    assert retail.tolist() == [reference_retail(d) for d in DATES]
+    assert [retail_price("Eggs", d) for d in DATES[::37]] == retail[::37].tolist()
+
+
+def test_a_day_is_priced_the_same_in_any_range():
+    whole = supplier_price_calendar("Eggs", DATES, seed=3)
+    price_calendar.cache_clear()
+    part = supplier_price_calendar("Eggs", DATES[400:500], seed=3)
+    np.testing.assert_array_equal(part, whole[400:500])
+    np.testing.assert_array_equal(supplier_price_calendar("Eggs", DATES, seed=3), whole)
+    assert not np.array_equal(supplier_price_calendar("Eggs", DATES, seed=4), whole)
+
+
+def test_fixed_price_seed_is_reproducible_across_processes():
+    calendars = []
+    for hash_seed in (1, 2):
+        env = {**os.environ, "STRATEGY_PRICE_SEED": "7", "PYTHONHASHSEED": str(hash_seed)}
+        out = subprocess.run(
+            [sys.executable, "-c", CALENDAR_SCRIPT], cwd=API_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        calendars.append(json.loads(out.stdout))
+    assert calendars[0] == calendars[1] == supplier_price_calendar("Eggs", DATES, seed=7).tolist()
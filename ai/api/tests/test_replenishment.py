@@ -0,0 +1,86 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from strategy.pricing import HOLDING_COST_PER_DAY
+from strategy.replenishment import plan_replenishment
+
+TIERS = [(3.0, 0.05), (5.0, 0.12)]
+
+
+def tier_discount(quantity):
+    return max([discount for min_quantity, discount in TIERS if quantity >= min_quantity], default=0.0)
+
+
+def replay(demand, supplier, retail, stock, order_by_day, order_cost, penalty):
+    # Day loop with any number of orders: (profit, revenue, cogs, holding, lost units, ending stock)
+    revenue = cogs = holding = lost = fixed = 0.0
+    for t in range(len(demand)):
+        quantity = order_by_day.get(t, 0.0)
+        if quantity > 0:
+            cogs += supplier[t] * (1.0 - tier_discount(quantity)) * quantity
+            fixed += order_cost
+            stock += quantity
+        sold = min(stock, demand[t])
+        stock -= sold
+        revenue += sold * retail[t]
+        holding += stock * HOLDING_COST_PER_DAY * max(supplier[t], 0.0001)
+        lost += demand[t] - sold
+    profit = revenue - cogs - fixed - holding - lost * penalty
+    return profit, revenue, cogs, holding, lost, stock
+
+
+def brute_force(demand, supplier, retail, stock, max_stock, order_cost, penalty):
+    # Every sequence of order-up-to levels on the integer grid
+    best = -np.inf
+    for targets in itertools.product(range(max_stock + 1), repeat=len(demand)):
+        level, orders = stock, {}
+        for t, target in enumerate(targets):
+            if target > level:
+                orders[t] = float(target - level)
+                level = target
+            level = max(level - demand[t], 0.0)
+        best = max(best, replay(demand, supplier, retail, stock, orders, order_cost, penalty)[0])
+    return best
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("order_cost", [0.0, 0.4])
+def test_plan_is_optimal_on_an_exact_grid(seed, order_cost):
+    rng = np.random.default_rng(seed)
+    horizon, max_stock = 5, 6
+    # Integer demand and stock on a unit grid: no interpolation, so the DP must find the optimum
+    demand = rng.integers(0, 4, horizon).astype(float)
+    supplier = rng.choice([0.21, 0.24, 0.30], horizon)
+    retail = rng.choice([0.50, 0.55, 0.70], horizon)
+    stock, penalty = float(rng.integers(0, 3)), 0.1
+
+    plan = plan_replenishment(
+        demand, supplier, retail, stock, offer_tiers=TIERS, order_cost=order_cost,
+        stockout_penalty_per_unit=penalty, n_levels=max_stock, max_stock=float(max_stock),
+    )
+    expected = brute_force(demand, supplier, retail, stock, max_stock, order_cost, penalty)
+    assert plan["profit"] == pytest.approx(expected, abs=0.006)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_reported_plan_matches_its_replayed_orders(seed):
+    rng = np.random.default_rng(seed)
+    horizon = 40
+    demand = rng.random(horizon) * 6
+    supplier = rng.choice([0.21, 0.24, 0.30], horizon)
+    retail = rng.choice([0.50, 0.55, 0.70], horizon)
+    plan = plan_replenishment(demand, supplier, retail, 4.0, offer_tiers=TIERS, order_cost=0.3, stockout_penalty_per_unit=0.1)
+    assert plan["orders"]
+
+    orders = {order["day"]: order["quantity"] for order in plan["orders"]}
+    profit, revenue, cogs, holding, lost, stock = replay(demand, supplier, retail, 4.0, orders, 0.3, 0.1)
+    # Order quantities are reported rounded to 2 decimals
+    assert plan["profit"] == pytest.approx(profit, abs=0.05)
+    assert plan["revenue"] == pytest.approx(revenue, abs=0.05)
+    assert plan["cogs"] == pytest.approx(cogs, abs=0.05)
+    assert plan["holding_cost"] == pytest.approx(holding, abs=0.05)
+    assert plan["lost_units"] == pytest.approx(lost, abs=0.05)
+    assert plan["ending_stock"] == pytest.approx(stock, abs=0.05)
+    assert plan["order_costs"] == pytest.approx(0.3 * len(orders))
@@ -0,0 +1,99 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.columnar_sales import ColumnarSales
+from strategy.data import build_monthly_frame
+from strategy.sales_store import SalesStore
+from strategy.snapshot import (
+    attach_sales_store, build_snapshot, read_compact_sales, read_manifest, snapshot_is_current, snapshot_lock,
+)
+
+AS_OF = pd.Timestamp("2025-01-10")
+
+
+def client_sales(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "item_name": rng.choice(["Eggs", "Milk"], n),
+        "category": "Dairy",
+        "client_id": rng.choice(["c1", "c2", "c3"], n),
+        "quantity_sold": rng.integers(1, 10, n),
+        "unit_cost": 1.0,
+        "unit_price": 2.0,
+        "profit": 1.0,
+        "sold_date": pd.Timestamp("2024-12-01") + pd.to_timedelta(rng.integers(0, 40, n), unit="D"),
+    })
+
+
+@pytest.fixture(params=["frame", "columnar"])
+def store(request, tmp_path):
+    sales = client_sales()
+    if request.param == "frame":
+        return SalesStore(sales, build_monthly_frame(sales))
+    sales.to_csv(tmp_path / "sales.csv", index=False)
+    build_snapshot(tmp_path / "sales.csv", tmp_path / "snapshot")
+    return SalesStore(ColumnarSales(tmp_path / "snapshot"), build_monthly_frame(read_compact_sales(tmp_path / "sales.csv")))
+
+
+def test_ingest_without_client_id_into_client_store(store):
+    item_before = store.observed_daily_velocity("Eggs", AS_OF, lookback_days=7)
+    client_before = store.observed_daily_velocity("Eggs", AS_OF, lookback_days=7, client_id="c1")
+
+    store.append(pd.DataFrame({"item_name": ["Eggs"], "sold_date": ["2025-01-09"], "quantity_sold": [70]}))
+    store.append(pd.DataFrame({
+        "item_name": ["Eggs", "Eggs"], "sold_date": ["2025-01-09", "2025-01-09"],
+        "quantity_sold": [7, 14], "client_id": [None, "c1"],
+    }))
+
+    assert store.version == 2
+    assert store.observed_daily_velocity("Eggs", AS_OF, lookback_days=7) == pytest.approx(item_before + 91 / 7)
+    assert store.observed_daily_velocity("Eggs", AS_OF, lookback_days=7, client_id="c1") == pytest.approx(client_before + 2)
+    assert len(store.sales_frame()) == store.rows
+
+
+@pytest.mark.parametrize("rows", [
+    {"item_name": ["Eggs"], "sold_date": ["not a date"], "quantity_sold": [1]},
+    {"item_name": ["Eggs"], "sold_date": ["2025-01-09"], "quantity_sold": ["many"]},
+    {"item_name": ["Eggs"], "quantity_sold": [1]},
+])
+def test_malformed_rows_are_rejected(store, rows):
+    with pytest.raises(ValueError):
+        store.append(pd.DataFrame(rows))
+    assert store.version == 0
+
+
+@pytest.mark.parametrize("locked", [False, True])
+def test_touched_csv_refreshes_manifest_atomically(tmp_path, locked):
+    csv, out = tmp_path / "sales.csv", tmp_path / "snapshot"
+    client_sales().to_csv(csv, index=False)
+    build_snapshot(csv, out)
+    mtime_ns = read_manifest(out)["csv_mtime_ns"] + 10**9
+    os.utime(csv, ns=(mtime_ns, mtime_ns))
+
+    if locked:
+        with snapshot_lock(out):
+            assert snapshot_is_current(csv, out, locked=True)
+    else:
+        assert snapshot_is_current(csv, out)
+    assert read_manifest(out)["csv_mtime_ns"] == mtime_ns
+    assert not list(out.glob("*.tmp"))
+
+
+
+def test_attach_waits_for_a_running_build(tmp_path):
+    csv, out = tmp_path / "sales.csv", tmp_path / "snapshot"
+    client_sales().to_csv(csv, index=False)
+    attach_sales_store(csv, out)
+
+    attached = threading.Event()
+    with snapshot_lock(out):
+        # A build holds the lock: even a current snapshot must not be read half-replaced
+        thread = threading.Thread(target=lambda: (attach_sales_store(csv, out), attached.set()))
+        thread.start()
+        assert not attached.wait(0.5)
+    thread.join(timeout=30)
+    assert attached.is_set()
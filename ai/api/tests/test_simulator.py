@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.pricing import HOLDING_COST_PER_DAY, retail_price, supplier_price
+from strategy.simulator import simulate_plan, simulate_plans, simulate_restocks
+
+KEYS = ("profit", "revenue", "cogs", "holding_cost", "lost_units", "stockout_penalty", "ending_stock")
+
+
+def reference_plan(demand, supplier, retail, stock, delay, discount, quantity, penalty=None):
+    # The baseline simulate_plan loop over precomputed day vectors
+    totals = dict.fromkeys(KEYS, 0.0)
+    for day in range(len(demand)):
+        if day == delay and quantity > 0:
+            totals["cogs"] += supplier[day] * (1.0 - discount) * quantity
+            stock += quantity
+        sold = min(stock, demand[day])
+        stock -= sold
+        if sold < demand[day]:
+            totals["lost_units"] += demand[day] - sold
+            if penalty is not None:
+                totals["stockout_penalty"] += penalty * (demand[day] - sold)
+        totals["revenue"] += sold * retail[day]
+        totals["holding_cost"] += stock * HOLDING_COST_PER_DAY * max(supplier[day], 0.0001)
+    totals["profit"] = totals["revenue"] - totals["cogs"] - totals["holding_cost"] - totals["stockout_penalty"]
+    totals["ending_stock"] = stock
+    return totals
+
+
+def day_vectors(horizon, seed):
+    rng = np.random.default_rng(seed)
+    demand = rng.random(horizon) * 8
+    demand[rng.random(horizon) < 0.2] = 0.0
+    return demand, rng.choice([0.21, 0.24, 0.30], horizon), rng.choice([0.50, 0.55, 0.70], horizon)
+
+
+def plan_grid(horizon, seed):
+    rng = np.random.default_rng(seed + 100)
+    n = 60
+    # Delays past the horizon and zero quantities are plans that never restock
+    return (
+        rng.uniform(0, 40, n), rng.integers(0, horizon + 3, n),
+        rng.choice([0.0, 0.03, 0.08], n), rng.choice([0.0, 10.0, 55.5, 200.0], n),
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("penalty", [None, 0.2])
+def test_simulate_plans_match_the_loop(seed, penalty):
+    horizon = 30
+    demand, supplier, retail = day_vectors(horizon, seed)
+    stock, delay, discount, quantity = plan_grid(horizon, seed)
+    batch = simulate_plans(demand, supplier, retail, stock, delay, discount, quantity, penalty)
+    for i in range(len(stock)):
+        expected = reference_plan(demand, supplier, retail, stock[i], delay[i], discount[i], quantity[i], penalty)
+        for key in KEYS:
+            assert batch[key][i] == pytest.approx(expected[key], abs=1e-9), key
+
+
+def test_simulate_plan_matches_the_baseline_with_calendar_prices():
+    start = pd.Timestamp("2025-11-20")
+    dates = pd.date_range(start, periods=20)
+    velocity = lambda item, date: 3.0 + date.day % 4
+    demand = np.array([velocity("Eggs", d) for d in dates])
+    supplier = np.array([supplier_price("Eggs", d) for d in dates])
+    retail = np.array([retail_price("Eggs", d) for d in dates])
+
+    result = simulate_plan("Eggs", start, 20, 12.0, 5, 0.05, 60.0, velocity, stockout_penalty_per_unit=0.1)
+    expected = reference_plan(demand, supplier, retail, 12.0, 5, 0.05, 60.0, 0.1)
+    for key in KEYS:
+        assert result[key] == pytest.approx(round(expected[key], 2), abs=0.011), key
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("stock", [0.0, 7.5, 500.0])
+def test_simulate_restocks_match_the_loop(seed, stock):
+    horizon = 30
+    demand, supplier, retail = day_vectors(horizon, seed)
+    rng = np.random.default_rng(seed + 200)
+    # simulate_restocks takes delays inside the horizon only
+    delay = rng.integers(0, horizon, 60)
+    discount = rng.choice([0.0, 0.03, 0.08], 60)
+    quantity = rng.choice([0.0, 4.0, 55.5, 200.0], 60)
+
+    batch = simulate_restocks(demand, supplier, retail, stock, delay, discount, quantity, 0.2)
+    for i in range(len(delay)):
+        expected = reference_plan(demand, supplier, retail, stock, delay[i], discount[i], quantity[i], 0.2)
+        for key in KEYS:
+            assert batch[key][i] == pytest.approx(expected[key], abs=1e-9), key
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from strategy.pricing import HOLDING_COST_PER_DAY, retail_price, supplier_price
+from strategy.strategy import BUY_WINDOW_DAYS, buy_date_profits, portfolio_buy_analysis, yearly_buy_analysis
+
+FEATURE_COLS = pd.Index(["month", "year", "item_name_Eggs", "item_name_Milk"])
+
+
+def reference_profits(buy, sell, demand, window=BUY_WINDOW_DAYS):
+    # The per-day loop buy_date_profits replaced
+    profits = np.zeros(len(buy))
+    for i in range(len(buy)):
+        for j in range(i, min(i + window, len(buy))):
+            margin = sell[j] - buy[i] - (j - i) * HOLDING_COST_PER_DAY * buy[i]
+            if margin > 0:
+                profits[i] += margin * demand[j]
+    return profits
+
+
+def reference_yearly(item, start_date, months_ahead, model):
+    # Baseline yearly_buy_analysis: one predict per month, scalar prices per day
+    dates = pd.date_range(start_date, periods=months_ahead * 30)
+    demand = {}
+    for d in dates:
+        if (d.year, d.month) not in demand:
+            row = {"month": d.month, "year": d.year, "item_name_Eggs": int(item == "Eggs"), "item_name_Milk": int(item == "Milk")}
+            demand[(d.year, d.month)] = model.predict(pd.DataFrame([row])[list(FEATURE_COLS)])[0] / 30
+    buy = np.array([supplier_price(item, d) for d in dates])
+    sell = np.array([retail_price(item, d) for d in dates])
+    daily = np.array([demand[(d.year, d.month)] for d in dates])
+    return dates, np.round(reference_profits(buy, sell, daily), 2)
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    eggs = rng.integers(0, 2, 300)
+    X = pd.DataFrame({
+        "month": rng.integers(1, 13, 300), "year": rng.integers(2023, 2027, 300),
+        "item_name_Eggs": eggs, "item_name_Milk": 1 - eggs,
+    })
+    y = 40 + 10 * np.sin(X["month"] / 2.0) + 15 * eggs + rng.random(300)
+    return RandomForestRegressor(n_estimators=10, max_depth=6, random_state=0).fit(X, y)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_buy_date_profits_match_the_loop(seed):
+    rng = np.random.default_rng(seed)
+    n = 200
+    # Overlapping price ranges, so both the prefix-sum rows and the clipped rows are exercised
+    buy = rng.choice([0.21, 0.24, 0.30, 0.45], n)
+    sell = rng.choice([0.35, 0.50, 0.55, 0.70], n)
+    demand = rng.random((3, n)) * 5
+    profits = buy_date_profits(buy, sell, demand)
+    assert profits.shape == (3, n)
+    for row in range(3):
+        expected = reference_profits(buy, sell, demand[row])
+        np.testing.assert_allclose(profits[row], expected, rtol=1e-9, atol=1e-9)
+        assert profits[row].argmax() == expected.argmax()
+
+
+@pytest.mark.parametrize("start_date, months_ahead", [("2025-01-01", 3), ("2025-10-15", 12)])
+def test_yearly_buy_analysis_matches_the_baseline(model, start_date, months_ahead):
+    for item in ("Eggs", "Milk"):
+        dates, expected = reference_yearly(item, start_date, months_ahead, model)
+        df, best = yearly_buy_analysis(item, start_date, months_ahead, model, FEATURE_COLS)
+        np.testing.assert_allclose(df["expected_profit"], expected, atol=0.011)
+        assert best["buy_date"] == dates[expected.argmax()].date()
+
+    _, profits, best = portfolio_buy_analysis(["Eggs", "Milk"], start_date, months_ahead, model, FEATURE_COLS)
+    for row, item in enumerate(("Eggs", "Milk")):
+        np.testing.assert_allclose(profits[row], reference_yearly(item, start_date, months_ahead, model)[1], atol=0.011)
+        assert best[row] == profits[row].argmax()